@@ -0,0 +1,587 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import srt
+
+from main import (FFMPEG_BINARY, _whisper_model_pool, _whisper_model_stats, build_compact_text,
+                  build_profile_report, build_timed_text, enable_profiling, estimate_tokens, fit_text_block,
+                  load_font, measure_line_bbox, measure_text_width, probe_video, process_sources,
+                  resolve_transcription_config)
+
+# main.py yüklenirken içe aktarılmaması gereken ağır bağımlılıklar
+HEAVY_MODULES = ('torch', 'whisper', 'faster_whisper', 'ctranslate2', 'cv2', 'yt_dlp', 'openai', 'moviepy')
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+try:
+    import resource
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    peak_rss_kb = None
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': elapsed, 'peak_rss_kb': peak_rss_kb, 'heavy_modules': heavy, 'modules': len(sys.modules)}}))
+"""
+
+SAMPLE_TITLES = [
+    "Bu Yöntemle Herkes Şaşıracak",
+    "İnanılmaz Açıklama: Kimse Bunu Beklemiyordu",
+    "Uzmanından Hayat Kurtaran Tavsiye ve Önemli Uyarılar Geldi",
+    "Şok Eden Gerçek",
+    "Çok Önemli Bir Konu Hakkında Herkesin Bilmesi Gereken Detaylar",
+]
+
+# Uçtan uca ölçüm için sentetik kaynak video süreleri (dakika)
+E2E_MINUTES = (1, 10, 60)
+# İstemdeki [12.0s-15.5s] zaman damgaları ve @12.0 çapaları
+PROMPT_TIME_PATTERN = re.compile(r'\[(\d+(?:\.\d+)?)s-(\d+(?:\.\d+)?)s\]|(?:^|\s)@(\d+(?:\.\d+)?)')
+STUB_WORDS = ("bugün", "size", "çok", "önemli", "bir", "konu", "hakkında", "konuşacağız", "ama", "önce",
+              "şunu", "bilmeniz", "gerekiyor", "bu", "yöntem", "gerçekten", "inanılmaz", "sonuç", "veriyor")
+
+
+def get_token_counter(model):
+    """Varsa tiktoken ile, yoksa ~4 karakter/token tahminiyle token sayan fonksiyon döndürür"""
+    try:
+        import tiktoken
+    except ImportError:
+        return estimate_tokens, "tahmini (~4 karakter/token)"
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text)), f"tiktoken ({encoding.name})"
+
+
+def benchmark_prompt_tokens(args):
+    """SRT dosyaları için analiz istemi biçimlerinin video dakikası başına token sayısını ölçer"""
+    count_tokens, counter_name = get_token_counter(args.model)
+    encodings = {
+        'timed': lambda subs: build_timed_text(subs),
+        'compact': lambda subs: build_compact_text(subs, strip_filler=False),
+        'compact+filler': lambda subs: build_compact_text(subs, strip_filler=True),
+    }
+    print(f"Token sayacı: {counter_name}")
+
+    report = []
+    for path in args.srt:
+        with open(path, 'r', encoding='utf-8') as f:
+            subs = list(srt.parse(f.read()))
+        if not subs:
+            print(f"{path}: altyazı yok, atlandı")
+            continue
+        minutes = max(sub.end.total_seconds() for sub in subs) / 60
+        baseline = None
+        print(f"\n{os.path.basename(path)} ({len(subs)} segment, {minutes:.1f} dakika)")
+        for name, build in encodings.items():
+            tokens = count_tokens(build(subs))
+            baseline = baseline or tokens
+            per_minute = tokens / minutes if minutes else 0.0
+            print(f"  {name:<15} {tokens:>8} token  {per_minute:>8.1f} token/dk  {tokens / baseline:>6.1%}")
+            report.append({'file': path, 'encoding': name, 'segments': len(subs), 'minutes': minutes,
+                           'tokens': tokens, 'tokens_per_minute': per_minute})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar kaydedildi: {args.json}")
+
+
+def benchmark_text_layout(args):
+    """Başlık yerleşiminin (font sığdırma + satır bölme) başlık başına süresini ölçer"""
+    titles = SAMPLE_TITLES
+    if args.titles:
+        with open(args.titles, 'r', encoding='utf-8') as f:
+            titles = [line.strip() for line in f if line.strip()]
+
+    def run_layout():
+        durations = []
+        for title in titles:
+            started = time.perf_counter()
+            fit_text_block(title, args.font, args.width, args.height - 80, args.font_size)
+            durations.append(time.perf_counter() - started)
+        return durations
+
+    report = {}
+    for name in ('soğuk', 'sıcak'):
+        if name == 'soğuk':
+            # Font ve ölçü önbelleklerini boşalt
+            load_font.cache_clear()
+            measure_text_width.cache_clear()
+            measure_line_bbox.cache_clear()
+        durations = []
+        for _ in range(args.repeat if name == 'sıcak' else 1):
+            durations += run_layout()
+        per_title_ms = sorted(d * 1000 for d in durations)
+        report[name] = {
+            'titles': len(per_title_ms),
+            'mean_ms': sum(per_title_ms) / len(per_title_ms),
+            'p50_ms': per_title_ms[len(per_title_ms) // 2],
+            'max_ms': per_title_ms[-1],
+        }
+        print(f"{name:<6} {report[name]['titles']:>6} başlık  ortalama {report[name]['mean_ms']:.3f} ms  "
+              f"p50 {report[name]['p50_ms']:.3f} ms  en fazla {report[name]['max_ms']:.3f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar kaydedildi: {args.json}")
+
+
+def benchmark_import_time(args):
+    """main.py'nin temiz bir Python sürecinde içe aktarılma süresini ve belleğini ölçer"""
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = IMPORT_PROBE.format(heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(args.repeat):
+        result = subprocess.run([sys.executable, '-c', probe], cwd=module_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"main.py içe aktarılamadı: {result.stderr.strip()[-2000:]}")
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    seconds = sorted(run['seconds'] * 1000 for run in runs)
+    report = {
+        'runs': len(runs),
+        'min_ms': seconds[0],
+        'p50_ms': seconds[len(seconds) // 2],
+        'max_ms': seconds[-1],
+        'peak_rss_kb': max(run['peak_rss_kb'] or 0 for run in runs) or None,
+        'modules': runs[-1]['modules'],
+        'heavy_modules': runs[-1]['heavy_modules'],
+    }
+    print(f"import main: en az {report['min_ms']:.1f} ms  p50 {report['p50_ms']:.1f} ms  "
+          f"en fazla {report['max_ms']:.1f} ms  ({report['modules']} modül)")
+    if report['peak_rss_kb']:
+        print(f"En yüksek bellek (RSS): {report['peak_rss_kb'] / 1024:.1f} MB")
+    if report['heavy_modules']:
+        print(f"⚠️ Yüklenen ağır bağımlılıklar: {', '.join(report['heavy_modules'])}")
+    else:
+        print("✓ Ağır bağımlılıkların hiçbiri yüklenmedi")
+
+    if args.importtime:
+        # En pahalı modülleri -X importtime çıktısından listele
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                                cwd=module_dir, capture_output=True, text=True)
+        entries = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = [field.strip() for field in line.split(':', 1)[1].split('|')]
+            if cumulative.isdigit():
+                entries.append((int(cumulative), name))
+        report['top_imports'] = [{'module': name, 'cumulative_ms': us / 1000} for us, name in sorted(entries, reverse=True)[:args.importtime]]
+        for entry in report['top_imports']:
+            print(f"  {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar kaydedildi: {args.json}")
+
+
+def run_ffmpeg(args):
+    """FFmpeg'i çalıştırır, hata durumunda stderr'in sonunu içeren bir hata fırlatır"""
+    result = subprocess.run([FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error'] + args,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg hatası: {result.stderr.strip()[-2000:]}")
+
+
+def generate_source_video(path, seconds, width=1280, height=720, fps=30):
+    """testsrc2 görüntüsü ve konuşmaya benzer (heceli, sessizlikli) sesle sentetik kaynak video üretir"""
+    if os.path.exists(path):
+        return path
+    # Perdesi değişen ton, ~0.3 Hz'lik açma/kapama ile konuşma ve duraklamaları taklit eder
+    speech = ("aevalsrc='0.4*sin(2*PI*(170+50*sin(2*PI*0.7*t))*t)"
+              "*gt(sin(2*PI*3.1*t),-0.2)*gt(sin(2*PI*0.29*t),-0.5)':s=48000:c=stereo")
+    run_ffmpeg([
+        '-f', 'lavfi', '-i', f"testsrc2=size={width}x{height}:rate={fps}",
+        '-f', 'lavfi', '-i', speech,
+        '-t', str(seconds), '-map', '0:v', '-map', '1:a',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', '96k', path + '.tmp.mp4'
+    ])
+    os.replace(path + '.tmp.mp4', path)
+    return path
+
+
+def generate_background_video(path, seconds=30):
+    """Render için 1920x1080 sessiz sahte bg.mp4 üretir"""
+    if os.path.exists(path):
+        return path
+    run_ffmpeg([
+        '-f', 'lavfi', '-i', "testsrc2=size=1920x1080:rate=30,hue=s=0.3",
+        '-t', str(seconds), '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '30', '-pix_fmt', 'yuv420p',
+        path + '.tmp.mp4'
+    ])
+    os.replace(path + '.tmp.mp4', path)
+    return path
+
+
+def build_stub_analysis(prompt, parts_per_request=3, part_seconds=45):
+    """İstemdeki zaman aralığına eşit yayılmış, analyze_content biçiminde kısımlar üretir"""
+    times = [float(value) for match in PROMPT_TIME_PATTERN.findall(prompt) for value in match if value]
+    if not times:
+        return []
+    first, last = min(times), max(times)
+    step = (last - first) / parts_per_request
+    parts = []
+    for k in range(parts_per_request):
+        start = first + k * step
+        end = min(start + part_seconds, last)
+        if end - start < 15:
+            continue
+        parts.append({'start': round(start, 1), 'end': round(end, 1),
+                      'title': f"Benchmark Kısım {int(start)}", 'description': "Sentetik analiz yanıtı"})
+    return parts
+
+
+def start_stub_openai_server(parts_per_request=3, part_seconds=45, latency=0.0):
+    """Sabit analiz yanıtları döndüren yerel OpenAI uyumlu /v1/chat/completions sunucusunu başlatır"""
+    stats = {'requests': 0}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            with lock:
+                stats['requests'] += 1
+            if latency:
+                time.sleep(latency)
+            prompt = request.get('messages', [{}])[-1].get('content', '')
+            content = json.dumps(build_stub_analysis(prompt, parts_per_request, part_seconds), ensure_ascii=False)
+            body = json.dumps({
+                'id': f"chatcmpl-stub-{stats['requests']}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model') or 'stub',
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': content}}],
+                'usage': {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(content),
+                          'total_tokens': estimate_tokens(prompt) + estimate_tokens(content)},
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, name='stub-openai', daemon=True).start()
+    return server, stats
+
+
+class StubWhisperModel:
+    """faster-whisper WhisperModel.transcribe arayüzünü taklit eden, sabit metin üreten model"""
+
+    def __init__(self, real_time_factor=0.0, segment_seconds=4.0):
+        self.real_time_factor = real_time_factor
+        self.segment_seconds = segment_seconds
+
+    def transcribe(self, audio, language=None, **kwargs):
+        audio_seconds = len(audio) / 16000
+
+        def segments():
+            started = time.perf_counter()
+            start = 0.0
+            k = 0
+            while start < audio_seconds:
+                end = min(start + self.segment_seconds * 0.8, audio_seconds)
+                words = [STUB_WORDS[(k * 5 + n) % len(STUB_WORDS)] for n in range(6)]
+                if k % 4 == 3:
+                    words[-1] += "."
+                word_length = (end - start) / len(words)
+                # Gerçek modelin hızını taklit etmek için gerekirse bekle
+                target = (end * self.real_time_factor) - (time.perf_counter() - started)
+                if target > 0:
+                    time.sleep(target)
+                yield SimpleNamespace(
+                    start=start, end=end, text=' ' + ' '.join(words),
+                    words=[SimpleNamespace(start=start + n * word_length, end=start + (n + 1) * word_length,
+                                           word=' ' + word) for n, word in enumerate(words)]
+                )
+                start += self.segment_seconds
+                k += 1
+
+        return segments(), SimpleNamespace(language=language or 'tr', language_probability=1.0,
+                                           duration=audio_seconds)
+
+
+def install_stub_whisper(model):
+    """Sahte modeli main'in Whisper havuzuna varsayılan ayarların anahtarıyla yerleştirir"""
+    config = resolve_transcription_config()
+    key = (config['model_size'], config['device'], config['compute_type'],
+           config['cpu_threads'], config['num_workers'])
+    _whisper_model_pool[key] = model
+    _whisper_model_stats[key] = {
+        'model_size': config['model_size'], 'device': config['device'], 'compute_type': config['compute_type'],
+        'cpu_threads': config['cpu_threads'], 'num_workers': config['num_workers'], 'load_seconds': 0.0,
+        'rss_delta_bytes': None, 'uses': 0, 'warmed_up': True, 'warmup_seconds': None,
+    }
+
+
+def read_peak_rss_bytes(children=False):
+    """Bu sürecin (veya beklenmiş en büyük alt sürecin) en yüksek bellek kullanımını bayt olarak döndürür"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def benchmark_e2e_run(args):
+    """Tek bir sentetik videoyu sahte servislerle tüm hattan geçirir ve ölçümleri JSON'a yazar
+
+    benchmark_e2e tarafından ayrı bir süreçte, hazırlanmış çalışma klasöründe çağrılır.
+    """
+    install_stub_whisper(StubWhisperModel(real_time_factor=args.whisper_rtf))
+    enable_profiling()
+    summary = process_sources([args.video], language='tr', renderer=args.renderer,
+                                   workers=args.workers, subtitle_mode=args.subtitle_mode)
+    source = summary['sources'][0]
+    profile = build_profile_report()
+    output_seconds = 0.0
+    for path in source['outputs']:
+        output_seconds += probe_video(path).get('duration', 0.0)
+    report = {
+        'status': source['status'],
+        'error': source['error'],
+        'source_seconds': source['duration'],
+        'wall_seconds': summary['total_seconds'],
+        'parts': source['parts'],
+        'rendered': len(source['outputs']),
+        'output_seconds': output_seconds,
+        'throughput': output_seconds / summary['total_seconds'] if summary['total_seconds'] else 0.0,
+        'stage_seconds': source['timings'],
+        'spans': {name: {key: stage[key] for key in ('count', 'wall_seconds', 'max_wall_seconds', 'cpu_seconds',
+                                                      'children_cpu_seconds')}
+                  for name, stage in profile['stages'].items()},
+        'peak_rss_bytes': read_peak_rss_bytes(),
+        'children_peak_rss_bytes': read_peak_rss_bytes(children=True),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def link_or_copy(source, target):
+    """Dosyayı/klasörü çalışma klasörüne sembolik bağlar; bağlanamazsa kopyalar"""
+    try:
+        os.symlink(os.path.abspath(source), target)
+    except OSError:
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        else:
+            shutil.copy2(source, target)
+
+
+def compare_with_baseline(runs, baseline, tolerance):
+    """Sonuçları temel ölçümle karşılaştırır ve tolerans dışındaki gerilemeleri listeler"""
+    baseline_runs = {run['minutes']: run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in runs:
+        base = baseline_runs.get(run['minutes'])
+        if not base or run['status'] != 'completed':
+            continue
+        checks = [('throughput', run['throughput'], base['throughput'], False)]
+        checks += [(f"stage:{stage}", seconds, base['stage_seconds'].get(stage), True)
+                   for stage, seconds in run['stage_seconds'].items()]
+        checks.append(('peak_rss_bytes', run['peak_rss_bytes'], base.get('peak_rss_bytes'), True))
+        for name, value, base_value, lower_is_better in checks:
+            if not value or not base_value:
+                continue
+            change = value / base_value - 1
+            run.setdefault('baseline_change', {})[name] = change
+            if (change > tolerance) if lower_is_better else (change < -tolerance):
+                regressions.append({'minutes': run['minutes'], 'metric': name, 'value': value,
+                                    'baseline': base_value, 'change': change})
+    return regressions
+
+
+def benchmark_e2e(args):
+    """Sentetik videolar ve sahte OpenAI/Whisper ile uçtan uca hattı ölçer
+
+    Her video ayrı bir süreçte, boş önbellekli kendi çalışma klasöründe işlenir; böylece
+    transkript/LLM önbellekleri ve bellek ölçümleri çalıştırmalar arasında karışmaz.
+    """
+    if not shutil.which(FFMPEG_BINARY):
+        raise SystemExit(f"FFmpeg bulunamadı: {FFMPEG_BINARY}")
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    media_dir = os.path.abspath(args.media_dir)
+    os.makedirs(media_dir, exist_ok=True)
+
+    print("Sentetik medya hazırlanıyor...")
+    bg_path = generate_background_video(os.path.join(media_dir, 'bg.mp4'))
+    videos = {}
+    for minutes in args.minutes:
+        started = time.perf_counter()
+        videos[minutes] = generate_source_video(os.path.join(media_dir, f"source_{minutes:g}min.mp4"),
+                                                minutes * 60)
+        print(f"  {minutes:g} dakikalık video hazır ({time.perf_counter() - started:.1f}s): {videos[minutes]}")
+
+    server, server_stats = start_stub_openai_server(args.llm_parts, args.llm_part_seconds, args.llm_latency)
+    env = dict(os.environ)
+    env.update({
+        'OPENAI_BASE_URL': f"http://127.0.0.1:{server.server_address[1]}/v1",
+        'OPENAI_API_KEY': 'benchmark',
+        'OPENAI_MODEL': 'benchmark-stub',
+        'LLM_CACHE_MODE': 'off',
+        'WHISPER_DEVICE': 'cpu',
+        # Parçalı uzun ses modu işçi süreçlerde gerçek modeli yüklediği için kapalı
+        'WHISPER_LONG_FORM_MIN_SECONDS': '1e12',
+        'PYTHONIOENCODING': 'utf-8',
+    })
+    env.pop('SHORTS_PROFILE', None)
+
+    runs = []
+    try:
+        for minutes in args.minutes:
+            attempts = []
+            for repeat in range(args.repeat):
+                run_dir = tempfile.mkdtemp(prefix=f"longtoshort_e2e_{minutes:g}min_")
+                try:
+                    link_or_copy(os.path.join(module_dir, 'DynaPuff'), os.path.join(run_dir, 'DynaPuff'))
+                    link_or_copy(bg_path, os.path.join(run_dir, 'bg.mp4'))
+                    video_path = os.path.join(run_dir, os.path.basename(videos[minutes]))
+                    link_or_copy(videos[minutes], video_path)
+                    env['LONGTOSHORT_CACHE_DIR'] = os.path.join(run_dir, '.cache')
+                    result_path = os.path.join(run_dir, 'result.json')
+                    cmd = [sys.executable, os.path.abspath(__file__), 'e2e-run', video_path, '--output', result_path,
+                           '--renderer', args.renderer, '--whisper-rtf', str(args.whisper_rtf)]
+                    if args.workers is not None:
+                        cmd += ['--workers', str(args.workers)]
+                    if args.subtitle_mode:
+                        cmd += ['--subtitle-mode', args.subtitle_mode]
+                    server_stats['requests'] = 0
+                    print(f"\n{minutes:g} dakika, deneme {repeat + 1}/{args.repeat}...")
+                    with open(os.path.join(run_dir, 'run.log'), 'w', encoding='utf-8') as log:
+                        result = subprocess.run(cmd, cwd=run_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+                    if result.returncode != 0 or not os.path.exists(result_path):
+                        with open(os.path.join(run_dir, 'run.log'), encoding='utf-8', errors='replace') as f:
+                            raise RuntimeError(f"{minutes:g} dakikalık ölçüm başarısız:\n{f.read()[-3000:]}")
+                    with open(result_path, encoding='utf-8') as f:
+                        attempt = json.load(f)
+                    attempt.update({'minutes': minutes, 'llm_requests': server_stats['requests']})
+                    attempts.append(attempt)
+                finally:
+                    if not args.keep:
+                        shutil.rmtree(run_dir, ignore_errors=True)
+                    else:
+                        print(f"  Çalışma klasörü: {run_dir}")
+            # Tekrarlar arasında ortanca duvar süresine sahip çalıştırmayı raporla
+            attempts.sort(key=lambda attempt: attempt['wall_seconds'])
+            run = attempts[len(attempts) // 2]
+            run['repeats'] = [attempt['wall_seconds'] for attempt in attempts]
+            runs.append(run)
+            stages = '  '.join(f"{stage} {seconds:.1f}s" for stage, seconds in run['stage_seconds'].items())
+            peak = f"{run['peak_rss_bytes'] / 2**20:.0f} MB" if run['peak_rss_bytes'] else "?"
+            print(f"{minutes:>5g} dk  {run['wall_seconds']:>8.1f}s  {run['rendered']}/{run['parts']} kısım  "
+                  f"verim {run['throughput']:.3f} çıktı sn/sn  bellek {peak}  {stages}")
+    finally:
+        server.shutdown()
+
+    report = {
+        'config': {'renderer': args.renderer, 'workers': args.workers, 'subtitle_mode': args.subtitle_mode,
+                   'whisper_rtf': args.whisper_rtf, 'llm_latency': args.llm_latency, 'cpu_count': os.cpu_count(),
+                   'python': sys.version.split()[0]},
+        'runs': runs,
+    }
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare_with_baseline(runs, baseline, args.tolerance)
+        if report['regressions']:
+            exit_code = 1
+            print(f"\n⚠️ Temel ölçüme göre %{args.tolerance * 100:.0f} toleransı aşan gerilemeler:")
+            for regression in report['regressions']:
+                print(f"  {regression['minutes']:g} dk  {regression['metric']:<20} {regression['baseline']:.3f} → "
+                      f"{regression['value']:.3f} ({regression['change']:+.1%})")
+        else:
+            print(f"\n✓ Temel ölçüme göre gerileme yok (tolerans %{args.tolerance * 100:.0f})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar kaydedildi: {args.json}")
+    if exit_code:
+        raise SystemExit(exit_code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="longtoshort performans ölçümleri")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    prompt_parser = subparsers.add_parser('prompt-tokens', help="Analiz istemi biçimlerinin token maliyetini karşılaştırır")
+    prompt_parser.add_argument('srt', nargs='+', help="Ölçülecek SRT dosyaları")
+    prompt_parser.add_argument('--model', default=os.getenv('OPENAI_MODEL', 'gpt-4'), help="tiktoken için model adı")
+    prompt_parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    prompt_parser.set_defaults(func=benchmark_prompt_tokens)
+
+    layout_parser = subparsers.add_parser('text-layout', help="Başlık yerleşimi süresini ölçer")
+    layout_parser.add_argument('--titles', help="Her satırında bir başlık olan metin dosyası")
+    layout_parser.add_argument('--font', default='DynaPuff/static/DynaPuff-Regular.ttf')
+    layout_parser.add_argument('--font-size', type=int, default=90)
+    layout_parser.add_argument('--width', type=int, default=1080 - 80)
+    layout_parser.add_argument('--height', type=int, default=240)
+    layout_parser.add_argument('--repeat', type=int, default=100, help="Sıcak önbellek ölçümü tekrar sayısı")
+    layout_parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    layout_parser.set_defaults(func=benchmark_text_layout)
+
+    import_parser = subparsers.add_parser('import-time', help="main.py içe aktarma süresini ve belleğini ölçer")
+    import_parser.add_argument('--repeat', type=int, default=5, help="Ölçüm tekrar sayısı")
+    import_parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                               help="-X importtime ile en pahalı N modülü listele")
+    import_parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    import_parser.set_defaults(func=benchmark_import_time)
+
+    e2e_parser = subparsers.add_parser('e2e', help="Sentetik videolar ve sahte servislerle uçtan uca hattı ölçer")
+    e2e_parser.add_argument('--minutes', type=float, nargs='+', default=list(E2E_MINUTES),
+                            help="Üretilecek kaynak video süreleri (dakika)")
+    e2e_parser.add_argument('--media-dir', default=os.path.join('.cache', 'benchmark'),
+                            help="Sentetik videoların saklandığı klasör (sonraki çalıştırmalarda yeniden kullanılır)")
+    e2e_parser.add_argument('--renderer', choices=('moviepy', 'ffmpeg', 'ffmpeg_batch'), default='ffmpeg')
+    e2e_parser.add_argument('--workers', type=int, help="Paralel render işçi sayısı")
+    e2e_parser.add_argument('--subtitle-mode', choices=('atlas', 'ass'))
+    e2e_parser.add_argument('--whisper-rtf', type=float, default=0.0,
+                            help="Sahte Whisper'ın taklit edeceği gerçek zaman faktörü (0 = bekleme yok)")
+    e2e_parser.add_argument('--llm-latency', type=float, default=0.0, help="Sahte OpenAI yanıt gecikmesi (saniye)")
+    e2e_parser.add_argument('--llm-parts', type=int, default=3, help="Her analiz isteğinde döndürülen kısım sayısı")
+    e2e_parser.add_argument('--llm-part-seconds', type=float, default=45, help="Döndürülen kısımların uzunluğu")
+    e2e_parser.add_argument('--repeat', type=int, default=1, help="Her süre için tekrar sayısı (ortanca raporlanır)")
+    e2e_parser.add_argument('--baseline', help="Karşılaştırılacak önceki e2e --json çıktısı")
+    e2e_parser.add_argument('--tolerance', type=float, default=0.10, help="Gerileme sayılacak göreli değişim")
+    e2e_parser.add_argument('--keep', action='store_true', help="Çalışma klasörlerini silme")
+    e2e_parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    e2e_parser.set_defaults(func=benchmark_e2e)
+
+    # benchmark_e2e'nin her video için ayrı süreçte çağırdığı iç komut
+    run_parser = subparsers.add_parser('e2e-run', help=argparse.SUPPRESS)
+    run_parser.add_argument('video')
+    run_parser.add_argument('--output', required=True)
+    run_parser.add_argument('--renderer', default='ffmpeg')
+    run_parser.add_argument('--workers', type=int)
+    run_parser.add_argument('--subtitle-mode')
+    run_parser.add_argument('--whisper-rtf', type=float, default=0.0)
+    run_parser.set_defaults(func=benchmark_e2e_run)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
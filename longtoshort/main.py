@@ -1,67 +1,326 @@
 import os
+import sys
 from dotenv import load_dotenv
-import yt_dlp
-from openai import OpenAI
-from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip, TextClip, ColorClip, concatenate_videoclips
 import json
 import re
-import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import io
-from moviepy.config import change_settings
 import textwrap
 from xml.etree import ElementTree as ET
 from datetime import datetime
 import subprocess
-import whisper
-import torch
-from faster_whisper import WhisperModel
 import srt
 import datetime as dt
 import time
+import functools
+import tempfile
+import shutil
+import concurrent.futures
+import hashlib
+import threading
+import queue
+import asyncio
+import bisect
+import sqlite3
+import socket
+import contextlib
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-# FFmpeg yolunu ekle
-os.environ["PATH"] += os.pathsep + r"D:\ffmpeg\bin"
+# Ağır bağımlılıklar (yt_dlp, openai, moviepy, cv2, faster_whisper) modül yüklenirken değil,
+# ihtiyaç duyan aşamada ilk kullanımda içe aktarılır.
 
-# ImageMagick yapılandırması
+# FFmpeg ve ImageMagick yolları (configure_environment ile uygulanır)
+FFMPEG_DIR = r"D:\ffmpeg\bin"
 IMAGEMAGICK_BINARY = r"C:\Program Files\ImageMagick-7.1.1-Q16-HDRI\magick.exe"
-change_settings({
-    "IMAGEMAGICK_BINARY": IMAGEMAGICK_BINARY
-})
+IMAGEMAGICK_FONT_DIR = r"C:\Windows\Fonts"
 
-# Font dosyasını Windows font klasöründen al
-font_path = r"C:\Windows\Fonts\ITCKRIST.TTF"
-try:
-    # ImageMagick'e font dosyasını tanıt
-    subprocess.run([
-        IMAGEMAGICK_BINARY,
-        'convert',
-        '-font', font_path,
-        '-list', 'font'
-    ], capture_output=True, text=True)
-    print("ImageMagick font listesi alındı")
-except Exception as e:
-    print(f"ImageMagick font listesi alınamadı: {str(e)}")
-
-# Font ayarlarını güncelle
-os.environ['IMAGEMAGICK_FONT'] = 'Arial'
-os.environ['IMAGEMAGICK_FONT_PATH'] = r"C:\Windows\Fonts"
-
-# MoviePy font ayarlarını güncelle
-change_settings({
-    "IMAGEMAGICK_BINARY": IMAGEMAGICK_BINARY,
-    "IMAGEMAGICK_FONT": 'Arial',
-    "IMAGEMAGICK_FONT_PATH": r"C:\Windows\Fonts"
-})
-
-# .env dosyasından API anahtarlarını yükle
+# .env dosyasından API anahtarlarını ve ayarları yükle
 load_dotenv()
 
-# OpenAI istemcisini oluştur
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 OPENAI_MODEL = os.getenv('OPENAI_MODEL')
 
+# FFmpeg renderer ayarları
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+SHORTS_RENDERER = os.getenv('SHORTS_RENDERER', 'moviepy')
+# Paralel render işçi sayısı ('auto' = çekirdek sayısına göre)
+SHORTS_WORKERS = os.getenv('SHORTS_WORKERS', '1')
+# Transkript sürerken analiz ve render başlatılsın mı
+SHORTS_STREAMING = os.getenv('SHORTS_STREAMING', '0') == '1'
+
+# Transkript ayarları ("auto": CPU'da int8, GPU'da float16)
+TRANSCRIPTION_DEFAULTS = {
+    'model_size': os.getenv('WHISPER_MODEL', 'small'),
+    'device': os.getenv('WHISPER_DEVICE', 'auto'),
+    'compute_type': os.getenv('WHISPER_COMPUTE_TYPE', 'auto'),
+    'beam_size': int(os.getenv('WHISPER_BEAM_SIZE', '5')),
+    'cpu_threads': int(os.getenv('WHISPER_CPU_THREADS', '0')),
+    'num_workers': int(os.getenv('WHISPER_NUM_WORKERS', '1')),
+}
+# Bu süreden uzun sesler sessizliklerden bölünüp paralel transkript edilir
+LONG_FORM_MIN_SECONDS = float(os.getenv('WHISPER_LONG_FORM_MIN_SECONDS', '1200'))
+LONG_FORM_CHUNK_SECONDS = float(os.getenv('WHISPER_LONG_FORM_CHUNK_SECONDS', '300'))
+
+# Hazırlanmış arka planlar ve diğer ara çıktılar için önbellek klasörü
+CACHE_DIR = os.getenv('LONGTOSHORT_CACHE_DIR', '.cache')
+TRANSCRIPT_CACHE_MAX_BYTES = int(float(os.getenv('TRANSCRIPT_CACHE_MAX_MB', '512')) * 1024 * 1024)
+# LLM yanıt önbelleği: readwrite, replay (sadece okur, eksikte hata verir) veya off
+LLM_CACHE_MODE = os.getenv('LLM_CACHE_MODE', 'readwrite')
+LLM_CACHE_TTL_SECONDS = float(os.getenv('LLM_CACHE_TTL_DAYS', '30')) * 24 * 3600
+LLM_CACHE_MAX_BYTES = int(float(os.getenv('LLM_CACHE_MAX_MB', '64')) * 1024 * 1024)
+# Kaldığı yerden devam eden iş kuyruğunun SQLite veritabanı
+JOB_DB_PATH = os.getenv('JOB_DB_PATH', os.path.join(CACHE_DIR, 'jobs.sqlite3'))
+# Aşama profili: verilirse süre/CPU/bellek/IO raporu bu JSON dosyasına (ve .trace.json'a) yazılır
+PROFILE_OUTPUT = os.getenv('SHORTS_PROFILE', '')
+
+_environment_lock = threading.Lock()
+_environment_configured = False
+
+def configure_environment():
+    """FFmpeg klasörünü PATH'e ve ImageMagick font ayarlarını ortama bir kez ekler"""
+    global _environment_configured
+    if _environment_configured:
+        return
+    with _environment_lock:
+        if _environment_configured:
+            return
+        # FFmpeg yolunu ekle
+        if FFMPEG_DIR not in os.environ.get("PATH", "").split(os.pathsep):
+            os.environ["PATH"] += os.pathsep + FFMPEG_DIR
+        # Font ayarlarını güncelle
+        os.environ.setdefault('IMAGEMAGICK_FONT', 'Arial')
+        os.environ.setdefault('IMAGEMAGICK_FONT_PATH', IMAGEMAGICK_FONT_DIR)
+        _environment_configured = True
+
+@functools.lru_cache(maxsize=None)
+def check_imagemagick():
+    """MoviePy'nin ImageMagick ayarlarını uygular ve ImageMagick'in çalıştığını bir kez kontrol eder
+
+    Sadece TextClip gibi ImageMagick gerektiren yollar çağırır; sonuç süreç boyunca önbellekte kalır.
+    """
+    configure_environment()
+    from moviepy.config import change_settings
+
+    # MoviePy font ayarlarını güncelle
+    change_settings({
+        "IMAGEMAGICK_BINARY": IMAGEMAGICK_BINARY,
+        "IMAGEMAGICK_FONT": 'Arial',
+        "IMAGEMAGICK_FONT_PATH": IMAGEMAGICK_FONT_DIR
+    })
+    try:
+        # ImageMagick'e font dosyasını tanıt
+        result = subprocess.run([
+            IMAGEMAGICK_BINARY,
+            'convert',
+            '-font', os.path.join(IMAGEMAGICK_FONT_DIR, 'ITCKRIST.TTF'),
+            '-list', 'font'
+        ], capture_output=True, text=True)
+        print("ImageMagick font listesi alındı")
+        return result.returncode == 0
+    except Exception as e:
+        print(f"ImageMagick font listesi alınamadı: {str(e)}")
+        return False
+
+@functools.lru_cache(maxsize=None)
+def get_openai_client():
+    """OpenAI istemcisini ilk kullanımda oluşturur (OPENAI_BASE_URL ortam değişkenini dikkate alır)"""
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+_profile_enabled = bool(PROFILE_OUTPUT)
+_profile_lock = threading.Lock()
+_profile_spans = []
+_profile_local = threading.local()
+_profile_ids = iter(range(1, 2 ** 62))
+_NULL_SPAN = contextlib.nullcontext()
+
+def enable_profiling(enabled=True):
+    """Aşama profilini açar/kapatır; alt süreçler de ortam değişkeniyle açık başlar"""
+    global _profile_enabled
+    _profile_enabled = enabled
+    if enabled:
+        os.environ['SHORTS_PROFILE'] = os.environ.get('SHORTS_PROFILE') or '1'
+    else:
+        os.environ.pop('SHORTS_PROFILE', None)
+
+def read_process_io():
+    """Sürecin okuduğu/yazdığı bayt sayılarını /proc/self/io'dan okur (Linux dışında boş döner)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return {name: int(fields[name]) for name in ('rchar', 'wchar', 'read_bytes', 'write_bytes')}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def read_peak_rss():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımını bayt olarak döndürür"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kilobayt, macOS bayt döndürür
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def read_children_cpu():
+    """Beklenmiş alt süreçlerin (FFmpeg vb.) toplam CPU süresini döndürür"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+@contextlib.contextmanager
+def _record_span(name, attrs):
+    """Açık profil için span ölçümünü yapar ve kaydı listeye ekler"""
+    stack = getattr(_profile_local, 'stack', None)
+    if stack is None:
+        stack = _profile_local.stack = []
+    record = {
+        'id': next(_profile_ids),
+        'parent': stack[-1]['id'] if stack else None,
+        'depth': len(stack),
+        'name': name,
+        'attrs': attrs,
+        'pid': os.getpid(),
+        'tid': threading.get_ident(),
+        'thread': threading.current_thread().name,
+        'error': None,
+    }
+    stack.append(record)
+    io_start = read_process_io()
+    children_cpu_start = read_children_cpu()
+    cpu_start = time.process_time()
+    thread_cpu_start = time.thread_time()
+    record['start'] = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['wall_seconds'] = time.perf_counter() - record['start']
+        record['thread_cpu_seconds'] = time.thread_time() - thread_cpu_start
+        record['cpu_seconds'] = time.process_time() - cpu_start
+        record['children_cpu_seconds'] = read_children_cpu() - children_cpu_start
+        record['peak_rss_bytes'] = read_peak_rss()
+        io_end = read_process_io()
+        record['io'] = {key: io_end[key] - io_start[key] for key in io_end if key in io_start}
+        stack.pop()
+        with _profile_lock:
+            _profile_spans.append(record)
+
+def span(name, **attrs):
+    """Bir kod bloğunun süresini, CPU'sunu, bellek zirvesini ve IO'sunu ölçen bağlam yöneticisi
+
+    Profil kapalıyken paylaşılan boş bir bağlam döndürür, yani maliyeti tek bir kontroldür.
+    Span'ler iş parçacığı başına yığında tutulur ve iç içe geçebilir. CPU, bellek ve IO
+    değerleri süreç geneli olduğundan eşzamanlı iş parçacıklarının katkısını da içerir.
+    """
+    if not _profile_enabled:
+        return _NULL_SPAN
+    return _record_span(name, attrs)
+
+def traced(name=None):
+    """Fonksiyonun her çağrısını bir span olarak kaydeden dekoratör"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profile_enabled:
+                return func(*args, **kwargs)
+            with _record_span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def take_profile_spans():
+    """Bu süreçte kaydedilmiş span'leri döndürür ve listeyi boşaltır (işçi süreçlerden aktarmak için)
+
+    fork ile başlayan işçiler ana sürecin kayıtlarını da kopyaladığı için onlar atlanır.
+    """
+    pid = os.getpid()
+    with _profile_lock:
+        spans = [record for record in _profile_spans if record['pid'] == pid]
+        _profile_spans.clear()
+    return spans
+
+def merge_profile_spans(spans):
+    """Başka bir süreçte kaydedilmiş span'leri bu sürecin profiline ekler"""
+    if spans:
+        with _profile_lock:
+            _profile_spans.extend(spans)
+
+def build_profile_report(spans=None):
+    """Span listesinden aşama adına göre toplanmış makine tarafından okunabilir rapor oluşturur"""
+    if spans is None:
+        with _profile_lock:
+            spans = list(_profile_spans)
+    origin = min((record['start'] for record in spans), default=0.0)
+    stages = {}
+    for record in spans:
+        stage = stages.setdefault(record['name'], {
+            'count': 0, 'errors': 0, 'wall_seconds': 0.0, 'max_wall_seconds': 0.0, 'cpu_seconds': 0.0,
+            'children_cpu_seconds': 0.0, 'peak_rss_bytes': 0, 'read_bytes': 0, 'write_bytes': 0,
+        })
+        stage['count'] += 1
+        stage['errors'] += record['error'] is not None
+        stage['wall_seconds'] += record['wall_seconds']
+        stage['max_wall_seconds'] = max(stage['max_wall_seconds'], record['wall_seconds'])
+        stage['cpu_seconds'] += record['cpu_seconds']
+        stage['children_cpu_seconds'] += record['children_cpu_seconds']
+        stage['peak_rss_bytes'] = max(stage['peak_rss_bytes'], record['peak_rss_bytes'] or 0)
+        stage['read_bytes'] += record['io'].get('read_bytes', 0)
+        stage['write_bytes'] += record['io'].get('write_bytes', 0)
+    return {
+        'stages': stages,
+        'spans': [dict(record, start=record['start'] - origin) for record in sorted(spans, key=lambda r: r['start'])],
+    }
+
+def build_chrome_trace(spans=None):
+    """Span'leri chrome://tracing / Perfetto'nun okuduğu trace-event biçimine çevirir"""
+    if spans is None:
+        with _profile_lock:
+            spans = list(_profile_spans)
+    origin = min((record['start'] for record in spans), default=0.0)
+    events = []
+    for record in spans:
+        args = dict(record['attrs'])
+        args.update({key: record[key] for key in ('cpu_seconds', 'thread_cpu_seconds', 'children_cpu_seconds',
+                                                  'peak_rss_bytes', 'io', 'error')})
+        events.append({
+            'name': record['name'],
+            'cat': 'longtoshort',
+            'ph': 'X',
+            'ts': (record['start'] - origin) * 1e6,
+            'dur': record['wall_seconds'] * 1e6,
+            'pid': record['pid'],
+            'tid': record['tid'],
+            'args': args,
+        })
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': record['pid'], 'tid': record['tid'],
+                       'args': {'name': record['thread']}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def write_profile_report(path=None):
+    """Profil raporunu JSON'a ve Chrome trace dosyasına (<ad>.trace.json) yazar"""
+    path = path or PROFILE_OUTPUT
+    if not path or path == '1':
+        path = os.path.join(CACHE_DIR, 'profile.json')
+    with _profile_lock:
+        spans = list(_profile_spans)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(build_profile_report(spans), f, ensure_ascii=False, indent=2)
+    trace_path = os.path.splitext(path)[0] + '.trace.json'
+    with open(trace_path, 'w', encoding='utf-8') as f:
+        json.dump(build_chrome_trace(spans), f)
+    print(f"\nProfil raporu kaydedildi: {path} (Chrome trace: {trace_path})")
+    return path, trace_path
+
 def extract_video_id(url):
     """YouTube URL'sinden video ID'sini çıkarır"""
     patterns = [
@@ -155,8 +414,12 @@ def read_vtt_file(file_path):
         traceback.print_exc()
         return ""
 
+@traced()
 def download_video(url, subtitle_choice='1'):
     """YouTube videosunu indirir"""
+    configure_environment()
+    import yt_dlp
+
     video_id = extract_video_id(url)
     if not video_id:
         raise ValueError("Geçersiz YouTube URL'si")
@@ -379,101 +642,147 @@ def extract_subtitles(info, subtitle_choice='1'):
         return "", False  # Altyazıları gösterme
 
 def smart_wrap_text(text, font, max_width):
-    """Metni piksel genişliğine göre akıllıca satırlara böler"""
+    """Metni piksel genişliğine göre akıllıca satırlara böler
+
+    Kelime genişlikleri önbellekten alınır ve satır genişliği kelime kelime toplanır,
+    böylece her kelime için büyüyen satırın yeniden ölçülmesi gerekmez.
+    """
     lines = []
     current_line_words = []
-    
-    # Create a dummy ImageDraw object to measure text width
-    dummy_img = Image.new('RGBA', (1, 1))
-    dummy_draw = ImageDraw.Draw(dummy_img)
+    current_width = 0.0
+    space_width = measure_text_width(font.path, font.size, " ")
 
-    words = text.split()
-    for word in words:
-        test_line = " ".join(current_line_words + [word])
-        # Calculate text width using the font
-        bbox = dummy_draw.textbbox((0,0), test_line, font=font)
-        text_width = bbox[2] - bbox[0]
+    for word in text.split():
+        word_width = measure_text_width(font.path, font.size, word)
+        test_width = current_width + space_width + word_width if current_line_words else word_width
 
-        if text_width <= max_width:
+        if test_width <= max_width:
             current_line_words.append(word)
-        else:
-            if current_line_words: # Add the current line if it's not empty
-                lines.append(" ".join(current_line_words))
-            
-            # Eğer tek kelime bile sığmıyorsa, kelimeyi böl
-            if not current_line_words:
-                if len(word) > 10:  # Sadece uzun kelimeleri böl
-                    # Kelimeyi hecelere böl
-                    syllables = []
-                    current_syllable = ""
-                    for char in word:
-                        current_syllable += char
-                        if len(current_syllable) >= 3:  # En az 3 karakterlik heceler
-                            syllables.append(current_syllable)
-                            current_syllable = ""
-                    if current_syllable:
-                        syllables.append(current_syllable)
-                    
-                    # Heceleri satırlara böl
-                    current_syllable_line = ""
-                    for syllable in syllables:
-                        test_syllable_line = current_syllable_line + syllable
-                        bbox = dummy_draw.textbbox((0,0), test_syllable_line, font=font)
-                        if bbox[2] - bbox[0] <= max_width:
-                            current_syllable_line = test_syllable_line
-                        else:
-                            if current_syllable_line:
-                                lines.append(current_syllable_line)
-                            current_syllable_line = syllable
-                    if current_syllable_line:
-                        lines.append(current_syllable_line)
-                else:
-                    lines.append(word)
-            else:
+            current_width = test_width
+            continue
+
+        if current_line_words: # Add the current line if it's not empty
+            lines.append(" ".join(current_line_words))
+            current_line_words = []
+            current_width = 0.0
+            if word_width <= max_width:
                 # Start a new line with the current word
                 current_line_words = [word]
-            
+                current_width = word_width
+                continue
+
+        # Eğer tek kelime bile sığmıyorsa, kelimeyi böl
+        if len(word) > 10:  # Sadece uzun kelimeleri böl
+            # Kelimeyi en az 3 karakterlik hecelere böl
+            syllables = [word[k:k + 3] for k in range(0, len(word), 3)]
+
+            # Heceleri satırlara böl
+            current_syllable_line = ""
+            syllable_line_width = 0.0
+            for syllable in syllables:
+                syllable_width = measure_text_width(font.path, font.size, syllable)
+                if syllable_line_width + syllable_width <= max_width:
+                    current_syllable_line += syllable
+                    syllable_line_width += syllable_width
+                else:
+                    if current_syllable_line:
+                        lines.append(current_syllable_line)
+                    current_syllable_line = syllable
+                    syllable_line_width = syllable_width
+            if current_syllable_line:
+                lines.append(current_syllable_line)
+        else:
+            lines.append(word)
+
     if current_line_words:
         lines.append(" ".join(current_line_words))
     
     return '\n'.join(lines)
 
-def analyze_content(text, duration, srt_path=None):
-    """ChatGPT ile içeriği analiz eder ve viral kısımları belirler"""
-    print(f"\nAltyazı metni uzunluğu: {len(text)} karakter")
-    print("İlk 500 karakter:", text[:500])
-    print(f"\nVideo süresi: {duration} saniye")
-    
-    # Eğer metin çok kısaysa, Whisper'ın daha iyi sonuç vermesi için bekle
-    if not text or len(text) < 50:
-        print("Uyarı: Altyazı metni çok kısa! Whisper'ın daha iyi sonuç vermesi için bekleniyor...")
-        print("Lütfen Whisper'ın transkript işlemini tamamlamasını bekleyin.")
-        return []
-    
-    # Eğer SRT dosyası varsa, zaman damgalarını kullan
-    if srt_path and os.path.exists(srt_path):
-        try:
-            print("SRT dosyasından zaman damgaları alınıyor...")
-            with open(srt_path, 'r', encoding='utf-8') as f:
-                subs = list(srt.parse(f.read()))
-            
-            # Zaman damgalı metin oluştur
-            timed_text = ""
-            for sub in subs:
-                start_sec = sub.start.total_seconds()
-                end_sec = sub.end.total_seconds()
-                timed_text += f"[{start_sec:.1f}s-{end_sec:.1f}s] {sub.content}\n"
-            
-            print(f"Zaman damgalı metin oluşturuldu: {len(timed_text)} karakter")
-            text = timed_text
-        except Exception as e:
-            print(f"SRT dosyası okuma hatası: {str(e)}")
+# LLM yanıt önbelleği sayaçları
+llm_cache_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'expired': 0}
+_llm_cache_lock = threading.Lock()
+
+def llm_cache_key(model, system_prompt, user_prompt, temperature):
+    """Model, sistem istemi, kullanıcı istemi ve sıcaklıktan önbellek anahtarı üretir"""
+    payload = json.dumps([model, system_prompt, user_prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def llm_cache_lookup(cache_key):
+    """Önbellekteki LLM yanıtını döndürür; yoksa veya süresi dolduysa None döndürür"""
+    if LLM_CACHE_MODE == 'off':
+        return None
+    entry = cache_read_json('llm', cache_key)
+    with _llm_cache_lock:
+        if entry is not None and LLM_CACHE_TTL_SECONDS and time.time() - entry.get('created', 0) > LLM_CACHE_TTL_SECONDS:
+            llm_cache_stats['expired'] += 1
+            entry = None
+        if entry is None:
+            llm_cache_stats['misses'] += 1
+            return None
+        llm_cache_stats['hits'] += 1
+    return entry['content']
+
+def llm_cache_store(cache_key, content):
+    """Doğrulanmış LLM yanıtını önbelleğe yazar (replay ve kapalı modda yazmaz)"""
+    if LLM_CACHE_MODE != 'readwrite':
+        return
+    cache_write_json('llm', cache_key, {'content': content, 'created': time.time()},
+                     max_bytes=LLM_CACHE_MAX_BYTES)
+    with _llm_cache_lock:
+        llm_cache_stats['stores'] += 1
+
+# Analiz istemindeki transkript biçimi: 'timed' her satıra [başlangıç-bitiş] yazar,
+# 'compact' ardışık segmentleri tek zaman çapalı (@saniye) bloklarda birleştirir
+ANALYSIS_PROMPT_ENCODING = os.getenv('ANALYSIS_PROMPT_ENCODING', 'timed').lower()
+ANALYSIS_STRIP_FILLER = os.getenv('ANALYSIS_STRIP_FILLER', '').lower() in ('1', 'true', 'yes')
+
+# Compact blok sınırları: en az bu kadar saniye sonra cümle sonunda, en geç bu kadar saniyede kapanır
+COMPACT_MIN_BLOCK_SECONDS = 10
+COMPACT_MAX_BLOCK_SECONDS = 30
+COMPACT_PAUSE_SECONDS = 2.0
+FILLER_PATTERN = re.compile(r'(?<!\w)(?:e+h*|ı+h*|hı+m*|h?m{2,}|u+[mh]+|a+h+)(?!\w)[,.]?\s*', re.IGNORECASE)
+SENTENCE_END_PATTERN = re.compile(r'[.!?…]["\')]*$')
+
+ANALYSIS_SYSTEM_PROMPT = "Sen bir video içerik analisti ve başlık uzmanısın. Verilen Whisper transkriptini analiz edip en ilgi çekici kısımları bulacak ve her kısım için içerikle tamamen ilgili, özgün başlıklar oluşturacaksın. Kısımları eşit bölme, içeriğin doğal akışına göre viral potansiyeli yüksek kısımları seç. Her kısım 15-120 saniye arasında olmalı. Başlıklar ve açıklamalar Türkçe olmalı ve altyazı metninden alınmalı. ZAMAN DAMGALARINI MUTLAKA KULLAN! Verilen [başlangıçsaniye-bitişsaniye] formatındaki zamanları start ve end değerleri olarak kullan. Tahmin etme, verilen zamanları kullan! Yanıtını KESİNLİKLE JSON array formatında ver, başka hiçbir açıklama ekleme. Boş array döndürme, en az bir kısım belirt."
+
+ANALYSIS_SYSTEM_PROMPT_COMPACT = ANALYSIS_SYSTEM_PROMPT.replace(
+    "Verilen [başlangıçsaniye-bitişsaniye] formatındaki zamanları",
+    "Satır başlarındaki @başlangıçsaniye çapalarını"
+)
+
+def analysis_system_prompt(encoding=None):
+    """Transkript biçimine uygun sistem istemini döndürür"""
+    if (encoding or ANALYSIS_PROMPT_ENCODING) == 'compact':
+        return ANALYSIS_SYSTEM_PROMPT_COMPACT
+    return ANALYSIS_SYSTEM_PROMPT
+
+# Bu token sayısını aşan transkriptler pencerelere bölünerek analiz edilir
+ANALYSIS_WINDOW_TOKENS = int(os.getenv('ANALYSIS_WINDOW_TOKENS', '6000'))
+ANALYSIS_CONCURRENCY = int(os.getenv('ANALYSIS_CONCURRENCY', '4'))
+
+COMPACT_FORMAT_NOTE = """ÖNEMLİ: Bu altyazı Whisper ile otomatik olarak oluşturulmuştur ve zaman çapaları içermektedir.
+    Her satır @başlangıçsaniye çapasıyla başlar; satırın bitişi bir sonraki satırın çapasıdır.
+    Son satırdaki tek başına çapa videonun konuşma bitişidir.
+    Bu çapaları kullanarak doğru süreleri belirle.
     
-    prompt = f"""
-    Aşağıdaki video altyazısını analiz et ve en ilgi çekici, viral olabilecek kısımları belirle.
-    Her kısım için başlangıç ve bitiş sürelerini, başlığı ve açıklamayı belirt.
+    ÖRNEK:
+    @0.0 Merhaba arkadaşlar. Bugün size çok önemli bir konudan bahsedeceğim.
+    @8.0 Bu konu gerçekten çok ilginç
+    @12.5
     
-    ÖNEMLİ: Bu altyazı Whisper ile otomatik olarak oluşturulmuştur ve zaman damgaları içermektedir.
+    Bu durumda:
+    - İlk kısım: start=0.0, end=8.0, title="Önemli Konu Hakkında"
+    - İkinci kısım: start=8.0, end=12.5, title="Çok İlginç Bir Konu"
+    """
+
+def build_analysis_prompt(text, duration, encoding=None):
+    """Viral kısım analizi için kullanıcı istemini oluşturur"""
+    if (encoding or ANALYSIS_PROMPT_ENCODING) == 'compact':
+        format_note = COMPACT_FORMAT_NOTE
+        timestamp_rule = "@başlangıçsaniye çapalarını start ve end değerleri olarak kullan"
+    else:
+        format_note = """ÖNEMLİ: Bu altyazı Whisper ile otomatik olarak oluşturulmuştur ve zaman damgaları içermektedir.
     Her satır [başlangıçsaniye-bitişsaniye] formatında zaman damgası içerir.
     Bu zaman damgalarını kullanarak doğru süreleri belirle.
     
@@ -485,7 +794,13 @@ def analyze_content(text, duration, srt_path=None):
     Bu durumda:
     - İlk kısım: start=0.0, end=2.5, title="Merhaba Arkadaşlar"
     - İkinci kısım: start=2.5, end=5.0, title="Önemli Konu Hakkında"
+    """
+        timestamp_rule = "[başlangıçsaniye-bitişsaniye] formatındaki zamanları start ve end değerleri olarak kullan"
+    return f"""
+    Aşağıdaki video altyazısını analiz et ve en ilgi çekici, viral olabilecek kısımları belirle.
+    Her kısım için başlangıç ve bitiş sürelerini, başlığı ve açıklamayı belirt.
     
+    {format_note}
     Yanıtını aşağıdaki formatta ver:
 
     [
@@ -526,112 +841,339 @@ def analyze_content(text, duration, srt_path=None):
     15. Her kısım için başlık, o kısımdaki zaman aralığındaki içerikle tamamen ilgili olmalı
     16. Konu bütünlüğü olan kısımlar seç, yarım kalmış cümleler olmasın
     17. Viral potansiyeli yüksek kısımlar: şok edici bilgiler, komik anlar, önemli açıklamalar, ilginç hikayeler
-    18. Zaman damgalarını doğru kullan! [başlangıçsaniye-bitişsaniye] formatındaki zamanları start ve end değerleri olarak kullan
+    18. Zaman damgalarını doğru kullan! {timestamp_rule}
     19. Her kısım için başlık, o kısımdaki zaman aralığındaki içerikle tamamen ilgili olmalı
     20. Zaman damgalarını mutlaka kullan! Tahmin etme, verilen zamanları kullan!
 
     Altyazı (zaman damgaları ile):
     {text}
     """
+
+def build_timed_text(subs):
+    """Altyazılardan [başlangıç-bitiş] zaman damgalı metin oluşturur"""
+    timed_text = ""
+    for sub in subs:
+        start_sec = sub.start.total_seconds()
+        end_sec = sub.end.total_seconds()
+        timed_text += f"[{start_sec:.1f}s-{end_sec:.1f}s] {sub.content}\n"
+    return timed_text
+
+def strip_filler_words(text):
+    """Konuşmadaki dolgu seslerini (ee, ıı, hmm...) metinden çıkarır"""
+    return ' '.join(FILLER_PATTERN.sub(' ', text).split())
+
+def build_compact_text(subs, strip_filler=None):
+    """Ardışık altyazıları tek @başlangıç çapalı bloklarda birleştirir
+
+    Blok, en az COMPACT_MIN_BLOCK_SECONDS sonra bir cümle bittiğinde, COMPACT_PAUSE_SECONDS'tan
+    uzun bir sessizlikte veya COMPACT_MAX_BLOCK_SECONDS dolduğunda kapanır. Son satırdaki
+    tek başına çapa, son bloğun bitiş zamanıdır.
+    """
+    strip_filler = ANALYSIS_STRIP_FILLER if strip_filler is None else strip_filler
+    lines = []
+    block_start = None
+    block_texts = []
+    last_end = None
+    for sub in subs:
+        content = ' '.join(sub.content.split())
+        if strip_filler:
+            content = strip_filler_words(content)
+        if not content:
+            continue
+        start_sec = sub.start.total_seconds()
+        # Uzun bir sessizlik yeni paragraf başlatır
+        if block_texts and start_sec - last_end > COMPACT_PAUSE_SECONDS:
+            lines.append(f"@{block_start:.1f} {' '.join(block_texts)}")
+            block_texts = []
+        if not block_texts:
+            block_start = start_sec
+        block_texts.append(content)
+        last_end = sub.end.total_seconds()
+        block_length = last_end - block_start
+        if block_length >= COMPACT_MAX_BLOCK_SECONDS or (
+                block_length >= COMPACT_MIN_BLOCK_SECONDS and SENTENCE_END_PATTERN.search(content)):
+            lines.append(f"@{block_start:.1f} {' '.join(block_texts)}")
+            block_texts = []
+    if block_texts:
+        lines.append(f"@{block_start:.1f} {' '.join(block_texts)}")
+    if last_end is None:
+        return ""
+    lines.append(f"@{last_end:.1f}")
+    return '\n'.join(lines) + '\n'
+
+def build_transcript_text(subs, encoding=None):
+    """Altyazıları seçilen istem biçiminde (timed/compact) metne çevirir"""
+    if (encoding or ANALYSIS_PROMPT_ENCODING) == 'compact':
+        return build_compact_text(subs)
+    return build_timed_text(subs)
+
+def snap_parts_to_segments(parts, subs):
+    """Modelin döndürdüğü zamanları en yakın segment başlangıç/bitişlerine oturtur
+
+    Oturtma kısmı 15-120 saniye aralığının dışına çıkarırsa özgün değerler korunur.
+    """
+    if not subs:
+        return parts
+    starts = [sub.start.total_seconds() for sub in subs]
+    ends = sorted(sub.end.total_seconds() for sub in subs)
+
+    def nearest(values, target):
+        i = bisect.bisect_left(values, target)
+        candidates = values[max(0, i - 1):i + 1]
+        return min(candidates, key=lambda value: abs(value - target))
+
+    for part in parts:
+        start = nearest(starts, part['start_time'])
+        end = nearest(ends, part['end_time'])
+        if 15 <= end - start <= 120:
+            part['start_time'] = start
+            part['end_time'] = end
+            part['sentence_start'] = start
+    return parts
+
+def estimate_tokens(text):
+    """Metnin yaklaşık token sayısını tahmin eder (~4 karakter/token)"""
+    return len(text) // 4 + 1
+
+def extract_json_array(content):
+    """Yanıttan JSON array'i çıkarır; bozuk veya yarım çıktıda tam nesneleri kurtarır
+
+    (öğeler, tam_mı) döndürür. tam_mı=False ise yanıt kesilmiş veya bozuktur.
+    """
+    # Kod bloğu işaretlerini (```json ... ```) temizle
+    content = re.sub(r'```(?:json)?', '', content).strip()
+    start = content.find('[')
+    end = content.rfind(']')
+    if start != -1 and end > start:
+        try:
+            result = json.loads(content[start:end + 1])
+            if isinstance(result, list):
+                return result, True
+        except json.JSONDecodeError:
+            pass
+    elif start == -1 and content.startswith('{'):
+        # Tek bir nesne döndürülmüşse listeye çevir
+        try:
+            result = json.loads(content)
+            if isinstance(result, dict):
+                return [result], True
+        except json.JSONDecodeError:
+            pass
+
+    # Kurtarma: metindeki tüm tam JSON nesnelerini sırayla çöz
+    decoder = json.JSONDecoder()
+    items = []
+    position = content.find('{', max(start, 0))
+    while position != -1:
+        try:
+            item, next_position = decoder.raw_decode(content, position)
+            if isinstance(item, dict):
+                items.append(item)
+            position = content.find('{', next_position)
+        except json.JSONDecodeError:
+            position = content.find('{', position + 1)
+    return items, False
+
+def parse_time_value(value):
+    """Sayı veya "12.5", "12.5s", "01:02.5" gibi metinleri saniyeye çevirir"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = value.strip().rstrip('sS').strip()
+        try:
+            return convert_vtt_time_to_seconds(value) if ':' in value else float(value)
+        except ValueError:
+            return None
+    return None
+
+def normalize_analysis_part(part, duration):
+    """Tek bir kısmı doğrular; düzeltilebiliyorsa düzeltir, düzeltilemiyorsa None döndürür"""
+    if not isinstance(part, dict):
+        return None
+    start = parse_time_value(part.get('start', part.get('start_time')))
+    end = parse_time_value(part.get('end', part.get('end_time')))
+    title = part.get('title')
+    description = part.get('description', part.get('reason')) or title
+    if start is None or end is None or not isinstance(title, str) or not title.strip():
+        return None
+    if not isinstance(description, str):
+        description = title
+
+    # Süreleri video sınırlarına kırp
+    start = max(0.0, start)
+    if duration:
+        end = min(end, float(duration))
+    if start >= end:
+        return None
+
+    # Süre kontrolü (15-120 saniye)
+    part_duration = end - start
+    if part_duration < 15:
+        print(f"Uyarı: Kısım çok kısa ({part_duration} saniye), 15 saniyeye çıkarılıyor...")
+        end = start + 15
+        if duration and end > duration:
+            # Video sonuna taşıyorsa başlangıcı geri çek
+            end = float(duration)
+            start = max(0.0, end - 15)
+    elif part_duration > 120:
+        print(f"Uyarı: Kısım çok uzun ({part_duration} saniye), 120 saniyeye kısaltılıyor...")
+        end = start + 120
+
+    title = title.strip()
+    if len(title) > 50:
+        title = title[:47] + "..."
+    if len(description) > 100:
+        description = description[:97] + "..."
+
+    return {
+        "start_time": start,
+        "end_time": end,
+        "title": title,
+        "reason": description,
+        "speaker_detected": False,
+        "speaker_time": None,
+        "context": description,
+        "sentence_start": start
+    }
+
+def uncovered_subs(subs, parts):
+    """Orta noktası hiçbir kısmın aralığına düşmeyen altyazıları sırasıyla döndürür"""
+    ranges = [(part['start_time'], part['end_time']) for part in parts]
+    remaining = []
+    for sub in subs:
+        middle = (sub.start.total_seconds() + sub.end.total_seconds()) / 2
+        if not any(start <= middle <= end for start, end in ranges):
+            remaining.append(sub)
+    return remaining
+
+def parse_analysis_response(content, duration):
+    """ChatGPT yanıtını kısım kısım doğrular; geçersiz kısımları atar
+
+    (kısımlar, tam_mı) döndürür. Hiç geçerli kısım yoksa ValueError fırlatır.
+    """
+    items, complete = extract_json_array(content)
+    parts = []
+    for item in items:
+        part = normalize_analysis_part(item, duration)
+        if part is None:
+            print(f"Uyarı: Geçersiz kısım atlandı: {str(item)[:200]}")
+            continue
+        parts.append(part)
+    if not complete:
+        print(f"Uyarı: Yanıt bozuk veya yarım, {len(parts)} kısım kurtarıldı")
+    if not parts:
+        raise ValueError("ChatGPT yanıtında geçerli kısım bulunamadı")
+    return parts, complete
+
+@traced()
+def analyze_content(text, duration, srt_path=None, subs=None, video_path=None):
+    """ChatGPT ile içeriği analiz eder ve viral kısımları belirler
+
+    subs verilirse zaman damgaları SRT dosyası yerine bu altyazı listesinden alınır.
+    video_path verilirse basit analize düşüldüğünde ses enerjisi de puana katılır.
+    Zaman damgalı metin ANALYSIS_WINDOW_TOKENS'ı aşarsa pencereli analiz kullanılır.
+    """
+    print(f"\nAltyazı metni uzunluğu: {len(text)} karakter")
+    print("İlk 500 karakter:", text[:500])
+    print(f"\nVideo süresi: {duration} saniye")
     
-    max_retries = 3
-    for attempt in range(max_retries):
+    # Eğer metin çok kısaysa, Whisper'ın daha iyi sonuç vermesi için bekle
+    if not text or len(text) < 50:
+        print("Uyarı: Altyazı metni çok kısa! Whisper'ın daha iyi sonuç vermesi için bekleniyor...")
+        print("Lütfen Whisper'ın transkript işlemini tamamlamasını bekleyin.")
+        return []
+    
+    # Eğer SRT dosyası varsa, zaman damgalarını kullan
+    if subs is not None or (srt_path and os.path.exists(srt_path)):
         try:
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "Sen bir video içerik analisti ve başlık uzmanısın. Verilen Whisper transkriptini analiz edip en ilgi çekici kısımları bulacak ve her kısım için içerikle tamamen ilgili, özgün başlıklar oluşturacaksın. Kısımları eşit bölme, içeriğin doğal akışına göre viral potansiyeli yüksek kısımları seç. Her kısım 15-120 saniye arasında olmalı. Başlıklar ve açıklamalar Türkçe olmalı ve altyazı metninden alınmalı. ZAMAN DAMGALARINI MUTLAKA KULLAN! Verilen [başlangıçsaniye-bitişsaniye] formatındaki zamanları start ve end değerleri olarak kullan. Tahmin etme, verilen zamanları kullan! Yanıtını KESİNLİKLE JSON array formatında ver, başka hiçbir açıklama ekleme. Boş array döndürme, en az bir kısım belirt."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
+            if subs is None:
+                print("SRT dosyasından zaman damgaları alınıyor...")
+                with open(srt_path, 'r', encoding='utf-8') as f:
+                    subs = list(srt.parse(f.read()))
             
-            content = response.choices[0].message.content.strip()
-            print("\nChatGPT yanıtı:", content[:500])
+            # Zaman damgalı metin oluştur
+            timed_text = build_transcript_text(subs)
             
-            # JSON formatını temizle
-            content = content.strip()
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
+            print(f"Zaman damgalı metin oluşturuldu: {len(timed_text)} karakter")
+            text = timed_text
+        except Exception as e:
+            print(f"SRT dosyası okuma hatası: {str(e)}")
+    
+    # Uzun transkriptleri pencerelere bölüp paralel analiz et
+    if subs and estimate_tokens(text) > ANALYSIS_WINDOW_TOKENS:
+        print(f"Transkript çok uzun (~{estimate_tokens(text)} token), pencereli analiz kullanılıyor...")
+        viral_parts = analyze_content_windowed(subs, duration)
+        if viral_parts:
+            return viral_parts
+        print("Pencereli analiz sonuç vermedi, Whisper metnini kullanarak basit analiz yapılıyor...")
+        return analyze_content_simple(text, duration, srt_path, subs=subs, **signal_energy_envelope(video_path))
+    
+    prompt = build_analysis_prompt(text, duration)
+    system_prompt = analysis_system_prompt()
+    viral_parts = []
+    # Son istemde gönderilen segmentler; kesilen yanıtta sadece bunların kapsanmayanları tekrar sorulur
+    prompt_subs = subs
+    
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            # Aynı model ve istem için önceki yanıt önbellekte var mı?
+            cache_key = llm_cache_key(OPENAI_MODEL, system_prompt, prompt, 0.7)
+            content = llm_cache_lookup(cache_key)
+            finish_reason = None
+            if content is not None:
+                print("✓ ChatGPT yanıtı önbellekten alındı")
+            elif LLM_CACHE_MODE == 'replay':
+                raise RuntimeError("Replay modu: bu transkript için önbellekte ChatGPT yanıtı yok")
+            else:
+                response = get_openai_client().chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=2000
+                )
+                content = response.choices[0].message.content.strip()
+                finish_reason = response.choices[0].finish_reason
+                print("\nChatGPT yanıtı:", content[:500])
             
             try:
-                result = json.loads(content)
-                if not result or not isinstance(result, list):
-                    print("Uyarı: ChatGPT geçersiz bir JSON array döndürdü, Whisper metnini tekrar analiz ediyor...")
-                    if attempt < max_retries - 1:
-                        continue
-                    print("Tüm denemeler başarısız oldu. Whisper metnini kullanarak basit analiz yapılıyor...")
-                    return analyze_content_simple(text, duration, srt_path)
-                    
-                if len(result) == 0:
-                    print("Uyarı: ChatGPT boş bir liste döndürdü, Whisper metnini tekrar analiz ediyor...")
-                    if attempt < max_retries - 1:
-                        continue
-                    print("Tüm denemeler başarısız oldu. Whisper metnini kullanarak basit analiz yapılıyor...")
-                    return analyze_content_simple(text, duration, srt_path)
-                    
-                # Her kısmın formatını kontrol et
-                for part in result:
-                    if not isinstance(part, dict):
-                        raise Exception("Her kısım bir dictionary olmalı!")
-                    if 'start' not in part or 'end' not in part or 'title' not in part or 'description' not in part:
-                        raise Exception("Her kısımda start, end, title ve description olmalı!")
-                    if not isinstance(part['start'], (int, float)) or not isinstance(part['end'], (int, float)):
-                        raise Exception("start ve end değerleri sayı olmalı!")
-                    if not isinstance(part['title'], str) or not isinstance(part['description'], str):
-                        raise Exception("title ve description değerleri string olmalı!")
-                    if part['start'] >= part['end']:
-                        raise Exception("start değeri end değerinden küçük olmalı!")
-                    if part['start'] < 0 or part['end'] > duration:
-                        raise Exception(f"Tüm süreler 0 ile {duration} saniye arasında olmalı!")
-                    
-                    # Süre kontrolü (15-120 saniye)
-                    part_duration = part['end'] - part['start']
-                    if part_duration < 15:
-                        print(f"Uyarı: Kısım çok kısa ({part_duration} saniye), 15 saniyeye çıkarılıyor...")
-                        part['end'] = part['start'] + 15
-                    elif part_duration > 120:
-                        print(f"Uyarı: Kısım çok uzun ({part_duration} saniye), 120 saniyeye kısaltılıyor...")
-                        part['end'] = part['start'] + 120
-                    
-                    if len(part['title']) > 50:
-                        part['title'] = part['title'][:47] + "..."
-                    if len(part['description']) > 100:
-                        part['description'] = part['description'][:97] + "..."
-                
-                print(f"\nBulunan viral kısım sayısı: {len(result)}")
-                
-                # Sonuçları eski formata dönüştür
-                formatted_result = []
-                for part in result:
-                    formatted_part = {
-                        "start_time": part["start"],
-                        "end_time": part["end"],
-                        "title": part["title"],
-                        "reason": part["description"],
-                        "speaker_detected": False,
-                        "speaker_time": None,
-                        "context": part["description"],
-                        "sentence_start": part["start"]
-                    }
-                    formatted_result.append(formatted_part)
-                
-                return formatted_result
-                
-            except json.JSONDecodeError as e:
-                print(f"JSON ayrıştırma hatası: {str(e)}")
+                new_parts, complete = parse_analysis_response(content, duration)
+            except ValueError as e:
+                print(f"Uyarı: {str(e)}")
                 print("Ham yanıt:", content)
                 if attempt < max_retries - 1:
                     print(f"Yeniden deneniyor... (Deneme {attempt + 2}/{max_retries})")
                     continue
-                print("JSON ayrıştırma hatası, Whisper metnini kullanarak basit analiz yapılıyor...")
-                return analyze_content_simple(text, duration, srt_path)
+                break
+            
+            llm_cache_store(cache_key, content)
+            viral_parts = merge_window_parts([viral_parts, new_parts])
+            
+            # Yanıt kesildiyse sadece kapsanmayan kısımlar için tekrar sor. Seçimler sıralı
+            # olmak zorunda olmadığından en büyük bitişten değil, gönderilen segmentlerin
+            # hiçbir kısma girmeyenlerinden devam edilir (aradaki boşluklar dahil).
+            if (finish_reason == 'length' or not complete) and prompt_subs and attempt < max_retries - 1:
+                remaining_subs = uncovered_subs(prompt_subs, viral_parts)
+                remaining_text = build_transcript_text(remaining_subs)
+                if len(remaining_text) >= 50:
+                    print(f"Yanıt kesildi, kapsanmayan {len(remaining_subs)}/{len(prompt_subs)} segment için tekrar soruluyor...")
+                    prompt_subs = remaining_subs
+                    prompt = build_analysis_prompt(remaining_text, duration)
+                    continue
+            
+            if ANALYSIS_PROMPT_ENCODING == 'compact':
+                viral_parts = snap_parts_to_segments(viral_parts, subs)
+            print(f"\nBulunan viral kısım sayısı: {len(viral_parts)}")
+            return viral_parts
                 
         except Exception as e:
+            if LLM_CACHE_MODE == 'replay':
+                raise
             print(f"Beklenmeyen hata: {str(e)}")
             print("Hata detayları:")
             import traceback
@@ -639,141 +1181,451 @@ def analyze_content(text, duration, srt_path=None):
             if attempt < max_retries - 1:
                 print(f"Yeniden deneniyor... (Deneme {attempt + 2}/{max_retries})")
                 continue
-            print("Beklenmeyen hata, Whisper metnini kullanarak basit analiz yapılıyor...")
-            return analyze_content_simple(text, duration, srt_path)
+    
+    if viral_parts:
+        if ANALYSIS_PROMPT_ENCODING == 'compact':
+            viral_parts = snap_parts_to_segments(viral_parts, subs)
+        print(f"\nBulunan viral kısım sayısı: {len(viral_parts)}")
+        return viral_parts
+    print("Tüm denemeler başarısız oldu. Whisper metnini kullanarak basit analiz yapılıyor...")
+    return analyze_content_simple(text, duration, srt_path, subs=subs, **signal_energy_envelope(video_path))
+
+def split_transcript_windows(subs, max_window_tokens=None, overlap_seconds=30):
+    """Altyazıları token bütçesine göre örtüşen zaman pencerelerine böler"""
+    max_window_tokens = max_window_tokens or ANALYSIS_WINDOW_TOKENS
+    lines = [build_transcript_text([sub]) for sub in subs]
+    windows = []
+    first = 0
+    while first < len(subs):
+        last = first
+        tokens = 0
+        while last < len(subs) and (tokens + estimate_tokens(lines[last]) <= max_window_tokens or last == first):
+            tokens += estimate_tokens(lines[last])
+            last += 1
+        windows.append(subs[first:last])
+        if last >= len(subs):
+            break
+        # Bir sonraki pencere, bu pencerenin son overlap_seconds'ını tekrar içerir
+        overlap_start = subs[last - 1].end.total_seconds() - overlap_seconds
+        next_first = last
+        while next_first - 1 > first and subs[next_first - 1].start.total_seconds() >= overlap_start:
+            next_first -= 1
+        first = next_first
+    return windows
+
+def merge_window_parts(window_results):
+    """Pencerelerden gelen kısımları birleştirir, örtüşenlerden uzun olanı tutar"""
+    candidates = sorted(
+        (part for parts in window_results for part in parts),
+        key=lambda part: part['end_time'] - part['start_time'],
+        reverse=True
+    )
+    merged = []
+    for part in candidates:
+        if not any(parts_overlap(part, other) for other in merged):
+            merged.append(part)
+    merged.sort(key=lambda part: part['start_time'])
+    return merged
+
+async def analyze_window_async(async_client, semaphore, window_subs, duration, window_index, window_count,
+                               max_retries=3):
+    """Tek bir transkript penceresini eşzamanlılık sınırı altında analiz eder"""
+    prompt = build_analysis_prompt(build_transcript_text(window_subs), duration)
+    system_prompt = analysis_system_prompt()
+    cache_key = llm_cache_key(OPENAI_MODEL, system_prompt, prompt, 0.7)
+    cached_content = llm_cache_lookup(cache_key)
+    if cached_content is not None:
+        parts, _ = parse_analysis_response(cached_content, duration)
+        print(f"  Pencere {window_index+1}/{window_count}: {len(parts)} kısım (önbellekten)")
+        return parts
+    if LLM_CACHE_MODE == 'replay':
+        raise RuntimeError(f"Replay modu: pencere {window_index+1} için önbellekte ChatGPT yanıtı yok")
+
+    for attempt in range(max_retries):
+        try:
+            async with semaphore:
+                response = await async_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=2000
+                )
+            content = response.choices[0].message.content
+            parts, _ = parse_analysis_response(content, duration)
+            llm_cache_store(cache_key, content)
+            print(f"  Pencere {window_index+1}/{window_count}: {len(parts)} kısım")
+            return parts
+        except Exception as e:
+            print(f"  Pencere {window_index+1}/{window_count} analiz hatası (deneme {attempt+1}/{max_retries}): {str(e)}")
+    return []
+
+async def analyze_windows_async(windows, duration, concurrency):
+    """Tüm pencereleri asyncio ile sınırlı eşzamanlılıkla analiz eder"""
+    from openai import AsyncOpenAI
+
+    # OPENAI_BASE_URL ortam değişkeniyle yerel bir test sunucusuna yönlendirilebilir
+    async_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    try:
+        return await asyncio.gather(*[
+            analyze_window_async(async_client, semaphore, window, duration, k, len(windows))
+            for k, window in enumerate(windows)
+        ])
+    finally:
+        await async_client.close()
+
+def analyze_content_windowed(subs, duration, max_window_tokens=None, overlap_seconds=30, concurrency=None):
+    """Uzun transkripti örtüşen pencerelere böler, pencereleri paralel analiz eder ve sonuçları birleştirir"""
+    windows = split_transcript_windows(subs, max_window_tokens, overlap_seconds)
+    concurrency = concurrency or ANALYSIS_CONCURRENCY
+    print(f"\nPencereli analiz: {len(windows)} pencere, en fazla {concurrency} eşzamanlı istek")
+    window_results = asyncio.run(analyze_windows_async(windows, duration, concurrency))
+    viral_parts = merge_window_parts(window_results)
+    if ANALYSIS_PROMPT_ENCODING == 'compact':
+        viral_parts = snap_parts_to_segments(viral_parts, subs)
+    print(f"\nBulunan viral kısım sayısı: {len(viral_parts)} ({sum(len(r) for r in window_results)} aday)")
+    return viral_parts
+
+# Basit analizde viral potansiyel işaretleyen anahtar kelimeler (kelime başında eşleşir)
+VIRAL_KEYWORDS = ('ama', 'fakat', 'ancak', 'çünkü', 'bu yüzden', 'sonuç', 'açıklama',
+                  'komik', 'ilginç', 'şok', 'inanılmaz', 'önemli', 'dikkat', 'uyarı',
+                  'tavsiye', 'öneri', 'ipucu', 'trick', 'hack', 'yöntem', 'teknik')
+VIRAL_KEYWORD_PATTERN = re.compile(
+    r'(?<!\w)(?:' + '|'.join(re.escape(k) for k in sorted(VIRAL_KEYWORDS, key=len, reverse=True)) + ')',
+    re.IGNORECASE
+)
+
+# Segment puanındaki özellik ağırlıkları
+SIMPLE_SCORE_WEIGHTS = {'keywords': 1.0, 'speech_rate': 0.5, 'energy': 0.5, 'complete': 0.3, 'length': 0.2}
 
-def analyze_content_simple(text, duration, srt_path=None):
-    """Whisper metnini kullanarak basit viral kısım analizi yapar"""
+def compute_segment_features(starts, ends, texts, audio=None, sample_rate=16000):
+    """Her segment için anahtar kelime, konuşma hızı, ses enerjisi ve cümle bütünlüğü dizilerini hesaplar"""
+    durations = np.maximum(ends - starts, 0.1)
+    keywords = np.fromiter((len(VIRAL_KEYWORD_PATTERN.findall(t)) for t in texts), dtype=np.float64, count=len(texts))
+    words = np.fromiter((len(t.split()) for t in texts), dtype=np.float64, count=len(texts))
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.float64, count=len(texts))
+    complete = np.fromiter((bool(SENTENCE_END_PATTERN.search(t.strip())) for t in texts), dtype=np.float64, count=len(texts))
+
+    # Konuşma hızı: ortalamaya göre standartlaştırılmış kelime/saniye
+    rate = words / durations
+    speech_rate = (rate - rate.mean()) / (rate.std() or 1.0)
+
+    # Ses enerjisi: kümülatif kare toplamıyla segment başına RMS, medyana göre ölçeklenmiş log
+    energy = np.zeros(len(texts))
+    if audio is not None and len(audio):
+        squares = np.concatenate(([0.0], np.cumsum(np.square(audio, dtype=np.float64))))
+        first = np.clip((starts * sample_rate).astype(np.int64), 0, len(audio))
+        last = np.clip((ends * sample_rate).astype(np.int64), 0, len(audio))
+        rms = np.sqrt((squares[last] - squares[first]) / np.maximum(last - first, 1))
+        energy = np.log((rms + 1e-6) / (np.median(rms) + 1e-6))
+
+    return {
+        'keywords': keywords,
+        'speech_rate': speech_rate,
+        'energy': energy,
+        'complete': complete,
+        'length': (lengths > 30).astype(np.float64),
+    }
+
+def select_scored_windows(starts, ends, scores, complete, max_parts, min_seconds=15, max_seconds=120):
+    """Her başlangıç için 15-120 saniyelik en iyi pencereyi bulur, çakışmayanları puan sırasıyla seçer
+
+    Puanlar medyana göre ortalandığından pencere puanı, ortalamanın üstündeki segmentleri
+    kapsadıkça artar ve zayıf kısımlara taşınca düşer; cümle başı/sonu ile hizalanan
+    pencereler küçük bir bonus alır. (başlangıç_idx, bitiş_idx, puan) listesi döndürür.
+    """
+    count = len(starts)
+    cumulative = np.concatenate(([0.0], np.cumsum(scores - np.median(scores))))
+    first_end = np.searchsorted(ends, starts + min_seconds, side='left')
+    last_end = np.searchsorted(ends, starts + max_seconds, side='right') - 1
+    valid = first_end <= np.minimum(last_end, count - 1)
+    if not valid.any():
+        return []
+
+    # Başlangıç x bitiş-ofseti matrisi üzerinde tüm aday pencereleri puanla
+    span = int((last_end - first_end)[valid].max()) + 1
+    end_idx = first_end[:, None] + np.arange(span)[None, :]
+    mask = valid[:, None] & (end_idx <= last_end[:, None]) & (end_idx < count)
+    end_idx = np.minimum(end_idx, count - 1)
+    sentence_start = np.concatenate(([1.0], complete[:-1]))
+    window_scores = cumulative[end_idx + 1] - cumulative[:-1, None]
+    window_scores += 0.5 * complete[end_idx] + 0.5 * sentence_start[:, None]
+    window_scores = np.where(mask, window_scores, -np.inf)
+
+    best_offset = window_scores.argmax(axis=1)
+    best_scores = window_scores[np.arange(count), best_offset]
+    best_end = first_end + best_offset
+
+    selected = []
+    occupied = np.zeros(count, dtype=bool)
+    for i in np.argsort(-best_scores):
+        if not np.isfinite(best_scores[i]) or len(selected) >= max_parts:
+            break
+        j = best_end[i]
+        if occupied[i:j + 1].any():
+            continue
+        occupied[i:j + 1] = True
+        selected.append((int(i), int(j), float(best_scores[i])))
+    selected.sort()
+    return selected
+
+def analyze_content_simple(text, duration, srt_path=None, subs=None, max_parts=None, audio=None, sample_rate=16000):
+    """Ağ bağlantısı gerektirmeden, segment özelliklerinden puanlanan viral kısımları seçer
+
+    audio (mono float32 dizi) verilirse ses enerjisi de puana katılır. max_parts verilmezse
+    her 5 dakikalık video için bir kısım (en az 5) seçilir.
+    """
     print("\nBasit analiz yapılıyor...")
-    
+    started = time.perf_counter()
+    max_parts = max_parts or max(5, int(duration // 300))
+
     # Eğer SRT dosyası varsa, zaman damgalarını kullan
-    if srt_path and os.path.exists(srt_path):
+    segments = []
+    if subs is None and srt_path and os.path.exists(srt_path):
         try:
             print("SRT dosyasından zaman damgaları alınıyor...")
             with open(srt_path, 'r', encoding='utf-8') as f:
                 subs = list(srt.parse(f.read()))
-            
-            viral_parts = []
-            for i, sub in enumerate(subs):
-                if len(sub.content) < 20:  # Çok kısa altyazıları atla
-                    continue
-                
-                start_time = sub.start.total_seconds()
-                end_time = sub.end.total_seconds()
-                
-                # Viral potansiyeli yüksek altyazıları seç
-                viral_keywords = ['ama', 'fakat', 'ancak', 'çünkü', 'bu yüzden', 'sonuç', 'açıklama', 
-                                 'komik', 'ilginç', 'şok', 'inanılmaz', 'önemli', 'dikkat', 'uyarı',
-                                 'tavsiye', 'öneri', 'ipucu', 'trick', 'hack', 'yöntem', 'teknik']
-                
-                is_viral = any(keyword in sub.content.lower() for keyword in viral_keywords)
-                is_long_enough = len(sub.content) > 30
-                
-                if is_viral or is_long_enough:
-                    # Başlık oluştur
-                    title = sub.content[:50].strip()
-                    if len(title) > 50:
-                        title = title[:47] + "..."
-                    
-                    viral_parts.append({
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "title": title,
-                        "reason": sub.content[:100] + "..." if len(sub.content) > 100 else sub.content,
-                        "speaker_detected": False,
-                        "speaker_time": None,
-                        "context": sub.content,
-                        "sentence_start": start_time
-                    })
-                
-                # Maksimum 5 viral kısım bul
-                if len(viral_parts) >= 5:
-                    break
-            
-            if viral_parts:
-                print(f"SRT tabanlı basit analiz tamamlandı: {len(viral_parts)} viral kısım bulundu")
-                return viral_parts
-                
         except Exception as e:
             print(f"SRT dosyası okuma hatası: {str(e)}")
-    
-    # Eğer SRT yoksa veya hata oluştuysa, eski yöntemi kullan
-    # Metni cümlelere böl
-    sentences = text.split('.')
-    sentences = [s.strip() for s in sentences if s.strip()]
-    
-    if not sentences:
+    if subs:
+        segments = [(sub.start.total_seconds(), sub.end.total_seconds(), ' '.join(sub.content.split()))
+                    for sub in subs if sub.content.strip()]
+    else:
+        # SRT yoksa cümleleri video süresine eşit dağıtarak yaklaşık zamanla
+        sentences = [sentence.strip() + '.' for sentence in text.split('.') if sentence.strip()]
+        if sentences and duration:
+            step = duration / len(sentences)
+            segments = [(k * step, (k + 1) * step, sentence) for k, sentence in enumerate(sentences)]
+
+    if not segments:
         print("Cümle bulunamadı!")
         return []
-    
-    # Her cümle için yaklaşık süre hesapla (ortalama konuşma hızı)
-    avg_words_per_second = 2.5  # Ortalama konuşma hızı
-    total_words = len(text.split())
-    estimated_duration_per_sentence = (duration / len(sentences)) if sentences else 30
-    
+
+    starts = np.array([segment[0] for segment in segments], dtype=np.float64)
+    ends = np.maximum.accumulate(np.array([segment[1] for segment in segments], dtype=np.float64))
+    texts = [segment[2] for segment in segments]
+    features = compute_segment_features(starts, ends, texts, audio, sample_rate)
+    scores = sum(SIMPLE_SCORE_WEIGHTS[name] * values for name, values in features.items())
+
     viral_parts = []
-    current_start = 0
-    
-    for i, sentence in enumerate(sentences):
-        if len(sentence) < 20:  # Çok kısa cümleleri atla
-            continue
-            
-        # Cümle uzunluğuna göre süre hesapla
-        words_in_sentence = len(sentence.split())
-        sentence_duration = max(15, min(60, words_in_sentence / avg_words_per_second))
-        
-        end_time = min(current_start + sentence_duration, duration)
-        
-        # Viral potansiyeli yüksek cümleleri seç
-        viral_keywords = ['ama', 'fakat', 'ancak', 'çünkü', 'bu yüzden', 'sonuç', 'açıklama', 
-                         'komik', 'ilginç', 'şok', 'inanılmaz', 'önemli', 'dikkat', 'uyarı',
-                         'tavsiye', 'öneri', 'ipucu', 'trick', 'hack', 'yöntem', 'teknik']
-        
-        is_viral = any(keyword in sentence.lower() for keyword in viral_keywords)
-        is_long_enough = len(sentence) > 30
-        
-        if is_viral or is_long_enough:
-            # Başlık oluştur
-            title = sentence[:50].strip()
-            if len(title) > 50:
-                title = title[:47] + "..."
-            
-            viral_parts.append({
-                "start_time": current_start,
-                "end_time": end_time,
-                "title": title,
-                "reason": sentence[:100] + "..." if len(sentence) > 100 else sentence,
-                "speaker_detected": False,
-                "speaker_time": None,
-                "context": sentence,
-                "sentence_start": current_start
-            })
-        
-        current_start = end_time
-        
-        # Maksimum 5 viral kısım bul
-        if len(viral_parts) >= 5:
-            break
-    
+    for first, last, score in select_scored_windows(starts, ends, scores, features['complete'], max_parts):
+        # Başlık, penceredeki en yüksek puanlı segmentten alınır
+        best = first + int(np.argmax(scores[first:last + 1]))
+        title = texts[best][:50].strip()
+        if len(texts[best]) > 50:
+            title = title[:47] + "..."
+        context = ' '.join(texts[first:last + 1])
+        viral_parts.append({
+            "start_time": float(starts[first]),
+            "end_time": float(ends[last]),
+            "title": title,
+            "reason": context[:97] + "..." if len(context) > 100 else context,
+            "speaker_detected": False,
+            "speaker_time": None,
+            "context": context,
+            "sentence_start": float(starts[first])
+        })
+
     if not viral_parts:
-        # Hiç viral kısım bulunamadıysa, ilk cümleyi al
-        first_sentence = sentences[0] if sentences else "Video içeriği"
+        # Hiçbir pencere 15 saniyeyi doldurmadıysa, videonun başını al
         viral_parts.append({
             "start_time": 0,
             "end_time": min(60, duration),
-            "title": first_sentence[:50],
-            "reason": first_sentence[:100] + "..." if len(first_sentence) > 100 else first_sentence,
+            "title": texts[0][:50],
+            "reason": texts[0][:97] + "..." if len(texts[0]) > 100 else texts[0],
             "speaker_detected": False,
             "speaker_time": None,
-            "context": first_sentence,
+            "context": texts[0],
             "sentence_start": 0
         })
-    
-    print(f"Basit analiz tamamlandı: {len(viral_parts)} viral kısım bulundu")
+
+    print(f"Basit analiz tamamlandı: {len(viral_parts)} viral kısım bulundu "
+          f"({len(segments)} segment, {(time.perf_counter() - started) * 1000:.1f} ms)")
     return viral_parts
 
+# Sinyal zaman çizelgesi çözünürlüğü ve kısım sınırı oturtma toleransı
+SIGNAL_AUDIO_RATE = 10  # Saniyedeki RMS ölçümü (0.1 sn'lik pencereler)
+SIGNAL_VIDEO_FPS = 5
+SIGNAL_FRAME_SIZE = (64, 36)
+# Altyazı gömme yöntemi: 'atlas' (PIL sprite atlası) veya 'ass' (libass ile kodlayıcıda)
+SHORTS_SUBTITLE_MODE = os.getenv('SHORTS_SUBTITLE_MODE', 'atlas').lower()
+TITLE_DEBUG_DUMP = os.getenv('TITLE_DEBUG_DUMP', '').lower() in ('1', 'true', 'yes')
+SNAP_TOLERANCE_SECONDS = float(os.getenv('SNAP_TOLERANCE_SECONDS', '1.5'))
+
+@traced()
+def compute_signal_timeline(video_path, audio_rate=SIGNAL_AUDIO_RATE, video_fps=SIGNAL_VIDEO_FPS, use_cache=True):
+    """Kaynaktaki ses RMS'ini ve sahne değişimi puanlarını tek FFmpeg geçişinde çıkarır
+
+    Video 64x36 gri tonlamaya küçültülerek stdout'tan akış halinde okunur, ses astats ile
+    audio_rate Hz'de ölçülür. Sonuç .cache/signals altında .npz olarak saklanır.
+    """
+    configure_environment()
+    stat = os.stat(video_path)
+    key_source = f"{os.path.abspath(video_path)}:{stat.st_size}:{stat.st_mtime_ns}:{audio_rate}:{video_fps}:{SIGNAL_FRAME_SIZE}"
+    cache_key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:24]
+    cache_path = cache_file_path('signals', cache_key, extension='.npz')
+    if use_cache and os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            print(f"✓ Sinyal zaman çizelgesi önbellekten alındı: {cache_path}")
+            return {name: data[name] for name in data.files}
+
+    started = time.perf_counter()
+    has_audio = probe_video(video_path).get('has_audio', False)
+    frame_w, frame_h = SIGNAL_FRAME_SIZE
+    frame_bytes = frame_w * frame_h
+
+    with tempfile.TemporaryDirectory(prefix='longtoshort_signals_') as work_dir:
+        rms_log_path = os.path.join(work_dir, 'rms.txt')
+        cmd = [
+            FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-nostdin',
+            '-i', video_path,
+            '-map', '0:v:0', '-vf', f"fps={video_fps},scale={frame_w}:{frame_h},format=gray",
+            '-f', 'rawvideo', 'pipe:1'
+        ]
+        if has_audio:
+            samples_per_bin = 8000 // audio_rate
+            cmd += [
+                '-map', '0:a:0',
+                '-af', (f"aresample=8000,aformat=channel_layouts=mono,asetnsamples=n={samples_per_bin}:p=0,"
+                        f"astats=metadata=1:reset=1,"
+                        f"ametadata=mode=print:key=lavfi.astats.Overall.RMS_level:file={escape_ffmpeg_filter_path(rms_log_path)}"),
+                '-f', 'null', '-'
+            ]
+
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        scene_chunks = []
+        previous = None
+        chunk_frames = video_fps * 60
+        # Kareleri dakikalık parçalar halinde oku, ardışık kare farkını hesapla
+        while True:
+            data = process.stdout.read(frame_bytes * chunk_frames)
+            usable = len(data) - len(data) % frame_bytes
+            if not usable:
+                break
+            frames = np.frombuffer(data[:usable], dtype=np.uint8).reshape(-1, frame_h, frame_w).astype(np.int16)
+            if previous is not None:
+                frames = np.concatenate((previous, frames))
+            diffs = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2)) / 255.0
+            scene_chunks.append(diffs.astype(np.float32))
+            previous = frames[-1:]
+        stderr = process.stderr.read().decode('utf-8', errors='replace')
+        process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"Sinyal analizi hatası: {stderr.strip()[-2000:]}")
+
+        rms_values = []
+        if has_audio and os.path.exists(rms_log_path):
+            with open(rms_log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('lavfi.astats.Overall.RMS_level='):
+                        try:
+                            rms_values.append(float(line.split('=', 1)[1]))
+                        except ValueError:
+                            rms_values.append(float('-inf'))
+
+    # İlk karenin önceki karesi yok, sahne puanı 0 kabul edilir
+    scene = np.concatenate(([0.0], *scene_chunks)).astype(np.float32) if scene_chunks else np.zeros(0, np.float32)
+    rms_db = np.maximum(np.array(rms_values, dtype=np.float32), -120.0)
+    timeline = {
+        'audio_rate': np.array(audio_rate),
+        'rms_db': rms_db,
+        'video_fps': np.array(video_fps),
+        'scene': scene,
+    }
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # İş parçacıkları aynı süreçte çalışabildiği için geçici ada thread kimliği de eklenir
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    np.savez_compressed(temp_path, **timeline)
+    os.replace(temp_path, cache_path)
+    print(f"✓ Sinyal zaman çizelgesi çıkarıldı: {len(rms_db)} ses, {len(scene)} görüntü örneği "
+          f"({time.perf_counter() - started:.1f} sn)")
+    return timeline
+
+def signal_energy_envelope(video_path):
+    """Sinyal zaman çizelgesinin RMS değerlerini analyze_content_simple'ın audio argümanlarına çevirir
+
+    Doğrusal RMS zarfının segment üzerindeki karesel ortalaması segmentin RMS'ine eşit olduğundan
+    zarf, ham ses yerine daha düşük örnek hızıyla kullanılabilir. Zaman çizelgesi önbellekte
+    tutulduğu için sonraki sınır oturtma adımı aynı sonucu yeniden kullanır.
+    """
+    if not video_path:
+        return {}
+    try:
+        timeline = compute_signal_timeline(video_path)
+    except Exception as e:
+        print(f"Uyarı: Ses enerjisi alınamadı, sadece metin özellikleri kullanılacak: {str(e)}")
+        return {}
+    return {
+        'audio': np.power(10.0, timeline['rms_db'].astype(np.float64) / 20.0),
+        'sample_rate': float(timeline['audio_rate']),
+    }
+
+def find_boundary_candidate(timeline, target, tolerance, silence_threshold, cut_threshold):
+    """Hedef zamana tolerans içinde en yakın sahne kesmesini, yoksa en sessiz anı döndürür"""
+    scene = timeline['scene']
+    video_fps = float(timeline['video_fps'])
+    if len(scene):
+        first = max(0, int(np.floor((target - tolerance) * video_fps)))
+        last = min(len(scene), int(np.ceil((target + tolerance) * video_fps)) + 1)
+        cuts = first + np.flatnonzero(scene[first:last] >= cut_threshold)
+        if len(cuts):
+            # Kesme, farkın ölçüldüğü karenin başlangıcıdır
+            cut_times = cuts / video_fps
+            return float(cut_times[np.argmin(np.abs(cut_times - target))]), 'kesme'
+
+    rms_db = timeline['rms_db']
+    audio_rate = float(timeline['audio_rate'])
+    if len(rms_db):
+        first = max(0, int(np.floor((target - tolerance) * audio_rate)))
+        last = min(len(rms_db), int(np.ceil((target + tolerance) * audio_rate)) + 1)
+        if first < last:
+            window = rms_db[first:last]
+            quietest = int(np.argmin(window))
+            if window[quietest] <= silence_threshold:
+                # Sessiz pencerenin ortası
+                return (first + quietest + 0.5) / audio_rate, 'sessizlik'
+    return None, None
+
+def snap_part_boundaries(parts, timeline, tolerance=None):
+    """Kısımların başlangıç/bitişini tolerans içindeki en yakın sahne kesmesine veya sessizliğe oturtur
+
+    Oturtma kısmı 15-120 saniye aralığının dışına çıkarırsa o sınır değiştirilmez.
+    """
+    tolerance = SNAP_TOLERANCE_SECONDS if tolerance is None else tolerance
+    if not parts or tolerance <= 0:
+        return parts
+    rms_db = timeline['rms_db']
+    scene = timeline['scene']
+    finite = rms_db[rms_db > -120.0]
+    # Eşikler kaynağa göre uyarlanır: medyanın en az 6 dB altındaki en sessiz %20'lik dilim
+    # ve belirgin kare farkları
+    silence_threshold = min(float(np.percentile(finite, 20)), float(np.median(finite)) - 6.0) if len(finite) else -120.0
+    cut_threshold = max(0.12, float(scene.mean() + 4 * scene.std())) if len(scene) else np.inf
+
+    snapped = 0
+    for part in parts:
+        for key in ('start_time', 'end_time'):
+            candidate, kind = find_boundary_candidate(timeline, part[key], tolerance, silence_threshold, cut_threshold)
+            if candidate is None:
+                continue
+            start = candidate if key == 'start_time' else part['start_time']
+            end = candidate if key == 'end_time' else part['end_time']
+            if 15 <= end - start <= 120 and abs(candidate - part[key]) > 1e-3:
+                print(f"  {part['title'][:30]}: {key} {part[key]:.2f}s -> {candidate:.2f}s ({kind})")
+                part[key] = candidate
+                snapped += 1
+        part['sentence_start'] = part['start_time']
+    print(f"✓ {snapped} kısım sınırı sessizlik/sahne kesmesine oturtuldu")
+    return parts
+
 def get_video_thumbnail(video_path, time):
     """Belirli bir zamandaki video karesini alır ve küçültür"""
+    import cv2
+
     video = cv2.VideoCapture(video_path)
     video.set(cv2.CAP_PROP_POS_MSEC, time * 1000)
     success, frame = video.read()
@@ -951,76 +1803,108 @@ def convert_vtt_time_to_seconds(time_str):
         print(f"Zaman dönüştürme hatası: {str(e)}")
         return 0.0
 
-def create_text_image(text, width, height, font_size=90, main_font_path='DynaPuff/static/DynaPuff-Regular.ttf', output_folder=None):
-    """PIL kullanarak metin görüntüsü oluşturur"""
+@functools.lru_cache(maxsize=64)
+def load_font(font_path, font_size):
+    """TrueType fontu yükler; aynı (yol, boyut) için önbellekteki nesneyi döndürür"""
+    return ImageFont.truetype(font_path, font_size)
+
+@functools.lru_cache(maxsize=16384)
+def measure_text_width(font_path, font_size, text):
+    """Metnin ilerleme genişliğini ölçer; (font, boyut, metin) başına önbelleğe alınır"""
+    return load_font(font_path, font_size).getlength(text)
+
+@functools.lru_cache(maxsize=4096)
+def measure_line_bbox(font_path, font_size, line):
+    """Satırın sınır kutusunu ölçer; (font, boyut, satır) başına önbelleğe alınır"""
+    return load_font(font_path, font_size).getbbox(line)
+
+def measure_text_block(text, font_path, font_size, width, line_spacing=10):
+    """Metni verilen boyutta satırlara böler ve bloğun ölçülerini döndürür
+
+    (satırlar, en geniş satır, toplam yükseklik, en küçük üst ofset) döndürür.
+    """
+    lines = smart_wrap_text(text, load_font(font_path, font_size), width).split('\n')
+    total_text_height = 0
+    max_line_width = 0
+    min_top_offset = 0
+    for line in lines:
+        bbox = measure_line_bbox(font_path, font_size, line)
+        total_text_height += bbox[3] - bbox[1]
+        max_line_width = max(max_line_width, bbox[2] - bbox[0])
+        # bbox[1] is the top coordinate, which can be negative if parts of the character go above the baseline
+        min_top_offset = min(min_top_offset, bbox[1])
+    total_text_height += (len(lines) - 1) * line_spacing # Satır arası boşluk
+    return lines, max_line_width, total_text_height, min_top_offset
+
+def fit_text_block(text, font_path, width, available_height, max_font_size, min_font_size=10):
+    """Metnin alana sığdığı en büyük font boyutunu ikili aramayla bulur
+
+    Hiçbir boyut sığmazsa en küçük boyutun ölçüleri döndürülür.
+    (font boyutu, satırlar, en geniş satır, toplam yükseklik, en küçük üst ofset) döndürür.
+    """
+    low, high = min_font_size, max(min_font_size, max_font_size)
+    best = None
+    while low <= high:
+        size = (low + high) // 2
+        block = measure_text_block(text, font_path, size, width)
+        if block[1] <= width and block[2] <= available_height:
+            best = (size,) + block
+            low = size + 1
+        else:
+            high = size - 1
+    if best is None:
+        print("Minimum font boyutuna ulaşıldı, metin hala sığmıyor.")
+        best = (min_font_size,) + measure_text_block(text, font_path, min_font_size, width)
+    return best
+
+@traced()
+def create_text_image(text, width, height, font_size=90, main_font_path='DynaPuff/static/DynaPuff-Regular.ttf',
+                      output_folder=None, debug_dump=None, premultiplied=False):
+    """PIL kullanarak metin görüntüsünü bellekte oluşturur ve RGBA numpy dizisi olarak döndürür
+
+    Aynı (metin, font, boyut, kutu) için önbellekteki salt okunur dizi döndürülür.
+    premultiplied=True renk kanallarını alfa ile çarpılmış verir (FFmpeg overlay alpha=premultiplied için).
+    debug_dump (varsayılan TITLE_DEBUG_DUMP) açıksa görüntü output_folder/test_text.png olarak da kaydedilir.
+    """
     # Ana font dosyasının varlığını kontrol et
     if not os.path.exists(main_font_path):
         print(f"HATA: Ana font dosyası bulunamadı: {main_font_path}")
         raise FileNotFoundError(f"Ana font dosyası bulunamadı: {main_font_path}")
 
-    current_font_size = font_size
-    max_attempts = 10
-    
-    # Metin sığana kadar font boyutunu küçült (ana font ile ölçüm yaparak)
-    main_font_for_sizing = None
-    total_text_height = 0
-    min_top_offset_overall = 0
-
-    for attempt in range(max_attempts):
-        try:
-            main_font_for_sizing = ImageFont.truetype(main_font_path, current_font_size)
-            
-            # Metni mevcut ana font boyutuyla ölç
-            wrapped_text = smart_wrap_text(text, main_font_for_sizing, width)
-            lines = wrapped_text.split('\n')
-            
-            total_text_height = 0
-            max_line_width = 0
-            min_top_offset_current_attempt = 0 # Initialize for current attempt
-            for line in lines:
-                bbox = main_font_for_sizing.getbbox(line)
-                line_height = bbox[3] - bbox[1]
-                line_width = bbox[2] - bbox[0]
-                total_text_height += line_height
-                if line_width > max_line_width:
-                    max_line_width = line_width
-                
-                # Update min_top_offset for the current line's bounding box
-                # bbox[1] is the top coordinate, which can be negative if parts of the character go above the baseline
-                if bbox[1] < min_top_offset_current_attempt:
-                    min_top_offset_current_attempt = bbox[1]
-
-            total_text_height += (len(lines) - 1) * 10 # Satır arası boşluk
-            min_top_offset_overall = min_top_offset_current_attempt # Update for final use
-
-            available_height_for_sizing = height - 80 # Increased padding
-            if max_line_width <= width and total_text_height <= available_height_for_sizing:
-                print(f"Metin başarıyla sığdırıldı. Font Boyutu: {current_font_size}, Genişlik: {max_line_width}/{width}, Yükseklik: {total_text_height}/{available_height_for_sizing})")
-                break # Başarılı, döngüden çık
-            else:
-                print(f"DEBUG: Metin sığmadı - max_line_width: {max_line_width}/{width}, total_text_height: {total_text_height}/{available_height_for_sizing}")
-                if current_font_size > 10:
-                    current_font_size -= 5
-                    print(f"Metin sığmadı, font boyutu düşürülüyor: {current_font_size}")
-                    # Bir sonraki denemeye devam et
-                else:
-                    print("Minimum font boyutuna ulaşıldı, metin hala sığmıyor.")
-                    break # Sığmıyor, döngüden çık
+    image_np = render_text_image(text, width, height, font_size, main_font_path, premultiplied)
 
-        except Exception as e:
-            print(f"Deneme {attempt+1}: Font boyutlandırma sırasında hata: {str(e)}")
-            if current_font_size > 10:
-                current_font_size -= 5
-                continue # Hata oluştu, fontu küçültüp tekrar dene
-            raise # Minimum font boyutunda da hata, hatayı fırlat
+    if TITLE_DEBUG_DUMP if debug_dump is None else debug_dump:
+        # Görüntüyü kaydet (test için)
+        test_image_path = 'test_text.png'
+        if output_folder: # Eğer bir çıktı klasörü belirtilmişse, dosya yolunu bu klasörün içine ayarla
+            test_image_path = os.path.join(output_folder, 'test_text.png')
+        Image.fromarray(image_np).save(test_image_path)
+        print(f"Test görüntüsü kaydedildi: {test_image_path}")
 
+    return image_np
 
-    if main_font_for_sizing is None:
-        raise Exception("Ana font yüklenemedi veya boyutlandırılamadı.")
+def premultiply_alpha(image_np):
+    """RGBA dizisinin renk kanallarını alfa ile çarpar"""
+    premultiplied = image_np.copy()
+    alpha = image_np[:, :, 3:4].astype(np.uint16)
+    premultiplied[:, :, :3] = ((image_np[:, :, :3].astype(np.uint16) * alpha + 127) // 255).astype(np.uint8)
+    return premultiplied
 
-    # Son seçilen font boyutuyla ana fontu yeniden yükle
-    final_main_font = ImageFont.truetype(main_font_path, current_font_size)
+@functools.lru_cache(maxsize=128)
+def render_text_image(text, width, height, font_size, main_font_path, premultiplied=False):
+    """Başlık görüntüsünü çizer; sonuç (metin, font, boyut, kutu) başına önbelleğe alınır"""
+    if premultiplied:
+        image_np = premultiply_alpha(render_text_image(text, width, height, font_size, main_font_path))
+        image_np.flags.writeable = False
+        return image_np
 
+    # Metnin sığdığı en büyük font boyutunu bul (ana font ile ölçüm yaparak)
+    available_height_for_sizing = height - 80 # Increased padding
+    current_font_size, lines, max_line_width, total_text_height, min_top_offset_overall = fit_text_block(
+        text, main_font_path, width, available_height_for_sizing, font_size
+    )
+    print(f"Metin başarıyla sığdırıldı. Font Boyutu: {current_font_size}, Genişlik: {max_line_width}/{width}, Yükseklik: {total_text_height}/{available_height_for_sizing})")
+    final_main_font = load_font(main_font_path, current_font_size)
 
     # Son görüntüyü oluştur
     image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
@@ -1048,347 +1932,1298 @@ def create_text_image(text, width, height, font_size=90, main_font_path='DynaPuf
     # Her satırı ana font ile çiz
     for line in lines:
         # Satırın yatayda ortalanması için başlangıç noktası
-        line_width = final_main_font.getbbox(line)[2] - final_main_font.getbbox(line)[0]
-        x = (width - line_width) // 2
+        bbox = measure_line_bbox(main_font_path, current_font_size, line)
+        x = (width - (bbox[2] - bbox[0])) // 2
         
         draw.text((x, current_y), line, font=final_main_font, fill='white', stroke_width=2, stroke_fill='black')
         
         # Bir sonraki satır için y konumunu ilerlet
-        current_y += (final_main_font.getbbox(line)[3] - final_main_font.getbbox(line)[1]) + 10 # Satır yüksekliği + boşluk
+        current_y += (bbox[3] - bbox[1]) + 10 # Satır yüksekliği + boşluk
 
-    # Görüntüyü kaydet (test için)
-    test_image_path = 'test_text.png'
-    if output_folder: # Eğer bir çıktı klasörü belirtilmişse, dosya yolunu bu klasörün içine ayarla
-        test_image_path = os.path.join(output_folder, 'test_text.png')
+    # Önbellekte paylaşıldığı için salt okunur numpy dizisi olarak döndür
+    image_np = np.array(image)
+    image_np.flags.writeable = False
+    return image_np
 
-    image.save(test_image_path)
-    print(f"Test görüntüsü kaydedildi: {test_image_path}")
-    print(f"Type of 'image' before np.array: {type(image)}") # DEBUG Print
-        
-    return np.array(image) # Numpy array olarak döndür
+SUBTITLE_FONT_PATH = 'DynaPuff/static/DynaPuff-Bold.ttf'
 
-def create_shorts(video_path, viral_parts, srt_path=None):
-    """Viral kısımlardan Shorts videoları oluşturur"""
-    try:
-        # Video uzantısını kontrol et ve gerekirse değiştir
-        video_path_without_ext = os.path.splitext(video_path)[0]
-        if not os.path.exists(video_path):
-            # Yaygın video formatlarını dene
-            common_extensions = ['.mp4', '.mkv', '.webm', '.avi', '.mov']
-            video_found = False
-            
-            for ext in common_extensions:
-                test_path = video_path_without_ext + ext
-                if os.path.exists(test_path):
-                    video_path = test_path
-                    video_found = True
-                    print(f"Video dosyası bulundu: {video_path}")
+@functools.lru_cache(maxsize=1024)
+def layout_subtitle_lines(text, target_w=1080, font_size=55, band_height=70, font_path=SUBTITLE_FONT_PATH):
+    """Altyazıyı target_w - 80 genişliğe sarar ve şeride sığması için gereken ölçeği hesaplar
+
+    (satırlar, satır kutuları, metin yüksekliği, ölçek) döndürür; ölçek 1'den küçükse çok satırlı
+    metin band_height - 10 piksele sığacak şekilde küçültülmelidir. Atlas ve ASS yolu aynı
+    yerleşimi kullanır.
+    """
+    font = load_font(font_path, font_size)
+    lines = smart_wrap_text(text, font, target_w - 80).split('\n')
+    line_boxes = [measure_line_bbox(font_path, font_size, line) for line in lines]
+    text_height = sum(box[3] for box in line_boxes) + (len(lines) - 1) * 5
+    scale = min(1.0, (band_height - 10) / text_height) if text_height > 0 else 1.0
+    return lines, line_boxes, text_height, scale
+
+@functools.lru_cache(maxsize=1024)
+def render_subtitle_sprite(text, target_w=1080, font_size=55, band_height=70,
+                           font_path=SUBTITLE_FONT_PATH):
+    """Tek altyazı satırını yarı saydam siyah şeritle birlikte RGBA olarak çizer
+
+    Metin target_w - 80 genişliğe sarılır. Sprite her zaman band_height yüksekliğindedir;
+    birden fazla satır şeride sığmazsa metin orantılı olarak küçültülür.
+    Sonuç (metin, genişlik, font) başına önbelleğe alınır.
+    """
+    font = load_font(font_path, font_size)
+    lines, line_boxes, text_height, scale = layout_subtitle_lines(text, target_w, font_size, band_height, font_path)
+    text_layer = Image.new('RGBA', (target_w, text_height + 5), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(text_layer)
+    y = 0
+    for line, box in zip(lines, line_boxes):
+        draw.text(((target_w - (box[2] - box[0])) // 2 - box[0], y), line, font=font, fill='white')
+        y += box[3] + 5
+    sprite = Image.new('RGBA', (target_w, band_height), (0, 0, 0, 150))
+    if scale < 1.0:
+        # Şeride sığmayan çok satırlı metni küçült ve şeridin ortasına yerleştir
+        text_layer = text_layer.resize((max(1, int(target_w * scale)), max(1, int(text_layer.height * scale))),
+                                       Image.LANCZOS)
+        sprite.alpha_composite(text_layer, ((target_w - text_layer.width) // 2, 5))
+    else:
+        sprite.alpha_composite(text_layer, (0, 5))
+    sprite_np = np.array(sprite)
+    sprite_np.flags.writeable = False
+    return sprite_np
+
+def build_subtitle_atlas(subtitles, target_w=1080, font_size=55, band_height=70, font_path=SUBTITLE_FONT_PATH):
+    """Bir kısmın tüm altyazılarını tekilleştirip tek bir sprite atlasında toplar
+
+    {'image': RGBA atlas, 'sprites': [(y, yükseklik)], 'timeline': [(başlangıç, bitiş, sprite)]} döndürür.
+    Aynı metin atlasta bir kez yer alır; zaman çizelgesi sprite indeksini gösterir.
+    Tüm sprite'lar band_height yüksekliğinde olduğundan k. sprite y = k * band_height'tadır.
+    """
+    sprite_index = {}
+    sprite_images = []
+    timeline = []
+    for sub in subtitles:
+        text = ' '.join(sub['text'].split())
+        if not text or sub['end'] <= sub['start']:
+            continue
+        if text not in sprite_index:
+            sprite_index[text] = len(sprite_images)
+            sprite_images.append(render_subtitle_sprite(text, target_w, font_size, band_height, font_path))
+        timeline.append((sub['start'], sub['end'], sprite_index[text]))
+
+    # Tüm sprite'lar aynı genişlikte: dikey raf olarak üst üste diz
+    sprites = []
+    y = 0
+    for sprite_np in sprite_images:
+        sprites.append((y, sprite_np.shape[0]))
+        y += sprite_np.shape[0]
+    image = np.concatenate(sprite_images) if sprite_images else np.zeros((0, target_w, 4), dtype=np.uint8)
+    return {'image': image, 'sprites': sprites, 'timeline': timeline}
+
+def build_atlas_crop_expr(atlas, blank_y):
+    """Atlas zaman çizelgesinden, t anındaki sprite'ın y konumunu veren crop ifadesini üretir
+
+    Aralıklar yarı açık [başlangıç, bitiş) alınır ve çakışanlar bir sonrakinin başlangıcında
+    kesilir; böylece her an en fazla bir terim 1 olur ve toplam tek bir y verir.
+    İç içe if yerine toplam kullanılır (FFmpeg ifade ayrıştırıcısının derinlik sınırı).
+    """
+    timeline = sorted(atlas['timeline'])
+    terms = []
+    for k, (start, end, sprite) in enumerate(timeline):
+        if k + 1 < len(timeline):
+            end = min(end, timeline[k + 1][0])
+        if end <= start:
+            continue
+        offset = atlas['sprites'][sprite][0] - blank_y
+        terms.append(f"gte(t,{start:.3f})*lt(t,{end:.3f})*({offset})")
+    return "+".join([str(blank_y)] + terms)
+
+def format_ass_time(seconds):
+    """Saniyeyi ASS zaman biçimine (H:MM:SS.cc) çevirir"""
+    centiseconds = int(round(max(seconds, 0) * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    return f"{hours}:{minutes:02d}:{centiseconds // 100:02d}.{centiseconds % 100:02d}"
+
+def write_ass_subtitles(subtitles, ass_path, target_w=1080, target_h=1920, font_size=55, band_height=70,
+                        fade_ms=150):
+    """Kısmın altyazılarını (kısım başına göre zamanlı) stilli bir ASS dosyasına yazar
+
+    Her altyazı için target_h - 420'de 70 piksellik yarı saydam siyah şerit çizilir,
+    üstüne beyaz DynaPuff metin yerleştirilir; ikisi de fade ile girer/çıkar. Satırlar atlas
+    yoluyla aynı yerleşimle (layout_subtitle_lines) elle sarılır, şeride sığmayan metin
+    küçültülür ve şeride kırpılır.
+    """
+    band_y = target_h - 350 - band_height
+    header = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {target_w}",
+        f"PlayResY: {target_h}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Text,DynaPuff,{font_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,"
+        f"-1,0,0,0,100,100,0,0,1,0,0,8,40,40,{band_y + 5},1",
+        f"Style: Band,DynaPuff,{font_size},&H69000000,&H69000000,&H69000000,&H69000000,"
+        f"0,0,0,0,100,100,0,0,1,0,0,7,0,0,0,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    events = []
+    for sub in subtitles:
+        if sub['end'] <= sub['start']:
+            continue
+        start = format_ass_time(sub['start'])
+        end = format_ass_time(sub['end'])
+        lines, _, _, scale = layout_subtitle_lines(' '.join(sub['text'].split()), target_w, font_size, band_height)
+        # Metindeki süslü parantezler ASS etiketi, ters bölü de \N/\h kaçışı sanılmasın:
+        # ters bölüden sonra sıfır genişlikli boşluk eklenir
+        text = '\\N'.join(
+            line.replace('{', '(').replace('}', ')').replace('\\', '\\\u200b') for line in lines
+        )
+        tags = f"\\fad({fade_ms},{fade_ms})\\clip(0,{band_y},{target_w},{band_y + band_height})"
+        if scale < 1.0:
+            tags += f"\\fscx{scale * 100:.1f}\\fscy{scale * 100:.1f}"
+        events.append(
+            f"Dialogue: 0,{start},{end},Band,,0,0,0,,{{\\pos(0,{band_y})\\fad({fade_ms},{fade_ms})\\p1}}"
+            f"m 0 0 l {target_w} 0 {target_w} {band_height} 0 {band_height}{{\\p0}}"
+        )
+        events.append(f"Dialogue: 1,{start},{end},Text,,0,0,0,,{{{tags}}}{text}")
+    with open(ass_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(header + events) + '\n')
+    return ass_path
+
+def build_ass_filter(ass_path):
+    """ASS dosyasını DynaPuff font klasörüyle yakan FFmpeg subtitles filtresini döndürür"""
+    fonts_dir = os.path.abspath(os.path.dirname(SUBTITLE_FONT_PATH))
+    return (f"subtitles=filename='{escape_ffmpeg_filter_path(os.path.abspath(ass_path))}':"
+            f"fontsdir='{escape_ffmpeg_filter_path(fonts_dir)}'")
+
+def probe_video(video_path):
+    """FFprobe ile videonun boyut, fps, süre ve ses bilgilerini alır"""
+    configure_environment()
+    result = subprocess.run([
+        FFPROBE_BINARY,
+        '-v', 'error',
+        '-show_entries', 'stream=codec_type,width,height,avg_frame_rate,r_frame_rate:format=duration',
+        '-of', 'json',
+        video_path
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFprobe hatası ({video_path}): {result.stderr.strip()}")
+
+    data = json.loads(result.stdout or '{}')
+    info = {'width': 0, 'height': 0, 'fps': 0.0, 'duration': 0.0, 'has_audio': False}
+    for stream in data.get('streams', []):
+        if stream.get('codec_type') == 'video' and not info['width']:
+            info['width'] = int(stream.get('width', 0))
+            info['height'] = int(stream.get('height', 0))
+            for key in ('avg_frame_rate', 'r_frame_rate'):
+                num, _, den = stream.get(key, '0/0').partition('/')
+                try:
+                    fps = float(num) / float(den or 1)
+                except (ValueError, ZeroDivisionError):
+                    fps = 0.0
+                if fps > 0:
+                    info['fps'] = fps
                     break
-            
-            if not video_found:
-                raise FileNotFoundError(f"Video dosyası bulunamadı. Aranan formatlar: {', '.join(common_extensions)}")
+        elif stream.get('codec_type') == 'audio':
+            info['has_audio'] = True
+    try:
+        info['duration'] = float(data.get('format', {}).get('duration', 0))
+    except (TypeError, ValueError):
+        pass
+    return info
 
-        print(f"\nVideo dosyası bulundu: {video_path}")
-        video = VideoFileClip(video_path)
-        video_id = os.path.splitext(os.path.basename(video_path))[0]
-        
-        # Arka plan videosunu yükle
-        bg_video = VideoFileClip("bg.mp4")
-        bg_duration = bg_video.duration
-        
-        # Video boyutlarını al
-        w, h = video.size
-        target_w, target_h = 1080, 1920  # Shorts için hedef boyutlar
-        
-        # Logo yükle ve boyutlandır
-        logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
-        if os.path.exists(logo_path):
-            try:
-                logo = ImageClip(logo_path)
-                # Logo boyutunu ayarla (video yüksekliğinin %15'i)
-                logo_height = int(target_h * 0.15)
-                logo = logo.resize(height=logo_height)
-                # Logo pozisyonunu ayarla (sol orta)
-                logo = logo.set_position(('left', 'center'))
-                print(f"✓ Logo yüklendi ve boyutlandırıldı: {logo_path}")
-            except Exception as e:
-                print(f"! Logo yüklenirken hata oluştu: {str(e)}")
-                logo = None
+@functools.lru_cache(maxsize=None)
+def get_h264_encoder():
+    """Kullanılabilir H.264 kodlayıcısını belirler (önce NVENC, sonra libx264)"""
+    configure_environment()
+    result = subprocess.run([
+        FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+        '-c:v', 'h264_nvenc', '-f', 'null', '-'
+    ], capture_output=True, text=True)
+    if result.returncode == 0:
+        print("✓ NVIDIA NVENC kodlayıcısı kullanılabilir")
+        return 'h264_nvenc'
+    print("NVIDIA NVENC kullanılamıyor, libx264 kullanılacak")
+    return 'libx264'
+
+def build_encoder_args(encoder, threads=4):
+    """FFmpeg için video kodlayıcı parametrelerini oluşturur (MoviePy yolu ile aynı ayarlar)"""
+    if encoder == 'h264_nvenc':
+        args = ['-c:v', 'h264_nvenc', '-preset', 'p7', '-rc:v', 'vbr_hq', '-cq:v', '23', '-b:v', '4000k']
+    else:
+        args = ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-b:v', '4000k', '-threads', str(threads)]
+    return args + [
+        '-pix_fmt', 'yuv420p',
+        '-colorspace', 'bt709',
+        '-color_primaries', 'bt709',
+        '-color_trc', 'bt709',
+        '-color_range', 'tv',
+        '-movflags', '+faststart'
+    ]
+
+def escape_ffmpeg_filter_path(path):
+    """Dosya yolunu FFmpeg filtre parametresi olarak kullanılabilecek hale getirir"""
+    return path.replace('\\', '/').replace(':', '\\:').replace("'", "\\'")
+
+def file_content_hash(path, chunk_size=1024 * 1024):
+    """Dosya içeriğinin SHA-256 özetini hesaplar"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@functools.lru_cache(maxsize=16)
+def cached_file_hash(path, size, mtime_ns):
+    """Dosya özetini yol, boyut ve değiştirilme zamanına göre süreç boyunca önbellekte tutar"""
+    return file_content_hash(path)
+
+def background_offset(start_time, bg_info):
+    """Kısmın hazır arka plan döngüsünde başlayacağı zamanı döndürür
+
+    Arka plan kaynak zaman çizelgesiyle birlikte akar; böylece her kısa video döngünün
+    farklı bir noktasından başlar ve tekrar decode/ölçekleme gerekmez.
+    """
+    duration = (bg_info or {}).get('duration') or 0
+    if duration <= 0:
+        return 0.0
+    return start_time % duration
+
+def prepare_background(bg_path="bg.mp4", target_w=1080, target_h=1920, cache_dir=None):
+    """bg.mp4'ü bir kez 1080x1920, sessiz ve kolay seek edilebilir hale getirip önbelleğe alır"""
+    configure_environment()
+    if not os.path.exists(bg_path):
+        raise FileNotFoundError(f"Arka plan videosu bulunamadı: {bg_path}")
+
+    cache_dir = os.path.join(cache_dir or CACHE_DIR, 'backgrounds')
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(bg_path)
+    content_hash = cached_file_hash(os.path.abspath(bg_path), stat.st_size, stat.st_mtime_ns)
+    key_source = f"{content_hash}:{stat.st_mtime_ns}:{target_w}x{target_h}"
+    cache_key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:20]
+    prepared_path = os.path.join(cache_dir, f"bg_{cache_key}.mp4")
+
+    if os.path.exists(prepared_path):
+        print(f"✓ Hazır arka plan önbellekten kullanılıyor: {prepared_path}")
+        return prepared_path
+
+    print(f"Arka plan dikey formata hazırlanıyor: {bg_path} -> {prepared_path}")
+    # Aynı anda hazırlayan başka çağrılarla çakışmamak için benzersiz geçici dosya
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix=f"bg_{cache_key}.", suffix='.tmp.mp4')
+    os.close(fd)
+    result = subprocess.run([
+        FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error',
+        '-i', bg_path,
+        '-an',
+        '-vf', (f"scale=-2:{target_h},crop=w=min(iw\\,{target_w}):h={target_h},"
+                f"pad={target_w}:{target_h}:0:0:black,setsar=1,format=yuv420p"),
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18',
+        # Her saniye anahtar kare: zaman ofsetiyle hızlı ve doğru seek
+        '-force_key_frames', 'expr:gte(t,n_forced*1)',
+        '-movflags', '+faststart',
+        temp_path
+    ], capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise RuntimeError(f"Arka plan hazırlama hatası: {result.stderr.strip()[-2000:]}")
+
+    os.replace(temp_path, prepared_path)
+    print(f"✓ Arka plan hazırlandı: {prepared_path}")
+    return prepared_path
+
+def load_part_subtitles(full_subs, start_time, end_time):
+    """Klibin zaman aralığına düşen altyazıları klip başlangıcına göre döndürür"""
+    part_subs = []
+    for sub in full_subs or []:
+        if sub.end.total_seconds() < start_time or sub.start.total_seconds() > end_time:
+            continue
+        sub_start = sub.start.total_seconds() - start_time
+        sub_end = sub.end.total_seconds() - start_time
+        if sub_end <= sub_start or sub_end - sub_start < 0.5:
+            continue
+        part_subs.append({
+            'start': sub_start,
+            'end': sub_end,
+            'text': sub.content[:80]  # Maksimum 80 karakter
+        })
+    return part_subs
+
+def prepare_short_output(part):
+    """Kısa video için başlığı temizler ve çıktı klasörünü oluşturur"""
+    # Clean [] from title using re.sub for robustness
+    title_full = re.sub(r'\[|\]', '', part.get('title', '') or '').strip()
+    # Başlık için güvenli bir dosya adı oluştur
+    safe_title = re.sub(r'[^\w\s-]', '', title_full).strip().replace(' ', '_')
+    timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    if safe_title:
+        output_dir = os.path.join('.', f"shorts_output_{safe_title}_{timestamp}")
+    else:
+        output_dir = os.path.join('.', f"shorts_output_{timestamp}")
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Çıktı klasörü oluşturuldu: {output_dir}")
+    return title_full, safe_title, timestamp, output_dir
+
+def short_output_path(output_dir, video_id, safe_title, timestamp, index):
+    """Kısa videonun çıktı yolunu döndürür
+
+    Aynı saniyede aynı başlıklı iki kısım aynı klasöre düşebilir; kısım numarası
+    dosya adına eklenerek birbirlerinin üzerine yazmaları önlenir.
+    """
+    return os.path.join(output_dir, f'{video_id}_{safe_title}_{timestamp}_part{index + 1}.mp4')
+
+def build_ffmpeg_short_command(main_input_args, clip_duration, output_path, bg_path="bg.mp4",
+                               logo_path=None, title_image_path=None, subtitles=None,
+                               work_dir=None, fps=30, include_audio=True, encoder='libx264',
+                               threads=4, target_w=1080, target_h=1920, bg_size=None, bg_offset=0.0,
+                               title_image_size=None, title_premultiplied=False, subtitle_mode=None):
+    """Kısa videonun tüm katmanlarını tek bir FFmpeg -filter_complex komutuna derler
+
+    subtitle_mode='ass' altyazıları sprite atlası yerine libass ile tek filtrede yakar.
+    title_image_size verilirse başlık, title_image_path'ten (ör. pipe:0) tek karelik ham RGBA
+    olarak okunur; title_premultiplied ise overlay alpha=premultiplied ile uygulanır.
+    """
+    d = f"{clip_duration:.3f}"
+    fade_duration = 0.5
+    fade_out_start = f"{max(clip_duration - fade_duration, 0):.3f}"
+    main_h = int(target_h * 0.65)
+    y_position = target_h - main_h - 300
+    title_y = 50
+    title_bg_height = 240
+    subtitle_y = target_h - 350 - 70
+
+    cmd = [FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error']
+    cmd += list(main_input_args)
+    cmd += ['-stream_loop', '-1']
+    if bg_offset:
+        cmd += ['-ss', f"{bg_offset:.3f}"]
+    cmd += ['-i', bg_path]
+    next_input = 2
+
+    if bg_size == (target_w, target_h):
+        # Önceden hazırlanmış arka plan: sadece klip süresine kes
+        bg_filter = f"[1:v]setsar=1,trim=duration={d},setpts=PTS-STARTPTS[bg]"
+    else:
+        # Arka plan: dikey formata ölçekle, ortadan kırp, klip süresine kes
+        bg_filter = (f"[1:v]scale=-2:{target_h},crop=w=min(iw\\,{target_w}):h={target_h},"
+                     f"pad={target_w}:{target_h}:0:0:black,setsar=1,trim=duration={d},setpts=PTS-STARTPTS[bg]")
+    filters = [
+        bg_filter,
+        # Ana video: yüksekliğin %65'i, alttan 300 piksel yukarıda
+        f"[0:v]scale=-2:{main_h},setsar=1,setpts=PTS-STARTPTS[main]",
+        f"[bg][main]overlay=x=(W-w)/2:y={y_position}:eof_action=endall[v0]",
+    ]
+    last = 'v0'
+    step = 1
+
+    if logo_path:
+        cmd += ['-loop', '1', '-t', d, '-i', logo_path]
+        logo_height = int(target_h * 0.15)
+        filters.append(f"[{next_input}:v]scale=-2:{logo_height}[logo]")
+        filters.append(f"[{last}][logo]overlay=x=0:y=(H-h)/2[v{step}]")
+        last = f"v{step}"
+        step += 1
+        next_input += 1
+
+    if title_image_path:
+        alpha_fades = (f"fade=t=in:st=0:d={fade_duration}:alpha=1,"
+                       f"fade=t=out:st={fade_out_start}:d={fade_duration}:alpha=1")
+        if title_image_size:
+            # Bellekteki tek kare ham RGBA: loop filtresiyle klip boyunca tekrarla
+            cmd += ['-f', 'rawvideo', '-pix_fmt', 'rgba', '-video_size', f"{title_image_size[0]}x{title_image_size[1]}",
+                    '-framerate', f"{fps:.3f}", '-i', title_image_path]
+            title_source = (f"[{next_input}:v]loop=loop=-1:size=1:start=0,setpts=N/({fps:.3f}*TB),"
+                            f"trim=duration={d},format=rgba")
         else:
-            print(f"! Logo dosyası bulunamadı: {logo_path}")
-            print("! Logo dosyası ana dizinde 'logo.png' olarak bulunmalıdır.")
-            logo = None
-        
-        # Viral kısımları sırala (en ilgi çekici olanlar önce)
-        viral_parts.sort(key=lambda x: x.get('start_time', 0))
-        
-        print(f"\nToplam {len(viral_parts)} viral kısım işlenecek")
-        
-        for i, part in enumerate(viral_parts):
+            cmd += ['-loop', '1', '-t', d, '-i', title_image_path]
+            title_source = f"[{next_input}:v]format=rgba"
+        title_fades = alpha_fades
+        title_overlay = f"overlay=x=(W-w)/2:y={title_y}"
+        if title_premultiplied:
+            # Önceden çarpılmış alfa: renk kanalları da alfa ile birlikte sönümlenmeli
+            title_fades = (f"fade=t=in:st=0:d={fade_duration},fade=t=out:st={fade_out_start}:d={fade_duration},"
+                           + alpha_fades)
+            title_overlay += ":alpha=premultiplied"
+        filters.append(f"color=c=black@0.5:s={target_w}x{title_bg_height}:d={d},format=rgba,{alpha_fades}[tbg]")
+        filters.append(f"{title_source},{title_fades}[title]")
+        filters.append(f"[{last}][tbg]overlay=x=0:y={title_y}[v{step}]")
+        filters.append(f"[v{step}][title]{title_overlay}[v{step + 1}]")
+        last = f"v{step + 1}"
+        step += 2
+        next_input += 1
+
+    subtitle_mode = subtitle_mode or SHORTS_SUBTITLE_MODE
+    final_filters = [f"fps={fps:.3f}", "format=yuv420p"]
+    if subtitles and subtitle_mode == 'ass':
+        # Altyazıları ASS dosyasından libass ile tek filtrede yak
+        ass_path = write_ass_subtitles(subtitles, os.path.join(work_dir, 'subtitles.ass'), target_w, target_h)
+        final_filters.insert(0, build_ass_filter(ass_path))
+    elif subtitles:
+        # Altyazılar: atlastan zamana göre kayan tek crop + tek overlay
+        atlas = build_subtitle_atlas(subtitles, target_w)
+        if atlas['timeline']:
+            atlas_path = os.path.join(work_dir, 'subtitles_atlas.png')
+            band_h = atlas['sprites'][0][1]
+            # Atlasın sonuna boş (saydam) hücre: altyazı olmayan anlarda bu gösterilir
+            blank_y = atlas['image'].shape[0]
+            atlas_image = np.concatenate([atlas['image'], np.zeros((band_h, target_w, 4), dtype=np.uint8)])
+            Image.fromarray(atlas_image).save(atlas_path, compress_level=1)
+            cmd += ['-loop', '1', '-framerate', f"{fps:.3f}", '-t', d, '-i', atlas_path]
+            filters.append(f"[{next_input}:v]format=rgba,"
+                           f"crop=w={target_w}:h={band_h}:x=0:y='{build_atlas_crop_expr(atlas, blank_y)}'[subs]")
+            filters.append(f"[{last}][subs]overlay=x=0:y={subtitle_y}[v{step}]")
+            last = f"v{step}"
+            step += 1
+            next_input += 1
+    filters.append(f"[{last}]" + ",".join(final_filters) + "[vout]")
+
+    if include_audio:
+        filters.append("[0:a]volume=1.75[aout]")  # Ses seviyesini %175'e çıkar
+
+    cmd += ['-filter_complex', ';'.join(filters), '-map', '[vout]']
+    if include_audio:
+        cmd += ['-map', '[aout]', '-c:a', 'aac', '-b:a', '192k']
+    else:
+        cmd += ['-an']
+    cmd += build_encoder_args(encoder, threads)
+    cmd += ['-t', d, output_path]
+    return cmd
+
+@traced()
+def render_short_ffmpeg(video_path, part, index, total, source_info, subtitles=None,
+                        logo_path=None, video_id=None, bg_path="bg.mp4", bg_info=None, threads=4,
+                        subtitle_mode=None):
+    """Viral kısmı MoviePy kullanmadan tek bir FFmpeg çağrısıyla render eder"""
+    start_time = part['start_time']
+    end_time = part['end_time']
+    clip_duration = end_time - start_time
+
+    print(f"\nViral kısım {index+1}/{total} FFmpeg ile işleniyor...")
+    print(f"Başlangıç: {start_time:.2f} saniye")
+    print(f"Bitiş: {end_time:.2f} saniye")
+    print(f"Süre: {clip_duration:.2f} saniye")
+    print(f"Başlık: {part.get('title', 'Başlıksız')}")
+
+    title_full, safe_title, timestamp, output_dir = prepare_short_output(part)
+    encoder = get_h264_encoder()
+    output_path = short_output_path(output_dir, video_id, safe_title, timestamp, index)
+    if encoder == 'h264_nvenc':
+        output_path = output_path.replace(".mp4", "_nvenc.mp4")
+
+    if bg_info is None:
+        bg_info = probe_video(bg_path)
+    fps = max(source_info.get('fps') or 0, bg_info.get('fps') or 0) or 30
+
+    with tempfile.TemporaryDirectory(prefix='longtoshort_') as work_dir:
+        # Başlık diske yazılmaz; ham RGBA olarak FFmpeg'in stdin'ine verilir
+        text_image_np = None
+        if title_full:
             try:
-                print(f"\nViral kısım {i+1}/{len(viral_parts)} işleniyor...")
-                
-                # Viral kısımın başlangıç ve bitiş zamanlarını al
-                start_time = part['start_time']
-                end_time = part['end_time']
-                clip_duration = end_time - start_time
-                
-                print(f"Başlangıç: {start_time:.2f} saniye")
-                print(f"Bitiş: {end_time:.2f} saniye")
-                print(f"Süre: {clip_duration:.2f} saniye")
-                print(f"Başlık: {part.get('title', 'Başlıksız')}")
-                
-                # Kısa video klibi oluştur
-                clip = video.subclip(start_time, end_time)
-                
-                # Ses seviyesini %175'e çıkar
-                clip = clip.volumex(1.75)
-                
-                # Arka plan videosunu hazırla
-                repeat_count = int(clip_duration / bg_duration) + 1
-                bg_clips = [bg_video] * repeat_count
-                bg_combined = concatenate_videoclips(bg_clips)
-                bg_combined = bg_combined.subclip(0, clip_duration)
-                bg_combined = bg_combined.without_audio()
-                
-                # Arka plan videosunu dikey formata dönüştür
-                bg_combined = bg_combined.resize(height=target_h)
-                if bg_combined.w > target_w:
-                    x_center = bg_combined.w / 2
-                    x1 = int(x_center - target_w/2)
-                    x2 = int(x_center + target_w/2)
-                    bg_combined = bg_combined.crop(x1=x1, y1=0, x2=x2, y2=target_h)
-                
-                # Ana videoyu dikey formata dönüştür
-                clip = clip.resize(height=int(target_h * 0.65))
-                y_position = target_h - clip.h - 300
-                clip = clip.set_position(('center', y_position))
+                text_image_np = create_text_image(
+                    title_full,
+                    1080 - 80,
+                    240,
+                    font_size=90,
+                    main_font_path='DynaPuff/static/DynaPuff-Regular.ttf',
+                    output_folder=output_dir,
+                    premultiplied=True
+                )
+            except Exception as e:
+                print(f"Başlık eklenirken hata oluştu: {str(e)}")
+                print("Başlık olmadan devam ediliyor...")
+                text_image_np = None
+
+        cmd = build_ffmpeg_short_command(
+            ['-ss', f"{start_time:.3f}", '-t', f"{clip_duration:.3f}", '-i', video_path],
+            clip_duration,
+            output_path,
+            bg_path=bg_path,
+            logo_path=logo_path,
+            title_image_path='pipe:0' if text_image_np is not None else None,
+            title_image_size=(text_image_np.shape[1], text_image_np.shape[0]) if text_image_np is not None else None,
+            title_premultiplied=True,
+            subtitles=subtitles,
+            subtitle_mode=subtitle_mode,
+            work_dir=work_dir,
+            bg_size=(bg_info.get('width'), bg_info.get('height')),
+            bg_offset=background_offset(start_time, bg_info),
+            fps=fps,
+            include_audio=source_info.get('has_audio', True),
+            encoder=encoder,
+            threads=threads
+        )
+
+        print(f"\nKısa video FFmpeg ile kaydediliyor ({encoder}): {output_path}")
+        if subtitles:
+            print(f"  {len(subtitles)} altyazı videoya gömülüyor")
+        title_bytes = text_image_np.tobytes() if text_image_np is not None else b''
+        result = subprocess.run(cmd, input=title_bytes, capture_output=True)
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace')
+            raise RuntimeError(f"FFmpeg render hatası: {stderr.strip()[-2000:]}")
+
+    print(f"\n✓ Kısa video (FFmpeg ile) kaydedildi: {output_path}")
+    return output_path
+
+@traced()
+def render_short_moviepy(video, bg_video, logo, part, index, total, subtitles=None, video_id=None, threads=4,
+                         subtitle_mode=None):
+    """Viral kısmı MoviePy ile katmanları birleştirerek render eder
+
+    subtitle_mode='ass' altyazıları klip olarak birleştirmek yerine kodlayıcıda (-vf subtitles) yakar.
+    """
+    from moviepy.editor import ImageClip, CompositeVideoClip, ColorClip, concatenate_videoclips, vfx
 
-                # Overlay kliplerini tutacak liste
-                overlay_clips_for_this_short = []
+    i = index
+    target_w, target_h = 1080, 1920  # Shorts için hedef boyutlar
+    bg_duration = bg_video.duration
 
-                # Logo ekle (eğer varsa)
-                if logo is not None:
-                    logo = logo.set_duration(clip_duration)
-                    overlay_clips_for_this_short.append(logo)
+    print(f"\nViral kısım {i+1}/{total} işleniyor...")
 
-                # Başlık ekle
-                title_full = part.get('title', '')
+    # Viral kısımın başlangıç ve bitiş zamanlarını al
+    start_time = part['start_time']
+    end_time = part['end_time']
+    clip_duration = end_time - start_time
+
+    print(f"Başlangıç: {start_time:.2f} saniye")
+    print(f"Bitiş: {end_time:.2f} saniye")
+    print(f"Süre: {clip_duration:.2f} saniye")
+    print(f"Başlık: {part.get('title', 'Başlıksız')}")
+
+    # Kısa video klibi oluştur
+    clip = video.subclip(start_time, end_time)
+
+    # Ses seviyesini %175'e çıkar
+    clip = clip.volumex(1.75)
+
+    # Arka plan videosunu hazırla
+    if tuple(bg_video.size) == (target_w, target_h):
+        # Önceden hazırlanmış arka plan: sadece döngüye al
+        bg_combined = bg_video.fx(vfx.loop, duration=clip_duration).without_audio()
+    else:
+        repeat_count = int(clip_duration / bg_duration) + 1
+        bg_clips = [bg_video] * repeat_count
+        bg_combined = concatenate_videoclips(bg_clips)
+        bg_combined = bg_combined.subclip(0, clip_duration)
+        bg_combined = bg_combined.without_audio()
+
+        # Arka plan videosunu dikey formata dönüştür
+        bg_combined = bg_combined.resize(height=target_h)
+        if bg_combined.w > target_w:
+            x_center = bg_combined.w / 2
+            x1 = int(x_center - target_w/2)
+            x2 = int(x_center + target_w/2)
+            bg_combined = bg_combined.crop(x1=x1, y1=0, x2=x2, y2=target_h)
+
+    # Ana videoyu dikey formata dönüştür
+    clip = clip.resize(height=int(target_h * 0.65))
+    y_position = target_h - clip.h - 300
+    clip = clip.set_position(('center', y_position))
+
+    # Overlay kliplerini tutacak liste
+    overlay_clips_for_this_short = []
+
+    # Logo ekle (eğer varsa)
+    if logo is not None:
+        logo = logo.set_duration(clip_duration)
+        overlay_clips_for_this_short.append(logo)
+
+    # Başlık ve çıktı klasörü
+    title_full, safe_title, timestamp, output_dir = prepare_short_output(part)
+    if title_full:
+        try:
+            print(f"DEBUG: Cleaned title_full: '{title_full}'")
+
+            # Başlık için arka plan oluştur
+            title_bg_height = 240
+            title_bg = ColorClip(size=(target_w, title_bg_height), color=(0, 0, 0, 128))
+            title_bg = title_bg.set_duration(clip_duration)
+            title_bg = title_bg.set_position(('center', 50))
+
+            # Ana başlık metin görüntüsünü oluştur
+            text_image_np = create_text_image(
+                title_full,
+                target_w - 80,
+                title_bg_height,
+                font_size=90,
+                main_font_path='DynaPuff/static/DynaPuff-Regular.ttf',
+                output_folder=output_dir
+            )
+            txt_clip = ImageClip(text_image_np)
+            txt_clip = txt_clip.set_duration(clip_duration)
+            txt_clip = txt_clip.set_position(('center', 50))
+
+            # Fade efektleri
+            fade_duration = 0.5
+            txt_clip = txt_clip.crossfadein(fade_duration)
+            txt_clip = txt_clip.crossfadeout(fade_duration)
+            title_bg = title_bg.crossfadein(fade_duration)
+            title_bg = title_bg.crossfadeout(fade_duration)
+
+            overlay_clips_for_this_short.append(title_bg)
+            overlay_clips_for_this_short.append(txt_clip)
+
+        except Exception as e:
+            print(f"Başlık eklenirken hata oluştu: {str(e)}")
+            print("Hata detayları:")
+            import traceback
+            traceback.print_exc()
+            print("Başlık olmadan devam ediliyor...")
+
+    # Tüm klipleri birleştir
+    final_clips_list = [bg_combined, clip] + overlay_clips_for_this_short
+
+    # Altyazıları ekle (eğer varsa)
+    subtitle_mode = subtitle_mode or SHORTS_SUBTITLE_MODE
+    ass_dir = None
+    subtitle_filter = None
+    if subtitles and subtitle_mode == 'ass':
+        # Altyazılar kare kare birleştirilmez, kodlayıcı ASS dosyasını libass ile yakar
+        ass_dir = tempfile.mkdtemp(prefix='longtoshort_ass_')
+        subtitle_filter = build_ass_filter(write_ass_subtitles(subtitles, os.path.join(ass_dir, 'subtitles.ass')))
+        print(f"  {len(subtitles)} altyazı kodlayıcıda ASS ile gömülecek")
+    elif subtitles:
+        # Sprite atlasından, her metin için tek ImageClip
+        print(f"  Klip {i+1}/{total} için {len(subtitles)} altyazı segmenti işlenecek.")
+        atlas_started = time.perf_counter()
+        atlas = build_subtitle_atlas(subtitles, target_w)
+        sprite_clips = {}
+        for sub_start, sub_end, sprite in atlas['timeline']:
+            if sprite not in sprite_clips:
+                sprite_y, sprite_h = atlas['sprites'][sprite]
+                sprite_clips[sprite] = ImageClip(atlas['image'][sprite_y:sprite_y + sprite_h]).set_position(
+                    ('center', target_h - 350 - 70)
+                )
+            final_clips_list.append(
+                sprite_clips[sprite].set_start(sub_start).set_duration(sub_end - sub_start)
+            )
+        print(f"  ✓ {len(atlas['timeline'])} altyazı eklendi ({len(atlas['sprites'])} tekil satır, "
+              f"{(time.perf_counter() - atlas_started) * 1000:.0f} ms)")
+
+    # CompositeVideoClip oluştur
+    final_clip = CompositeVideoClip(
+        final_clips_list,
+        size=(target_w, target_h)
+    ).set_duration(clip_duration)
+
+    # Klibi kaydet
+    output_path = short_output_path(output_dir, video_id, safe_title, timestamp, index)
+    print(f"\nKısa video kaydediliyor: {output_path}")
+    print("Bu işlem birkaç dakika sürebilir...")
+
+    try:
+        # Önce NVIDIA NVENC ile kaydetmeyi dene
+        try:
+            print("NVIDIA NVENC ile kaydediliyor...")
+            nvenc_output_path = output_path.replace(".mp4", "_nvenc.mp4")
+            with span('write_videofile', codec='h264_nvenc', index=index, output=nvenc_output_path):
+                final_clip.write_videofile(
+                    nvenc_output_path,
+                    codec='h264_nvenc',
+                    bitrate='4000k',
+                    audio_codec='aac',
+                    audio_bitrate='192k',
+                    preset='p7',
+                    ffmpeg_params=[
+                        '-rc:v', 'vbr_hq',
+                        '-cq:v', '23',
+                        '-movflags', '+faststart',
+                        '-pix_fmt', 'yuv420p',
+                        '-colorspace', 'bt709',
+                        '-color_primaries', 'bt709',
+                        '-color_trc', 'bt709',
+                        '-color_range', 'tv'
+                    ] + (['-vf', subtitle_filter] if subtitle_filter else []),
+                    verbose=True,  # İlerleme göster
+                    logger=None  # Logger'ı kapat
+                )
+            print(f"\n✓ Kısa video (NVIDIA NVENC ile) kaydedildi: {nvenc_output_path}")
+            return nvenc_output_path
+        except Exception as e:
+            print(f"\nUyarı: NVIDIA NVENC ile video kaydedilirken hata oluştu: {str(e)}")
+            print("CPU tabanlı libx264 kodlayıcısına geri dönülüyor...")
+
+        # Hata durumunda CPU tabanlı libx264 kodlayıcısı ile kaydet
+        print("libx264 ile kaydediliyor...")
+        with span('write_videofile', codec='libx264', index=index, output=output_path):
+            final_clip.write_videofile(
+                output_path,
+                codec='libx264',
+                bitrate='4000k',
+                audio_codec='aac',
+                audio_bitrate='192k',
+                preset='medium',
+                threads=threads,
+                ffmpeg_params=[
+                    '-crf', '23',
+                    '-movflags', '+faststart',
+                    '-pix_fmt', 'yuv420p',
+                    '-vf', ','.join(filter(None, [subtitle_filter, 'format=yuv420p,pad=ceil(iw/2)*2:ceil(ih/2)*2'])),
+                    '-colorspace', 'bt709',
+                    '-color_primaries', 'bt709',
+                    '-color_trc', 'bt709',
+                    '-color_range', 'tv'
+                ],
+                verbose=True,  # İlerleme göster
+                logger=None  # Logger'ı kapat
+            )
+        print(f"\n✓ Kısa video (libx264 ile) kaydedildi: {output_path}")
+        return output_path
+    finally:
+        if ass_dir:
+            shutil.rmtree(ass_dir, ignore_errors=True)
+
+@traced()
+def open_title_input(text_image_np, work_dir):
+    """Premultiplied RGBA başlığı FFmpeg'e ham kare olarak verecek girdiyi hazırlar
+
+    POSIX'te veri bir işletim sistemi borusundan (pipe:N) okunur ve diske yazılmaz;
+    Windows'ta FFmpeg ek boru tanıtıcılarını açamadığından geçici klasöre ham dosya yazılır.
+    """
+    title_input = {
+        'size': (text_image_np.shape[1], text_image_np.shape[0]),
+        'data': text_image_np.tobytes(),
+        'read_fd': None,
+        'write_fd': None,
+    }
+    if os.name == 'nt':
+        title_input['path'] = os.path.join(work_dir, 'title.rgba')
+        with open(title_input['path'], 'wb') as f:
+            f.write(title_input['data'])
+    else:
+        title_input['read_fd'], title_input['write_fd'] = os.pipe()
+        title_input['path'] = f"pipe:{title_input['read_fd']}"
+    return title_input
+
+def feed_title_input(title_input):
+    """Kodlayıcı başladıktan sonra başlık verisini boruya arka planda yazar"""
+    if not title_input or title_input['write_fd'] is None:
+        return
+    os.close(title_input['read_fd'])
+    title_input['read_fd'] = None
+
+    def write_title():
+        try:
+            with os.fdopen(title_input['write_fd'], 'wb') as pipe:
+                pipe.write(title_input['data'])
+        except OSError:
+            pass  # Kodlayıcı erken çıktıysa hatası encoder.log'da görülür
+
+    threading.Thread(target=write_title, name="title-pipe", daemon=True).start()
+
+def close_title_input(title_input):
+    """Kullanılmayan başlık borusunun uçlarını kapatır"""
+    if not title_input:
+        return
+    for key in ('read_fd', 'write_fd'):
+        if title_input.get(key) is not None:
+            os.close(title_input[key])
+            title_input[key] = None
+
+def render_shorts_batched(video_path, viral_parts, source_info, full_subs=None, logo_path=None,
+                          video_id=None, bg_path="bg.mp4", threads=4, subtitle_mode=None):
+    """Kaynak videoyu tek seferde sırayla decode eder ve kareleri tüm kısımların kodlayıcılarına dağıtır"""
+    configure_environment()
+    target_h = 1920
+    main_h = int(target_h * 0.65)
+    src_w = source_info.get('width') or 1920
+    src_h = source_info.get('height') or 1080
+    main_w = max(2, int(round(src_w * main_h / src_h / 2.0)) * 2)
+    bg_info = probe_video(bg_path)
+    fps = max(source_info.get('fps') or 0, bg_info.get('fps') or 0) or 30
+    has_audio = source_info.get('has_audio', True)
+    encoder = get_h264_encoder()
+    frame_bytes = main_w * main_h * 3
+
+    # Kısımları zamana göre sırala, decode edilecek aralığı belirle
+    ordered = sorted(enumerate(viral_parts), key=lambda item: item[1]['start_time'])
+    range_start = min(part['start_time'] for _, part in ordered)
+    range_end = max(part['end_time'] for _, part in ordered)
+    print(f"\nToplu render: {len(ordered)} kısım, kaynak {range_start:.2f}s - {range_end:.2f}s aralığında tek seferde decode edilecek")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='longtoshort_batch_') as work_dir:
+        jobs = []
+        for job_idx, (i, part) in enumerate(ordered):
+            result = {'index': i, 'start_time': part['start_time'], 'end_time': part['end_time'],
+                      'output_path': None, 'error': None}
+            results[i] = result
+            title_input = None
+            try:
+                clip_duration = part['end_time'] - part['start_time']
+                job_dir = os.path.join(work_dir, f"part_{job_idx}")
+                os.makedirs(job_dir)
+                title_full, safe_title, timestamp, output_dir = prepare_short_output(part)
+                output_path = short_output_path(output_dir, video_id, safe_title, timestamp, i)
+                if encoder == 'h264_nvenc':
+                    output_path = output_path.replace(".mp4", "_nvenc.mp4")
+
+                # Başlık diske yazılmaz; stdin kareler için kullanıldığından ayrı bir boruyla verilir
+                title_input = None
                 if title_full:
                     try:
-                        # Clean [] from title using re.sub for robustness
-                        title_full = re.sub(r'\[|\]', '', title_full).strip()
-                        print(f"DEBUG: Cleaned title_full: '{title_full}'")
-
-                        # Başlık için güvenli bir dosya adı oluştur
-                        safe_title = re.sub(r'[^\w\s-]', '', title_full).strip().replace(' ', '_')
-                        # Çıktı klasörünü belirle
-                        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-                        output_dir = os.path.join('.', f"shorts_output_{safe_title}_{timestamp}")
-                        os.makedirs(output_dir, exist_ok=True)
-                        print(f"Çıktı klasörü oluşturuldu: {output_dir}")
-
-                        # Başlık için arka plan oluştur
-                        title_bg_height = 240
-                        title_bg = ColorClip(size=(target_w, title_bg_height), color=(0, 0, 0, 128))
-                        title_bg = title_bg.set_duration(clip_duration)
-                        title_bg = title_bg.set_position(('center', 50))
-
-                        # Ana başlık metin görüntüsünü oluştur
                         text_image_np = create_text_image(
-                            title_full,
-                            target_w - 80,
-                            title_bg_height,
-                            font_size=90,
+                            title_full, 1080 - 80, 240, font_size=90,
                             main_font_path='DynaPuff/static/DynaPuff-Regular.ttf',
-                            output_folder=output_dir
+                            output_folder=output_dir,
+                            premultiplied=True
                         )
-                        txt_clip = ImageClip(text_image_np)
-                        txt_clip = txt_clip.set_duration(clip_duration)
-                        txt_clip = txt_clip.set_position(('center', 50))
+                        title_input = open_title_input(text_image_np, job_dir)
+                    except Exception as e:
+                        print(f"Başlık eklenirken hata oluştu: {str(e)}")
+                        title_input = None
 
-                        # Fade efektleri
-                        fade_duration = 0.5
-                        txt_clip = txt_clip.crossfadein(fade_duration)
-                        txt_clip = txt_clip.crossfadeout(fade_duration)
-                        title_bg = title_bg.crossfadein(fade_duration)
-                        title_bg = title_bg.crossfadeout(fade_duration)
+                video_only_path = os.path.join(job_dir, 'video.mp4')
+                cmd = build_ffmpeg_short_command(
+                    ['-f', 'rawvideo', '-pix_fmt', 'rgb24', '-video_size', f"{main_w}x{main_h}",
+                     '-framerate', f"{fps:.3f}", '-i', 'pipe:0'],
+                    clip_duration,
+                    video_only_path,
+                    bg_path=bg_path,
+                    logo_path=logo_path,
+                    title_image_path=title_input['path'] if title_input else None,
+                    title_image_size=title_input['size'] if title_input else None,
+                    title_premultiplied=True,
+                    subtitles=load_part_subtitles(full_subs, part['start_time'], part['end_time']),
+                    subtitle_mode=subtitle_mode,
+                    work_dir=job_dir,
+                    bg_size=(bg_info.get('width'), bg_info.get('height')),
+                    bg_offset=background_offset(part['start_time'], bg_info),
+                    fps=fps,
+                    include_audio=False,
+                    encoder=encoder,
+                    threads=threads
+                )
+                first_frame = int(round((part['start_time'] - range_start) * fps))
+                jobs.append({
+                    'index': i,
+                    'cmd': cmd,
+                    'title_input': title_input,
+                    'dir': job_dir,
+                    'video_only_path': video_only_path,
+                    'audio_path': os.path.join(job_dir, 'audio.m4a') if has_audio else None,
+                    'output_path': output_path,
+                    'first_frame': first_frame,
+                    'last_frame': first_frame + max(1, int(round(clip_duration * fps))),
+                    'process': None,
+                    'stderr': None,
+                    'failed': False,
+                })
+            except Exception as e:
+                print(f"\nKısa video hazırlanırken hata: {str(e)}")
+                result['error'] = str(e)
+                close_title_input(title_input)
 
-                        overlay_clips_for_this_short.append(title_bg)
-                        overlay_clips_for_this_short.append(txt_clip)
+        if not jobs:
+            return [results[i] for i in sorted(results)]
 
-                    except Exception as e:
-                        print(f"Başlık eklenirken hata oluştu: {str(e)}")
-                        print("Hata detayları:")
-                        import traceback
-                        traceback.print_exc()
-                        print("Başlık olmadan devam ediliyor...")
-                        # Başlık olmadan devam etmek için varsayılan çıktı klasörü oluştur
-                        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-                        output_dir = os.path.join('.', f"shorts_output_{timestamp}")
-                        os.makedirs(output_dir, exist_ok=True)
-
-                # Tüm klipleri birleştir
-                final_clips_list = [bg_combined, clip] + overlay_clips_for_this_short
-
-                # Altyazıları ekle (eğer srt_path varsa) - OPTİMİZE EDİLMİŞ VERSİYON
-                if srt_path and os.path.exists(srt_path):
-                    print(f"\n  Altyazılar {srt_path} dosyasından alınıyor...")
-                    
-                    try:
-                        with open(srt_path, 'r', encoding='utf-8') as f:
-                            full_subs = list(srt.parse(f.read()))
-
-                        # Sadece mevcut klibin zaman aralığına düşen altyazıları filtrele
-                        relevant_subs = [
-                            sub for sub in full_subs
-                            if not (sub.end.total_seconds() < start_time or sub.start.total_seconds() > end_time)
-                        ]
-                        
-                        print(f"  Klip {i+1}/{len(viral_parts)} için {len(relevant_subs)} altyazı segmenti işlenecek.")
-                        print(f"  Video: {video_id}")
-                        print(f"  Başlık: {title_full}")
-                        print(f"  Süre: {clip_duration:.2f} saniye")
-
-                        subtitle_clips_added = 0
-                        max_processing_time = 120  # 2 dakika maksimum
-                        start_processing_time = time.time()
-                        
-                        for sub_idx, sub in enumerate(relevant_subs):
-                            try:
-                                # Timeout kontrolü
-                                if time.time() - start_processing_time > max_processing_time:
-                                    print(f"  ⚠️ İşleme zaman aşımı! {max_processing_time} saniye geçti.")
-                                    print(f"  {subtitle_clips_added} altyazı başarıyla eklendi.")
-                                    break
-                                
-                                # İlerleme göster
-                                if sub_idx % 3 == 0:
-                                    progress = (sub_idx / len(relevant_subs)) * 100
-                                    print(f"  Altyazı işleniyor: %{progress:.1f} ({sub_idx}/{len(relevant_subs)}) - {subtitle_clips_added} eklendi")
-                                
-                                sub_start = sub.start.total_seconds() - start_time
-                                sub_end = sub.end.total_seconds() - start_time
-                                
-                                if sub_end <= sub_start or sub_end - sub_start < 0.5:
-                                    continue
-
-                                # Basit ve hızlı altyazı oluştur
-                                sub_content = sub.content[:80]  # Maksimum 80 karakter
-                                
-                                sub_txt_clip = TextClip(
-                                    sub_content,
-                                    fontsize=55,
-                                    color='white',
-                                    font='Arial-Bold',
-                                    method='caption',
-                                    size=(target_w - 80, None)
-                                )
-                                sub_txt_clip = sub_txt_clip.set_duration(sub_end - sub_start)
-                                sub_txt_clip = sub_txt_clip.set_start(sub_start)
-                                
-                                # Basit arka plan
-                                sub_bg = ColorClip(size=(target_w, 70), color=(0, 0, 0, 150))
-                                sub_bg = sub_bg.set_duration(sub_end - sub_start)
-                                sub_bg = sub_bg.set_start(sub_start)
-                                sub_bg = sub_bg.set_position(('center', target_h - 350 - 70))
-                                
-                                sub_txt_clip = sub_txt_clip.set_position(('center', target_h - 350 - 70 + 5))
-
-                                final_clips_list.append(sub_bg)
-                                final_clips_list.append(sub_txt_clip)
-                                subtitle_clips_added += 1
-                                
-                            except Exception as e:
-                                print(f"  Altyazı segmenti işlenirken hata: {str(e)}")
-                                continue
-                        
-                        print(f"\n  ✓ {subtitle_clips_added} altyazı eklendi!")
-                        
-                    except Exception as e:
-                        print(f"  ⚠️ Altyazı işleme sırasında hata oluştu: {str(e)}")
-                        print("  Altyazısız devam ediliyor...")
-
-                # CompositeVideoClip oluştur
-                final_clip = CompositeVideoClip(
-                    final_clips_list,
-                    size=(target_w, target_h)
-                ).set_duration(clip_duration)
-                
-                # Klibi kaydet
-                output_path = os.path.join(output_dir, f'{video_id}_{safe_title}_{timestamp}.mp4')
-                print(f"\nKısa video kaydediliyor: {output_path}")
-                print("Bu işlem birkaç dakika sürebilir...")
-                
-                # Önce NVIDIA NVENC ile kaydetmeyi dene
-                try:
-                    print("NVIDIA NVENC ile kaydediliyor...")
-                    final_clip.write_videofile(
-                        output_path.replace(".mp4", "_nvenc.mp4"),
-                        codec='h264_nvenc',
-                        bitrate='4000k',
-                        audio_codec='aac',
-                        audio_bitrate='192k',
-                        preset='p7',
-                        ffmpeg_params=[
-                            '-rc:v', 'vbr_hq',
-                            '-cq:v', '23',
-                            '-movflags', '+faststart',
-                            '-pix_fmt', 'yuv420p',
-                            '-colorspace', 'bt709',
-                            '-color_primaries', 'bt709',
-                            '-color_trc', 'bt709',
-                            '-color_range', 'tv'
-                        ],
-                        verbose=True,  # İlerleme göster
-                        logger=None  # Logger'ı kapat
-                    )
-                    print(f"\n✓ Kısa video (NVIDIA NVENC ile) kaydedildi: {output_path.replace('.mp4', '_nvenc.mp4')}")
-                except Exception as e:
-                    print(f"\nUyarı: NVIDIA NVENC ile video kaydedilirken hata oluştu: {str(e)}")
-                    print("CPU tabanlı libx264 kodlayıcısına geri dönülüyor...")
-                    # Hata durumunda CPU tabanlı libx264 kodlayıcısı ile kaydet
-                    try:
-                        print("libx264 ile kaydediliyor...")
-                        final_clip.write_videofile(
-                            output_path,
-                            codec='libx264',
-                            bitrate='4000k',
-                            audio_codec='aac',
-                            audio_bitrate='192k',
-                            preset='medium',
-                            threads=4,
-                            ffmpeg_params=[
-                                '-crf', '23',
-                                '-movflags', '+faststart',
-                                '-pix_fmt', 'yuv420p',
-                                '-vf', 'format=yuv420p,pad=ceil(iw/2)*2:ceil(ih/2)*2',
-                                '-colorspace', 'bt709',
-                                '-color_primaries', 'bt709',
-                                '-color_trc', 'bt709',
-                                '-color_range', 'tv'
-                            ],
-                            verbose=True,  # İlerleme göster
-                            logger=None  # Logger'ı kapat
+        # Tek decoder: video karelerini stdout'a, her kısmın sesini ayrı dosyaya yazar
+        filters = [f"[0:v]fps={fps:.3f},scale={main_w}:{main_h},setsar=1,format=rgb24[vraw]"]
+        audio_outputs = []
+        if has_audio:
+            filters.append(f"[0:a]asplit={len(jobs)}" + "".join(f"[as{k}]" for k in range(len(jobs))))
+            for k, job in enumerate(jobs):
+                part = viral_parts[job['index']]
+                audio_start = part['start_time'] - range_start
+                audio_end = part['end_time'] - range_start
+                filters.append(
+                    f"[as{k}]atrim=start={audio_start:.3f}:end={audio_end:.3f},"
+                    f"asetpts=PTS-STARTPTS,volume=1.75[ao{k}]"  # Ses seviyesini %175'e çıkar
+                )
+                audio_outputs += ['-map', f"[ao{k}]", '-c:a', 'aac', '-b:a', '192k', job['audio_path']]
+
+        decoder_cmd = [
+            FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error',
+            '-ss', f"{range_start:.3f}", '-t', f"{range_end - range_start + 1.0 / fps:.3f}", '-i', video_path,
+            '-filter_complex', ';'.join(filters),
+            '-map', '[vraw]', '-f', 'rawvideo', 'pipe:1'
+        ] + audio_outputs
+
+        decoder_log_path = os.path.join(work_dir, 'decoder.log')
+        with open(decoder_log_path, 'w', encoding='utf-8') as decoder_log:
+            decoder = subprocess.Popen(decoder_cmd, stdout=subprocess.PIPE, stderr=decoder_log)
+            frame_index = 0
+            pending = list(jobs)
+            active = []
+            try:
+                while pending or active:
+                    frame = decoder.stdout.read(frame_bytes)
+                    if len(frame) < frame_bytes:
+                        break
+
+                    # Başlama zamanı gelen kodlayıcıları başlat
+                    while pending and pending[0]['first_frame'] <= frame_index:
+                        job = pending.pop(0)
+                        job['stderr'] = open(os.path.join(job['dir'], 'encoder.log'), 'w', encoding='utf-8')
+                        title_input = job['title_input']
+                        job['process'] = subprocess.Popen(
+                            job['cmd'], stdin=subprocess.PIPE, stderr=job['stderr'],
+                            pass_fds=(title_input['read_fd'],) if title_input and title_input['read_fd'] is not None else ()
                         )
-                        print(f"\n✓ Kısa video (libx264 ile) kaydedildi: {output_path}")
-                    except Exception as e2:
-                        print(f"\n❌ Video kaydetme tamamen başarısız: {str(e2)}")
-                        print("Bir sonraki viral kısma geçiliyor...")
-                        continue
+                        feed_title_input(title_input)
+                        active.append(job)
+                        print(f"  Kısım {job['index'] + 1} kodlanmaya başladı (kare {frame_index})")
 
-            except Exception as e:
-                print(f"\nKısa video oluşturulurken hata: {str(e)}")
-                print("Hata detayları:")
-                import traceback
-                traceback.print_exc()
-                print("Bir sonraki viral kısma geçiliyor...")
+                    # Kareyi aktif olan tüm kısımlara dağıt
+                    for job in list(active):
+                        if frame_index >= job['last_frame']:
+                            job['process'].stdin.close()
+                            active.remove(job)
+                            continue
+                        try:
+                            job['process'].stdin.write(frame)
+                        except (BrokenPipeError, OSError) as e:
+                            print(f"  ⚠️ Kısım {job['index'] + 1} kodlayıcısı durdu: {str(e)}")
+                            job['failed'] = True
+                            active.remove(job)
+
+                    frame_index += 1
+                    if frame_index % int(fps * 60) == 0:
+                        print(f"  Decode ilerlemesi: {range_start + frame_index / fps:.0f}s / {range_end:.0f}s")
+            finally:
+                for job in active:
+                    try:
+                        job['process'].stdin.close()
+                    except OSError:
+                        pass
+                # Hiç başlatılamayan kısımların başlık borularını kapat
+                for job in pending:
+                    close_title_input(job['title_input'])
+                # Ses çıktılarının eksiksiz yazılması için kalan kareleri boşalt
+                while decoder.stdout.read(frame_bytes):
+                    pass
+                decoder.stdout.close()
+                decoder.wait()
+
+        # Kodlayıcıları bekle ve sesle birleştir
+        for job in jobs:
+            result = results[job['index']]
+            process = job['process']
+            if process is None:
+                result['error'] = "Kaynak video kısmın başlangıcına ulaşmadan bitti"
                 continue
-        
-        video.close()
-        bg_video.close()
+            process.wait()
+            job['stderr'].close()
+            if process.returncode != 0 or job['failed']:
+                with open(os.path.join(job['dir'], 'encoder.log'), encoding='utf-8', errors='replace') as f:
+                    result['error'] = f"FFmpeg render hatası: {f.read().strip()[-2000:]}"
+                print(f"\n❌ Kısım {job['index'] + 1} kaydedilemedi: {result['error']}")
+                continue
+
+            if job['audio_path'] and os.path.exists(job['audio_path']):
+                mux_cmd = [
+                    FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error',
+                    '-i', job['video_only_path'], '-i', job['audio_path'],
+                    '-map', '0:v:0', '-map', '1:a:0', '-c', 'copy',
+                    '-movflags', '+faststart', job['output_path']
+                ]
+                mux = subprocess.run(mux_cmd, capture_output=True, text=True)
+                if mux.returncode != 0:
+                    result['error'] = f"Ses birleştirme hatası: {mux.stderr.strip()[-2000:]}"
+                    print(f"\n❌ Kısım {job['index'] + 1} kaydedilemedi: {result['error']}")
+                    continue
+            else:
+                shutil.move(job['video_only_path'], job['output_path'])
+
+            result['output_path'] = job['output_path']
+            print(f"\n✓ Kısa video (toplu FFmpeg ile) kaydedildi: {job['output_path']}")
+
+        if decoder.returncode not in (0, None):
+            with open(decoder_log_path, encoding='utf-8', errors='replace') as f:
+                print(f"⚠️ Decoder hatası: {f.read().strip()[-2000:]}")
+
+    return [results[i] for i in sorted(results)]
+
+def load_logo_clip(logo_path):
+    """Logoyu yükler ve sol ortaya yerleştirilecek şekilde boyutlandırır"""
+    if not logo_path:
+        return None
+    try:
+        from moviepy.editor import ImageClip
+        logo = ImageClip(logo_path)
+        # Logo boyutunu ayarla (video yüksekliğinin %15'i)
+        logo = logo.resize(height=int(1920 * 0.15))
+        # Logo pozisyonunu ayarla (sol orta)
+        logo = logo.set_position(('left', 'center'))
+        print(f"✓ Logo yüklendi ve boyutlandırıldı: {logo_path}")
+        return logo
+    except Exception as e:
+        print(f"! Logo yüklenirken hata oluştu: {str(e)}")
+        return None
+
+def resolve_render_workers(workers, part_count):
+    """Render işçi sayısını belirler (None/0 ise çekirdek sayısına göre otomatik)"""
+    if not workers or workers < 0:
+        # Her iş için ~4 FFmpeg thread bırakacak kadar işçi
+        workers = max(1, (os.cpu_count() or 4) // 4)
+    return max(1, min(workers, part_count or 1))
+
+# Her render işçisinde (süreç veya iş parçacığı) bir kez açılıp kısımlar arasında paylaşılan kaynaklar
+_render_worker_local = threading.local()
+
+def get_render_worker_state():
+    """Bu iş parçacığının render işçisi durum sözlüğünü döndürür"""
+    state = getattr(_render_worker_local, 'state', None)
+    if state is None:
+        state = _render_worker_local.state = {}
+    return state
+
+def render_pool_context():
+    """Render ve parçalı transkript süreç havuzları için çok iş parçacıklı süreçten güvenle başlatılabilen bağlamı döndürür
+
+    Hat ve akış modunda havuzlar, iş parçacıkları (ve Whisper ısıtması) çalışırken açıldığından
+    fork yerine spawn kullanılır.
+    """
+    import multiprocessing
+
+    return multiprocessing.get_context('spawn')
+
+def init_render_worker(video_path, renderer, logo_path, threads, bg_path="bg.mp4", subtitle_mode=None):
+    """Render işçisi için kaynak videoyu, bg.mp4'ü, logoyu ve fontu bir kez açar"""
+    configure_environment()
+    state = get_render_worker_state()
+    state.clear()
+    state.update({
+        'video_path': video_path,
+        'renderer': renderer,
+        'logo_path': logo_path,
+        'threads': threads,
+        'bg_path': bg_path,
+        'subtitle_mode': subtitle_mode,
+    })
+    if renderer == "moviepy":
+        from moviepy.editor import VideoFileClip
+        state['video'] = VideoFileClip(video_path)
+        state['bg_video'] = VideoFileClip(bg_path)
+        state['logo'] = load_logo_clip(logo_path)
+    else:
+        state['source_info'] = probe_video(video_path)
+        state['bg_info'] = probe_video(bg_path)
+    # Başlık fontunu önceden yükle (load_font önbelleğinde kalır)
+    load_font('DynaPuff/static/DynaPuff-Regular.ttf', 90)
+
+def close_render_worker():
+    """Render işçisinin açtığı kaynakları kapatır"""
+    state = get_render_worker_state()
+    for key in ('video', 'bg_video'):
+        clip = state.get(key)
+        if clip is not None:
+            clip.close()
+    state.clear()
+
+def render_part_in_worker(index, part, total, subtitles, video_id, collect_spans=False):
+    """Tek bir viral kısmı işçinin paylaşılan kaynaklarıyla render eder
+
+    collect_spans=True ise (süreç havuzunda) işçinin profil kayıtları sonuçla birlikte döndürülür.
+    """
+    state = get_render_worker_state()
+    result = {'index': index, 'start_time': part['start_time'], 'end_time': part['end_time'],
+              'output_path': None, 'error': None}
+    try:
+        with span('render_part', index=index, start_time=part['start_time'], end_time=part['end_time'],
+                  renderer=state['renderer']):
+            if state['renderer'] == "moviepy":
+                result['output_path'] = render_short_moviepy(
+                    state['video'], state['bg_video'], state['logo'], part, index, total,
+                    subtitles=subtitles, video_id=video_id, threads=state['threads'],
+                    subtitle_mode=state['subtitle_mode']
+                )
+            else:
+                result['output_path'] = render_short_ffmpeg(
+                    state['video_path'], part, index, total, state['source_info'],
+                    subtitles=subtitles, logo_path=state['logo_path'], video_id=video_id,
+                    bg_path=state['bg_path'], bg_info=state['bg_info'], threads=state['threads'],
+                    subtitle_mode=state['subtitle_mode']
+                )
+    except Exception as e:
+        print(f"\nKısa video oluşturulurken hata: {str(e)}")
+        print("Hata detayları:")
+        import traceback
+        traceback.print_exc()
+        print("Bir sonraki viral kısma geçiliyor...")
+        result['error'] = str(e)
+    if collect_spans:
+        result['spans'] = take_profile_spans()
+    return result
+
+def prepare_render_inputs(video_path):
+    """Video dosyasını, logoyu ve hazır arka planı bulur; (video_path, video_id, logo_path, bg_path) döndürür"""
+    # Video uzantısını kontrol et ve gerekirse değiştir
+    video_path_without_ext = os.path.splitext(video_path)[0]
+    if not os.path.exists(video_path):
+        # Yaygın video formatlarını dene
+        common_extensions = ['.mp4', '.mkv', '.webm', '.avi', '.mov']
+        video_found = False
+
+        for ext in common_extensions:
+            test_path = video_path_without_ext + ext
+            if os.path.exists(test_path):
+                video_path = test_path
+                video_found = True
+                print(f"Video dosyası bulundu: {video_path}")
+                break
+
+        if not video_found:
+            raise FileNotFoundError(f"Video dosyası bulunamadı. Aranan formatlar: {', '.join(common_extensions)}")
+
+    print(f"\nVideo dosyası bulundu: {video_path}")
+    video_id = os.path.splitext(os.path.basename(video_path))[0]
+
+    logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
+    if not os.path.exists(logo_path):
+        print(f"! Logo dosyası bulunamadı: {logo_path}")
+        print("! Logo dosyası ana dizinde 'logo.png' olarak bulunmalıdır.")
+        logo_path = None
+
+    # Arka planı bir kez dikey formata hazırla (önbellekte varsa doğrudan kullan)
+    try:
+        bg_path = prepare_background("bg.mp4")
+    except Exception as e:
+        print(f"! Arka plan hazırlanamadı, orijinal bg.mp4 kullanılacak: {str(e)}")
+        bg_path = "bg.mp4"
+    return video_path, video_id, logo_path, bg_path
+
+def open_render_session(video_path, renderer="ffmpeg", workers=1, subtitle_mode=None):
+    """Kısımları geldikçe render eden, kaynakları bir kez hazırlayan uzun ömürlü render oturumu açar
+
+    Arka plan hazırlığı, logo ve işçilerin açtığı klipler oturum boyunca paylaşılır.
+    workers>1 ise spawn süreç havuzu, aksi halde tek bir render iş parçacığı kullanılır.
+    Kısım sayısı önceden bilinmediğinden ffmpeg_batch yerine kısım başına ffmpeg kullanılır.
+    """
+    if renderer == "ffmpeg_batch":
+        renderer = "ffmpeg"
+    if renderer not in ("moviepy", "ffmpeg"):
+        raise ValueError(f"Geçersiz renderer: {renderer}")
+    subtitle_mode = subtitle_mode or SHORTS_SUBTITLE_MODE
+    if subtitle_mode not in ("atlas", "ass"):
+        raise ValueError(f"Geçersiz altyazı modu: {subtitle_mode}")
+    video_path, video_id, logo_path, bg_path = prepare_render_inputs(video_path)
+    workers = resolve_render_workers(workers, sys.maxsize)
+    threads = max(1, (os.cpu_count() or 4) // workers)
+    initargs = (video_path, renderer, logo_path, threads, bg_path, subtitle_mode)
+    if workers > 1:
+        print(f"Render oturumu: {workers} işçi süreç, iş başına {threads} FFmpeg thread")
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=render_pool_context(),
+            initializer=init_render_worker, initargs=initargs
+        )
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='render', initializer=init_render_worker, initargs=initargs
+        )
+    return {'executor': executor, 'pooled': workers > 1, 'video_id': video_id, 'futures': []}
+
+def submit_render(session, part, subtitles):
+    """Kısmı render oturumuna gönderir (subtitles: load_part_subtitles çıktısı)"""
+    index = len(session['futures'])
+    session['futures'].append(session['executor'].submit(
+        render_part_in_worker, index, part, '?', subtitles, session['video_id'],
+        collect_spans=session['pooled'] and _profile_enabled
+    ))
+
+def close_render_session(session):
+    """Gönderilen tüm kısımları bekler, işçi kaynaklarını kapatır ve sonuçları sırayla döndürür"""
+    results = []
+    try:
+        for future in session['futures']:
+            result = future.result()
+            merge_profile_spans(result.pop('spans', None))
+            results.append(result)
+    finally:
+        if not session['pooled']:
+            session['executor'].submit(close_render_worker).result()
+        session['executor'].shutdown(wait=True)
+    return results
+
+@traced()
+def create_shorts(video_path, viral_parts, srt_path=None, renderer="moviepy", workers=1, subs=None,
+                  subtitle_mode=None):
+    """Viral kısımlardan Shorts videoları oluşturur
+
+    renderer="moviepy" katmanları Python'da birleştirir, renderer="ffmpeg" ise
+    aynı yerleşimi tek bir FFmpeg filter-graph çağrısına derler. renderer="ffmpeg_batch"
+    kaynak videoyu tek seferde decode edip kareleri tüm kısımlara dağıtır.
+    workers>1 (veya None/0 ile otomatik) kısımları süreç havuzunda paralel render eder.
+    subs verilirse altyazılar SRT dosyası yerine bu listeden alınır.
+    subtitle_mode 'atlas' (PIL sprite atlası) veya 'ass' (libass); varsayılan SHORTS_SUBTITLE_MODE.
+    """
+    if renderer not in ("moviepy", "ffmpeg", "ffmpeg_batch"):
+        raise ValueError(f"Geçersiz renderer: {renderer}")
+    subtitle_mode = subtitle_mode or SHORTS_SUBTITLE_MODE
+    if subtitle_mode not in ("atlas", "ass"):
+        raise ValueError(f"Geçersiz altyazı modu: {subtitle_mode}")
+
+    try:
+        video_path, video_id, logo_path, bg_path = prepare_render_inputs(video_path)
+
+        # Altyazıları bir kez oku, her kısım için filtrele
+        full_subs = list(subs) if subs is not None else []
+        if subs is None and srt_path and os.path.exists(srt_path):
+            print(f"\n  Altyazılar {srt_path} dosyasından alınıyor...")
+            try:
+                with open(srt_path, 'r', encoding='utf-8') as f:
+                    full_subs = list(srt.parse(f.read()))
+            except Exception as e:
+                print(f"  ⚠️ Altyazı işleme sırasında hata oluştu: {str(e)}")
+                print("  Altyazısız devam ediliyor...")
+                full_subs = []
+
+        # Viral kısımları sırala (en ilgi çekici olanlar önce)
+        viral_parts.sort(key=lambda x: x.get('start_time', 0))
+
+        print(f"\nToplam {len(viral_parts)} viral kısım işlenecek")
+
+        workers = resolve_render_workers(workers, len(viral_parts))
+        threads = max(1, (os.cpu_count() or 4) // workers)
+
+        results = []
+        if renderer == "ffmpeg_batch" and viral_parts:
+            results = render_shorts_batched(
+                video_path, viral_parts, probe_video(video_path), full_subs=full_subs,
+                logo_path=logo_path, video_id=video_id, bg_path=bg_path, threads=threads,
+                subtitle_mode=subtitle_mode
+            )
+        elif workers > 1:
+            print(f"Paralel render: {workers} işçi süreç, iş başına {threads} FFmpeg thread")
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=render_pool_context(),
+                initializer=init_render_worker,
+                initargs=(video_path, renderer, logo_path, threads, bg_path, subtitle_mode)
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        render_part_in_worker, i, part, len(viral_parts),
+                        load_part_subtitles(full_subs, part['start_time'], part['end_time']), video_id,
+                        collect_spans=_profile_enabled
+                    )
+                    for i, part in enumerate(viral_parts)
+                ]
+                results = [future.result() for future in futures]
+            # İşçi süreçlerin profil kayıtlarını bu sürecin profiline aktar
+            for result in results:
+                merge_profile_spans(result.pop('spans', None))
+        else:
+            init_render_worker(video_path, renderer, logo_path, threads, bg_path, subtitle_mode)
+            try:
+                for i, part in enumerate(viral_parts):
+                    subtitles = load_part_subtitles(full_subs, part['start_time'], part['end_time'])
+                    results.append(render_part_in_worker(i, part, len(viral_parts), subtitles, video_id))
+            finally:
+                close_render_worker()
+
         print("\n✓ Tüm viral kısımlar işlendi!")
-        
+        return results
+
     except Exception as e:
         print(f"Video işlenirken hata oluştu: {str(e)}")
         print("Hata detayları:")
@@ -1398,6 +3233,8 @@ def create_shorts(video_path, viral_parts, srt_path=None):
 
 def extract_hardcoded_subtitles(video_path):
     """Video içindeki hardcoded altyazıları çıkarmaya çalışır"""
+    import cv2
+
     try:
         print("\nVideo içindeki altyazılar taranıyor...")
         video = cv2.VideoCapture(video_path)
@@ -1521,61 +3358,638 @@ def read_srt_file(file_path):
         print(f"SRT dosyası okuma hatası: {str(e)}")
         return ""
 
-def transcribe_audio(video_path, language=None):
-    """Whisper kullanarak videodaki konuşmaları transkript eder"""
+def extract_audio_array(video_path, sample_rate=16000):
+    """FFmpeg ile video akışını açmadan sesi mono float32 NumPy dizisi olarak çıkarır"""
+    configure_environment()
+    print(f"Ses çıkarılıyor ({sample_rate} Hz mono): {video_path}")
+    result = subprocess.run([
+        FFMPEG_BINARY, '-nostdin', '-hide_banner', '-loglevel', 'error',
+        '-i', video_path,
+        '-map', '0:a:0', '-vn', '-sn', '-dn',
+        '-ac', '1', '-ar', str(sample_rate),
+        '-f', 'f32le', '-acodec', 'pcm_f32le',
+        'pipe:1'
+    ], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Ses çıkarma hatası: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    audio = np.frombuffer(result.stdout, dtype=np.float32)
+    print(f"✓ Ses çıkarıldı: {len(audio) / sample_rate:.1f} saniye")
+    return audio
+
+def get_process_rss_bytes():
+    """Sürecin anlık bellek kullanımını (RSS) byte olarak döndürür"""
     try:
-        print("\nKonuşmalar transkript ediliyor...")
-        
-        # Whisper modelini yükle
-        model = WhisperModel("small", device="cuda" if torch.cuda.is_available() else "cpu", compute_type="float32")
-        
-        # Videodan ses dosyasını çıkar
-        audio_path = "temp_audio.wav"
-        video = VideoFileClip(video_path)
-        video.audio.write_audiofile(audio_path, codec='pcm_s16le')
-        
-        # Transkript yap
-        print("\nSes transkripsiyonu başlatılıyor...")
-        segments, info = model.transcribe(
-            audio_path,
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+# Süreç boyunca yüklü tutulan Whisper modelleri (model boyutu, cihaz, hesaplama tipi)
+_whisper_model_pool = {}
+_whisper_model_stats = {}
+# Havuz sözlükleri için kısa süreli kilit; yükleme ve ısıtma model anahtarı başına kilitle yapılır
+_whisper_pool_lock = threading.Lock()
+_whisper_key_locks = {}
+
+def whisper_key_lock(key):
+    """Model anahtarına özel kilidi döndürür; farklı ayarlardaki modeller birbirini beklemez"""
+    with _whisper_pool_lock:
+        return _whisper_key_locks.setdefault(key, threading.Lock())
+
+@functools.lru_cache(maxsize=None)
+def cuda_available():
+    """CUDA aygıtı var mı kontrol eder (torch yüklemeden, CTranslate2 üzerinden)"""
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+def resolve_transcription_config(config=None):
+    """Transkript ayarlarını varsayılanlarla birleştirir ve 'auto' değerlerini cihaza göre çözer"""
+    resolved = dict(TRANSCRIPTION_DEFAULTS)
+    resolved.update({key: value for key, value in (config or {}).items() if value is not None})
+    if resolved['device'] in (None, 'auto'):
+        resolved['device'] = "cuda" if cuda_available() else "cpu"
+    if resolved['compute_type'] in (None, 'auto'):
+        # CPU'da int8 float32'den birkaç kat hızlı ve çok daha az bellek kullanır
+        resolved['compute_type'] = "float16" if resolved['device'] == "cuda" else "int8"
+    if resolved['cpu_threads'] in (None, 'auto'):
+        resolved['cpu_threads'] = 0  # 0: CTranslate2 varsayılanı (tüm çekirdekler)
+    return resolved
+
+def whisper_pool_key(model_size="small", device=None, compute_type="auto", cpu_threads=0, num_workers=1):
+    """Model ayarlarını çözer; (havuz anahtarı, çözülmüş ayarlar) döndürür"""
+    config = resolve_transcription_config({
+        'model_size': model_size,
+        'device': device,
+        'compute_type': compute_type,
+        'cpu_threads': cpu_threads,
+        'num_workers': num_workers,
+    })
+    key = (config['model_size'], config['device'], config['compute_type'],
+           config['cpu_threads'], config['num_workers'])
+    return key, config
+
+def get_whisper_model(model_size="small", device=None, compute_type="auto", cpu_threads=0, num_workers=1):
+    """Whisper modelini süreç başına bir kez yükler ve sonraki çağrılarda havuzdan döndürür"""
+    key, config = whisper_pool_key(model_size, device, compute_type, cpu_threads, num_workers)
+
+    # Yükleme sadece bu anahtarın kilidini tutar; havuz kilidi yalnızca sözlük erişiminde alınır
+    with whisper_key_lock(key):
+        with _whisper_pool_lock:
+            model = _whisper_model_pool.get(key)
+        if model is None:
+            print(f"Whisper modeli yükleniyor: {config['model_size']} ({config['device']}, {config['compute_type']})")
+            rss_before = get_process_rss_bytes()
+            load_start = time.perf_counter()
+            from faster_whisper import WhisperModel
+            model = WhisperModel(
+                config['model_size'],
+                device=config['device'],
+                compute_type=config['compute_type'],
+                cpu_threads=config['cpu_threads'],
+                num_workers=config['num_workers']
+            )
+            load_seconds = time.perf_counter() - load_start
+            rss_after = get_process_rss_bytes()
+            model_stats = {
+                'model_size': config['model_size'],
+                'device': config['device'],
+                'compute_type': config['compute_type'],
+                'cpu_threads': config['cpu_threads'],
+                'num_workers': config['num_workers'],
+                'load_seconds': load_seconds,
+                'rss_delta_bytes': (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+                'uses': 0,
+                'warmed_up': False,
+                'warmup_seconds': None,
+            }
+            with _whisper_pool_lock:
+                _whisper_model_pool[key] = model
+                _whisper_model_stats[key] = model_stats
+            print(f"✓ Whisper modeli {load_seconds:.2f} saniyede yüklendi")
+    with _whisper_pool_lock:
+        model_stats = _whisper_model_stats.setdefault(key, {'uses': 0, 'warmed_up': False, 'warmup_seconds': None})
+        model_stats['uses'] += 1
+    return model, model_stats
+
+def warmup_whisper_model(model_size="small", device=None, compute_type="auto", cpu_threads=0, num_workers=1):
+    """Modeli yükler ve kısa bir sessizlik üzerinde çalıştırarak ilk transkript gecikmesini önler"""
+    model, stats = get_whisper_model(model_size, device, compute_type, cpu_threads, num_workers)
+    key, _ = whisper_pool_key(model_size, device, compute_type, cpu_threads, num_workers)
+    # Isıtma model kilidi altında (aynı model iki kez ısıtılmaz), sayaçlar havuz kilidi altında yazılır
+    with whisper_key_lock(key):
+        with _whisper_pool_lock:
+            warmed_up = stats['warmed_up']
+        if not warmed_up:
+            warmup_start = time.perf_counter()
+            segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1)
+            list(segments)
+            warmup_seconds = time.perf_counter() - warmup_start
+            with _whisper_pool_lock:
+                stats['warmup_seconds'] = warmup_seconds
+                stats['warmed_up'] = True
+            print(f"✓ Whisper modeli ısıtıldı ({warmup_seconds:.2f} saniye)")
+    return model
+
+def start_whisper_warmup(config=None):
+    """Varsayılan transkript ayarlarındaki modeli arka planda yükleyip ısıtan iş parçacığını başlatır
+
+    İlk video indirilirken model hazırlanır; aynı modeli isteyen transkript aşaması yükleme
+    bitene kadar modelin kilidinde bekler. Isıtma hatası (ör. faster-whisper yok) sadece uyarı olarak yazılır.
+    """
+    config = resolve_transcription_config(config)
+
+    def warmup():
+        try:
+            warmup_whisper_model(config['model_size'], config['device'], config['compute_type'],
+                                 config['cpu_threads'], config['num_workers'])
+        except Exception as e:
+            print(f"Uyarı: Whisper modeli önceden yüklenemedi: {str(e)}")
+
+    thread = threading.Thread(target=warmup, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def whisper_pool_stats():
+    """Havuzdaki modellerin yükleme süresi, kullanım sayısı ve bellek istatistiklerini döndürür"""
+    with _whisper_pool_lock:
+        models = [dict(stats) for stats in _whisper_model_stats.values()]
+    return {
+        'models': models,
+        'process_rss_bytes': get_process_rss_bytes(),
+    }
+
+def release_whisper_models():
+    """Havuzdaki tüm Whisper modellerini serbest bırakır"""
+    with _whisper_pool_lock:
+        _whisper_model_pool.clear()
+        _whisper_model_stats.clear()
+
+def cache_file_path(namespace, key, extension='.json'):
+    """Önbellek alanı ve anahtar için dosya yolunu döndürür"""
+    return os.path.join(CACHE_DIR, namespace, f"{key}{extension}")
+
+def cache_read_json(namespace, key):
+    """Önbellekten JSON kaydı okur; yoksa None döndürür"""
+    path = cache_file_path(namespace, key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        os.utime(path)  # Son kullanım zamanını güncelle (boyut tabanlı silmede en son silinir)
+    except OSError:
+        pass
+    return data
+
+def cache_write_json(namespace, key, data, max_bytes=None):
+    """Önbelleğe JSON kaydı yazar ve gerekirse alanı boyut sınırına göre temizler"""
+    path = cache_file_path(namespace, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # İş parçacıkları aynı süreçte çalışabildiği için geçici ada thread kimliği de eklenir
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    if max_bytes:
+        evict_cache(namespace, max_bytes)
+    return path
+
+def evict_cache(namespace, max_bytes):
+    """Önbellek alanı boyut sınırını aşarsa en uzun süredir kullanılmayan kayıtları siler"""
+    directory = os.path.join(CACHE_DIR, namespace)
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith('.tmp'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            continue
+    if removed:
+        print(f"Önbellek temizlendi ({namespace}): {removed} kayıt silindi")
+    return removed
+
+def transcript_cache_key(audio, config, language):
+    """Ses parmak izi, model boyutu, dil ve beam size'dan transkript önbellek anahtarı üretir"""
+    digest = hashlib.sha256(np.ascontiguousarray(audio).tobytes())
+    digest.update(f"|{config['model_size']}|{language or 'auto'}|{config['beam_size']}".encode('utf-8'))
+    return digest.hexdigest()
+
+def segment_to_dict(segment, offset=0.0):
+    """faster-whisper segmentini (kelime zamanlarıyla) zaman ofseti eklenmiş sözlüğe çevirir"""
+    return {
+        'start': segment.start + offset,
+        'end': segment.end + offset,
+        'text': segment.text.strip(),
+        'words': [
+            [word.start + offset, word.end + offset, word.word]
+            for word in (segment.words or [])
+        ],
+    }
+
+def segments_to_subtitles(segments):
+    """Segment sözlüklerini srt.Subtitle listesine çevirir"""
+    return [
+        srt.Subtitle(
+            index=i+1,
+            start=dt.timedelta(seconds=segment['start']),
+            end=dt.timedelta(seconds=segment['end']),
+            content=segment['text']
+        )
+        for i, segment in enumerate(segments)
+    ]
+
+def find_chunk_boundaries(audio, sample_rate=16000, target_chunk_seconds=300):
+    """Sesi VAD ile bulunan sessizliklerden, hedef uzunluğa en yakın noktalardan böler"""
+    from faster_whisper.vad import get_speech_timestamps, VadOptions
+
+    total = len(audio)
+    target = int(target_chunk_seconds * sample_rate)
+    if total <= target * 1.5:
+        return [0, total]
+
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=300))
+    # Konuşma aralıkları arasındaki sessizliklerin orta noktaları
+    gap_midpoints = np.array([
+        (speech[k]['end'] + speech[k + 1]['start']) // 2
+        for k in range(len(speech) - 1)
+    ], dtype=np.int64)
+
+    boundaries = [0]
+    cursor = 0
+    while total - cursor > target * 1.5:
+        goal = cursor + target
+        candidates = gap_midpoints[(gap_midpoints > cursor + target // 2) & (gap_midpoints < cursor + target * 3 // 2)]
+        if len(candidates):
+            cut = int(candidates[np.argmin(np.abs(candidates - goal))])
+        else:
+            cut = goal  # Uygun sessizlik yoksa hedef noktadan kes
+        boundaries.append(cut)
+        cursor = cut
+    boundaries.append(total)
+    return boundaries
+
+def init_transcription_worker(config):
+    """Transkript işçisinde Whisper modelini bir kez yükler"""
+    get_whisper_model(
+        config['model_size'], config['device'], config['compute_type'],
+        config['cpu_threads'], config['num_workers']
+    )
+
+def detect_audio_language(audio_sample, config):
+    """Kısa bir ses örneğinden konuşma dilini tespit eder"""
+    model, _ = get_whisper_model(
+        config['model_size'], config['device'], config['compute_type'],
+        config['cpu_threads'], config['num_workers']
+    )
+    _, info = model.transcribe(audio_sample, beam_size=1)
+    return info.language
+
+def transcribe_chunk(audio_chunk, offset, language, config):
+    """Ses parçasını transkript eder ve segmentleri global zaman damgalarıyla döndürür"""
+    model, _ = get_whisper_model(
+        config['model_size'], config['device'], config['compute_type'],
+        config['cpu_threads'], config['num_workers']
+    )
+    segments, _ = model.transcribe(
+        audio_chunk,
+        language=language,
+        beam_size=config['beam_size'],
+        word_timestamps=True
+    )
+    return [segment_to_dict(segment, offset) for segment in segments]
+
+def iter_chunked_transcription(audio, language, config, workers=None, sample_rate=16000):
+    """Uzun sesi sessizliklerden bölüp parçaları paralel süreçlerde transkript eder, segmentleri sırayla üretir"""
+    boundaries = find_chunk_boundaries(audio, sample_rate, LONG_FORM_CHUNK_SECONDS)
+    chunk_count = len(boundaries) - 1
+    if not workers:
+        workers = max(1, (os.cpu_count() or 4) // 4)
+    workers = max(1, min(workers, chunk_count))
+
+    # Çekirdekleri işçiler arasında paylaştır
+    worker_config = dict(config)
+    worker_config['cpu_threads'] = max(1, (os.cpu_count() or 4) // workers)
+    worker_config['num_workers'] = 1
+    print(f"Uzun ses modu: {chunk_count} parça, {workers} işçi süreç, işçi başına {worker_config['cpu_threads']} thread")
+
+    # spawn: fork, havuz kilidini (ör. ısıtma iş parçacığı tutarken) çocuğa kilitli kopyalayabilir
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=render_pool_context(),
+        initializer=init_transcription_worker,
+        initargs=(worker_config,)
+    ) as executor:
+        if language is None:
+            # Tüm parçalar aynı dille transkript edilsin diye dili bir kez tespit et
+            language = executor.submit(detect_audio_language, audio[:30 * sample_rate], worker_config).result()
+            print(f"Tespit edilen dil: {language}")
+
+        futures = [
+            executor.submit(
+                transcribe_chunk,
+                audio[boundaries[k]:boundaries[k + 1]],
+                boundaries[k] / sample_rate,
+                language,
+                worker_config
+            )
+            for k in range(chunk_count)
+        ]
+        # Parçalar bitiş sırasından bağımsız olarak zaman sırasıyla üretilir
+        for k, future in enumerate(futures):
+            chunk_segments = sorted(future.result(), key=lambda segment: segment['start'])
+            print(f"  Parça {k+1}/{chunk_count} tamamlandı: {len(chunk_segments)} segment")
+            for segment in chunk_segments:
+                yield segment
+
+def iter_transcription_segments(video_path, language=None, config=None, stats=None, long_form="auto",
+                                workers=None, use_cache=True):
+    """Segmentleri üretildikçe döndürür ve aynı anda SRT dosyasına artımlı olarak yazar
+
+    config: model_size, device, compute_type, beam_size, cpu_threads, num_workers
+    ("auto" değerleri cihaza göre seçilir). stats sözlüğü verilirse gerçek zaman
+    faktörü ve süre bilgileriyle doldurulur. long_form=True (veya "auto" ile uzun
+    seslerde) ses sessizliklerden bölünüp parçalar paralel transkript edilir.
+    use_cache=True ise aynı ses/model/dil/beam için önceki transkript önbellekten döner.
+    """
+    print("\nKonuşmalar transkript ediliyor...")
+    config = resolve_transcription_config(config)
+    print(f"Transkript ayarları: model={config['model_size']}, cihaz={config['device']}, "
+          f"compute_type={config['compute_type']}, beam_size={config['beam_size']}, "
+          f"cpu_threads={config['cpu_threads']}, num_workers={config['num_workers']}")
+    
+    # Videodan sesi doğrudan 16 kHz mono float32 olarak belleğe çıkar
+    audio = extract_audio_array(video_path)
+    audio_seconds = len(audio) / 16000
+    srt_path = os.path.splitext(video_path)[0] + ".srt"
+    if stats is not None:
+        stats.update(config)
+        stats.update({'audio_seconds': audio_seconds, 'srt_path': srt_path})
+    
+    # Önbellekte aynı ses için transkript var mı?
+    cache_key = None
+    if use_cache:
+        cache_key = transcript_cache_key(audio, config, language)
+        cached = cache_read_json('transcripts', cache_key)
+        if cached is not None:
+            with open(srt_path, "w", encoding="utf-8") as f:
+                f.write(srt.compose(segments_to_subtitles(cached['segments'])))
+            if stats is not None:
+                stats.update({
+                    'transcribe_seconds': 0.0,
+                    'real_time_factor': 0.0,
+                    'segments': len(cached['segments']),
+                    'cache_hit': True,
+                    'cache_key': cache_key,
+                })
+            print(f"✓ Transkript önbellekten alındı ({len(cached['segments'])} segment): {srt_path}")
+            for segment in cached['segments']:
+                yield segment
+            return
+    
+    if long_form == "auto":
+        long_form = (audio_seconds >= LONG_FORM_MIN_SECONDS and config['device'] == "cpu"
+                     and (os.cpu_count() or 1) > 1)
+    
+    # Transkript yap
+    print("\nSes transkripsiyonu başlatılıyor...")
+    transcribe_start = time.perf_counter()
+    if long_form:
+        segment_iter = iter_chunked_transcription(audio, language, config, workers=workers)
+    else:
+        # Whisper modelini havuzdan al (süreç başına bir kez yüklenir)
+        model, _ = get_whisper_model(
+            config['model_size'], config['device'], config['compute_type'],
+            config['cpu_threads'], config['num_workers']
+        )
+        raw_segments, info = model.transcribe(
+            audio,
             language=language,
-            beam_size=5,
+            beam_size=config['beam_size'],
             word_timestamps=True
         )
-        
-        # SRT formatında altyazı oluştur
-        subs = []
-        for i, segment in enumerate(segments):
-            print(f"  Segment {i+1} işleniyor: [{segment.start:.2f}s - {segment.end:.2f}s] - {segment.text[:50]}...") # Yeni satır
-            start_time = dt.timedelta(seconds=segment.start)
-            end_time = dt.timedelta(seconds=segment.end)
-            
+        segment_iter = (segment_to_dict(segment) for segment in raw_segments)
+    
+    # SRT formatında altyazıyı segment geldikçe yaz
+    segments = []
+    with open(srt_path, "w", encoding="utf-8") as f:
+        for i, segment in enumerate(segment_iter):
+            print(f"  Segment {i+1} işleniyor: [{segment['start']:.2f}s - {segment['end']:.2f}s] - {segment['text'][:50]}...") # Yeni satır
             sub = srt.Subtitle(
                 index=i+1,
-                start=start_time,
-                end=end_time,
-                content=segment.text.strip()
+                start=dt.timedelta(seconds=segment['start']),
+                end=dt.timedelta(seconds=segment['end']),
+                content=segment['text']
             )
-            subs.append(sub)
-        
-        # SRT dosyasını kaydet
-        srt_path = os.path.splitext(video_path)[0] + ".srt"
-        with open(srt_path, "w", encoding="utf-8") as f:
-            f.write(srt.compose(subs))
-        
-        # Geçici ses dosyasını sil
-        os.remove(audio_path)
-        
-        print(f"✓ Transkript tamamlandı! Altyazı dosyası kaydedildi: {srt_path}")
-        return srt_path
+            f.write(sub.to_srt())
+            f.flush()
+            segments.append(segment)
+            yield segment
+    
+    transcribe_seconds = time.perf_counter() - transcribe_start
+    real_time_factor = transcribe_seconds / audio_seconds if audio_seconds else 0.0
+    print(f"Transkript süresi: {transcribe_seconds:.1f} saniye, ses: {audio_seconds:.1f} saniye, "
+          f"gerçek zaman faktörü: {real_time_factor:.3f}")
+    if stats is not None:
+        stats.update({
+            'transcribe_seconds': transcribe_seconds,
+            'real_time_factor': real_time_factor,
+            'segments': len(segments),
+            'long_form': bool(long_form),
+            'cache_hit': False,
+            'cache_key': cache_key,
+        })
+    
+    if cache_key:
+        cache_write_json('transcripts', cache_key, {
+            'segments': segments,
+            'model_size': config['model_size'],
+            'language': language,
+            'beam_size': config['beam_size'],
+        }, max_bytes=TRANSCRIPT_CACHE_MAX_BYTES)
+    
+    print(f"✓ Transkript tamamlandı! Altyazı dosyası kaydedildi: {srt_path}")
+
+@traced()
+def transcribe_audio(video_path, language=None, config=None, stats=None, long_form="auto", workers=None,
+                     use_cache=True):
+    """Whisper kullanarak videodaki konuşmaları transkript eder ve SRT dosyasının yolunu döndürür"""
+    try:
+        for _ in iter_transcription_segments(video_path, language, config, stats, long_form, workers, use_cache):
+            pass
+        return os.path.splitext(video_path)[0] + ".srt"
         
     except Exception as e:
         print(f"Transkript hatası: {str(e)}")
         return None
 
+def parts_overlap(part_a, part_b, min_ratio=0.5):
+    """İki viral kısmın kısa olanın en az min_ratio kadarı örtüşüyorsa True döndürür"""
+    overlap = min(part_a['end_time'], part_b['end_time']) - max(part_a['start_time'], part_b['start_time'])
+    shorter = min(part_a['end_time'] - part_a['start_time'], part_b['end_time'] - part_b['start_time'])
+    return shorter > 0 and overlap / shorter >= min_ratio
+
+def iter_streaming_analysis(segment_iter, duration, window_seconds=600, overlap_seconds=60):
+    """Transkript sürerken tamamlanan pencereleri analiz eder ve kesinleşen kısımları üretir
+
+    Bir pencerenin sonuna overlap_seconds'tan yakın biten kısımlar bir sonraki
+    pencerede yeniden değerlendirilir; diğerleri hemen kesinleşir.
+    """
+    subs = []
+    confirmed = []
+    window_start = 0.0
+
+    def analyze_window(window_end, final):
+        window_subs = [
+            sub for sub in subs
+            if sub.end.total_seconds() > window_start and sub.start.total_seconds() < window_end
+        ]
+        if not window_subs:
+            return []
+        window_text = " ".join(sub.content for sub in window_subs)
+        print(f"\nPencere analiz ediliyor: {window_start:.0f}s - {window_end:.0f}s ({len(window_subs)} segment)")
+        new_parts = []
+        for part in analyze_content(window_text, duration, subs=window_subs):
+            if not final and part['end_time'] > window_end - overlap_seconds:
+                continue  # Pencere sınırına yakın: sonraki pencerede yeniden değerlendir
+            if any(parts_overlap(part, other) for other in confirmed):
+                continue
+            confirmed.append(part)
+            new_parts.append(part)
+        return new_parts
+
+    for segment in segment_iter:
+        subs.append(srt.Subtitle(
+            index=len(subs) + 1,
+            start=dt.timedelta(seconds=segment['start']),
+            end=dt.timedelta(seconds=segment['end']),
+            content=segment['text']
+        ))
+        if segment['end'] - window_start >= window_seconds:
+            for part in analyze_window(segment['end'], final=False):
+                yield part
+            window_start = max(0.0, segment['end'] - overlap_seconds)
+
+    for part in analyze_window(duration or (subs[-1].end.total_seconds() if subs else 0.0), final=True):
+        yield part
+
+def run_streaming_pipeline(video_path, duration, language=None, renderer="moviepy", workers=1,
+                           window_seconds=600, overlap_seconds=60, subtitle_mode=None):
+    """Transkript, analiz ve render aşamalarını üst üste bindirerek çalıştırır
+
+    Segmentler üretildikçe SRT'ye yazılır ve pencere analizine beslenir; kesinleşen
+    her kısım transkript bitmeden tek bir render oturumuna gönderilir. Transkript hatası,
+    gönderilmiş render'lar bittikten sonra yeniden fırlatılır.
+    """
+    # Render oturumu (arka plan, logo, işçiler) iş parçacıkları başlamadan bir kez açılır
+    session = open_render_session(video_path, renderer, workers, subtitle_mode)
+    segment_queue = queue.Queue(maxsize=1000)
+    done = object()
+    transcription_error = []
+    stop_transcription = threading.Event()
+    transcription_drained = threading.Event()
+
+    def transcribe_worker():
+        segments = iter_transcription_segments(video_path, language)
+        try:
+            for segment in segments:
+                segment_queue.put(segment)
+                if stop_transcription.is_set():
+                    break
+        except Exception as e:
+            transcription_error.append(e)
+        finally:
+            segments.close()
+            segment_queue.put(done)
+
+    def queued_segments():
+        while True:
+            segment = segment_queue.get()
+            if segment is done:
+                transcription_drained.set()
+                return
+            yield segment
+
+    def stop_transcriber():
+        # Analiz erken biterse (ör. hata) transkript iş parçacığı dolu kuyrukta takılı kalmasın
+        if not transcription_drained.is_set():
+            stop_transcription.set()
+            while segment_queue.get() is not done:
+                pass
+        transcriber.join()
+
+    transcriber = threading.Thread(target=transcribe_worker, name="transcription", daemon=True)
+    transcriber.start()
+
+    viral_parts = []
+    all_subs = []
+
+    def collect_subs(segment_iter):
+        for segment in segment_iter:
+            all_subs.append(srt.Subtitle(
+                index=len(all_subs) + 1,
+                start=dt.timedelta(seconds=segment['start']),
+                end=dt.timedelta(seconds=segment['end']),
+                content=segment['text']
+            ))
+            yield segment
+
+    # Sinyal zaman çizelgesi transkriptle paralel çıkarılır
+    signal_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    timeline_future = signal_executor.submit(compute_signal_timeline, video_path)
+
+    try:
+        for part in iter_streaming_analysis(collect_subs(queued_segments()), duration,
+                                            window_seconds, overlap_seconds):
+            print(f"\n✓ Kısım kesinleşti: {part['start_time']:.1f}s - {part['end_time']:.1f}s - {part['title']}")
+            try:
+                snap_part_boundaries([part], timeline_future.result())
+            except Exception as e:
+                print(f"Uyarı: Sinyal analizi başarısız, sınırlar olduğu gibi kullanılacak: {str(e)}")
+            viral_parts.append(part)
+            submit_render(session, part, load_part_subtitles(list(all_subs), part['start_time'], part['end_time']))
+    finally:
+        stop_transcriber()
+        results = close_render_session(session)
+        # Çalışan FFmpeg sinyal ölçümünü yarıda bırakma; başlamadıysa iptal et
+        timeline_future.cancel()
+        signal_executor.shutdown(wait=True)
+
+    if transcription_error:
+        print(f"Transkript hatası: {str(transcription_error[0])}")
+        raise transcription_error[0]
+    print(f"✓ Akış tamamlandı: {len(viral_parts)} kısım bulundu, {sum(1 for r in results if r['output_path'])} video oluşturuldu")
+    return viral_parts, results
+
 def create_subtitle_clip(text, start_time, end_time, video_size):
     """Altyazı klibi oluşturur"""
     try:
+        from moviepy.editor import ColorClip, TextClip
+        check_imagemagick()
+
         # Altyazı için arka plan
         bg_height = 80
         bg = ColorClip(size=(video_size[0], bg_height), color=(0, 0, 0, 128))
@@ -1610,58 +4024,542 @@ def create_subtitle_clip(text, start_time, end_time, video_size):
         print(f"Altyazı klibi oluşturma hatası: {str(e)}")
         return []
 
-def process_local_video(video_path):
-    """Yerel videoyu işler"""
+def is_url(source):
+    """Kaynağın indirilecek bir URL mi yoksa yerel dosya mı olduğunu belirler"""
+    return source.startswith(('http://', 'https://')) or 'youtube.com' in source or 'youtu.be' in source
+
+def load_manifest(manifest_path):
+    """Manifest dosyasından kaynak listesini okur (JSON listesi veya satır başına bir kaynak)"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if manifest_path.lower().endswith('.json'):
+        data = json.loads(content)
+        return [item['source'] if isinstance(item, dict) else str(item) for item in data]
+    return [line.strip() for line in content.splitlines() if line.strip() and not line.strip().startswith('#')]
+
+PIPELINE_STAGES = ('download', 'transcribe', 'analyze', 'render')
+
+def run_pipeline_stage(job, stage, subtitles=True, language=None, renderer=None, workers=None,
+                       subtitle_mode=None, streaming=False):
+    """Bir kaynak için tek bir aşamayı çalıştırır ve süresini job['timings']'e yazar
+
+    streaming=True ise transkript aşaması run_streaming_pipeline ile analiz ve render'ı da
+    üst üste bindirerek yapar; sonraki analiz ve render aşamaları atlanır.
+    """
+    if job.get('streamed') and stage in ('analyze', 'render'):
+        return
+    if workers is None:
+        # Verilmezse ortam varsayılanı; 0 (ve SHORTS_WORKERS=auto) otomatik işçi sayısıdır
+        workers = 0 if SHORTS_WORKERS == 'auto' else int(SHORTS_WORKERS)
+    started = time.perf_counter()
+    with span(stage, source=job['source']):
+        if stage == 'download':
+            if is_url(job['source']):
+                job['video_path'], info = download_video(job['source'])
+                job['duration'] = info.get('duration') or 0
+                job['title'] = info.get('title')
+            else:
+                if not os.path.exists(job['source']):
+                    raise FileNotFoundError(f"Video dosyası bulunamadı: {job['source']}")
+                job['video_path'] = job['source']
+                job['duration'] = probe_video(job['source']).get('duration', 0)
+        elif stage == 'transcribe' and streaming and subtitles:
+            job['viral_parts'], job['results'] = run_streaming_pipeline(
+                job['video_path'], job['duration'], language, renderer=renderer or SHORTS_RENDERER,
+                workers=workers, subtitle_mode=subtitle_mode
+            )
+            job['srt_path'] = os.path.splitext(job['video_path'])[0] + ".srt"
+            job['streamed'] = True
+        elif stage == 'transcribe':
+            if subtitles:
+                job['srt_path'] = transcribe_audio(job['video_path'], language)
+                # transcribe_audio hatayı yutup None döndürür; altyazısız devam etmek yerine
+                # aşamayı başarısız say ki özet ve iş kuyruğu bunu kaydetsin
+                if not job['srt_path'] or not os.path.exists(job['srt_path']):
+                    raise RuntimeError(f"Transkript oluşturulamadı: {job['video_path']}")
+        elif stage == 'analyze':
+            subtitles_text = read_srt_file(job['srt_path']) if job.get('srt_path') else ""
+            job['viral_parts'] = analyze_content(subtitles_text, job['duration'], job.get('srt_path'),
+                                                 video_path=job['video_path'])
+            try:
+                snap_part_boundaries(job['viral_parts'], compute_signal_timeline(job['video_path']))
+            except Exception as e:
+                print(f"Uyarı: Sinyal analizi başarısız, sınırlar olduğu gibi kullanılacak: {str(e)}")
+        elif stage == 'render':
+            job['results'] = create_shorts(
+                job['video_path'], job['viral_parts'], srt_path=job.get('srt_path'),
+                renderer=renderer or SHORTS_RENDERER,
+                workers=workers,
+                subtitle_mode=subtitle_mode
+            )
+    job['timings'][stage] = time.perf_counter() - started
+
+def summarize_job(job):
+    """İş durumunu JSON'a yazılabilir bir özet sözlüğüne çevirir"""
+    results = job.get('results') or []
+    return {
+        'source': job['source'],
+        'video_path': job.get('video_path'),
+        'title': job.get('title'),
+        'duration': job.get('duration'),
+        'srt_path': job.get('srt_path'),
+        'status': 'failed' if job.get('error') else 'completed',
+        'failed_stage': job.get('failed_stage'),
+        'error': job.get('error'),
+        'parts': len(job.get('viral_parts') or []),
+        'outputs': [result['output_path'] for result in results if result.get('output_path')],
+        'render_errors': [result['error'] for result in results if result.get('error')],
+        'timings': job['timings'],
+    }
+
+def process_sources(sources, language=None, subtitles=True, renderer=None, workers=None, subtitle_mode=None,
+                    summary_path=None, streaming=None):
+    """Birden çok URL/yerel videoyu indirme → transkript → analiz → render hattında işler
+
+    Her aşama kendi iş parçacığında çalışır ve işleri kuyrukla bir sonrakine aktarır; böylece
+    bir video render edilirken sonraki indirilip transkript edilebilir. Bir aşamada hata alan
+    kaynak sonraki aşamaları atlar. Aşama sürelerini içeren özet sözlüğü döndürür ve
+    summary_path verilirse JSON olarak yazar. streaming (varsayılan SHORTS_STREAMING) açıksa
+    her videonun analiz ve render'ı transkriptiyle üst üste bindirilir.
+    """
+    configure_environment()
+    started = time.perf_counter()
+    jobs = [{'source': source, 'timings': {}, 'error': None, 'failed_stage': None} for source in sources]
+    stage_queues = [queue.Queue(maxsize=1) for _ in PIPELINE_STAGES] + [queue.Queue()]
+    done = object()
+    stage_options = {
+        'subtitles': subtitles,
+        'language': language,
+        'renderer': renderer,
+        'workers': workers,
+        'subtitle_mode': subtitle_mode,
+        'streaming': SHORTS_STREAMING if streaming is None else streaming,
+    }
+
+    warmup_thread = start_whisper_warmup() if subtitles and jobs else None
+
+    def stage_worker(stage_index, stage):
+        inbox, outbox = stage_queues[stage_index], stage_queues[stage_index + 1]
+        while True:
+            job = inbox.get()
+            if job is done:
+                outbox.put(done)
+                return
+            if not job['error']:
+                print(f"\n[{stage}] {job['source']}")
+                try:
+                    run_pipeline_stage(job, stage, **stage_options)
+                except Exception as e:
+                    print(f"\n❌ {job['source']} - {stage} aşamasında hata: {str(e)}")
+                    import traceback
+                    traceback.print_exc()
+                    job['error'] = str(e)
+                    job['failed_stage'] = stage
+            outbox.put(job)
+
+    threads = [
+        threading.Thread(target=stage_worker, args=(k, stage), name=f"pipeline-{stage}", daemon=True)
+        for k, stage in enumerate(PIPELINE_STAGES)
+    ]
+    for thread in threads:
+        thread.start()
+    for job in jobs:
+        stage_queues[0].put(job)
+    stage_queues[0].put(done)
+    for thread in threads:
+        thread.join()
+    if warmup_thread is not None:
+        warmup_thread.join()
+
+    summary = {
+        'whisper': whisper_pool_stats(),
+        'sources': [summarize_job(job) for job in jobs],
+        'completed': sum(1 for job in jobs if not job['error']),
+        'failed': sum(1 for job in jobs if job['error']),
+        'stage_seconds': {stage: sum(job['timings'].get(stage, 0) for job in jobs) for stage in PIPELINE_STAGES},
+        'total_seconds': time.perf_counter() - started,
+    }
+    # Toplu işlem bitti: modellerin belleğini serbest bırak
+    release_whisper_models()
+    if summary_path:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"\nÖzet kaydedildi: {summary_path}")
+    print(f"\n✓ Toplu işlem tamamlandı: {summary['completed']} başarılı, {summary['failed']} başarısız, "
+          f"{summary['total_seconds']:.1f} saniye")
+    return summary
+
+def process_local_video(video_path, subtitle_choice="1", language=None, renderer=None, workers=None,
+                        subtitle_mode=None):
+    """Yerel videoyu işler: transkript, analiz ve Shorts oluşturma"""
+    summary = process_sources([video_path], language=language, subtitles=subtitle_choice == "1",
+                              renderer=renderer, workers=workers, subtitle_mode=subtitle_mode)
+    return summary['sources'][0]
+
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL UNIQUE,
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    stage TEXT,
+    worker TEXT,
+    video_path TEXT,
+    title TEXT,
+    duration REAL,
+    srt_path TEXT,
+    analysis TEXT,
+    timings TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    failed_stage TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parts (
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    part_index INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    output_path TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, part_index)
+);
+"""
+
+def open_job_store(db_path=None):
+    """İş kuyruğu veritabanını açar, tabloları yoksa oluşturur"""
+    db_path = db_path or JOB_DB_PATH
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # Her iş parçacığı kendi bağlantısını açar; işlemler elle yönetilir
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(JOB_SCHEMA)
+    return conn
+
+def update_job(conn, job_id, **fields):
+    """İş satırındaki alanları günceller"""
+    fields['updated_at'] = time.time()
+    columns = ', '.join(f"{name} = ?" for name in fields)
+    conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", list(fields.values()) + [job_id])
+
+def enqueue_jobs(sources, db_path=None, language=None, subtitles=True, renderer=None, workers=None,
+                 subtitle_mode=None):
+    """Kaynakları iş kuyruğuna ekler; başarısız veya yarım kalan işleri yeniden sıraya alır
+
+    Aynı kaynak zaten kuyruktaysa kaydedilmiş aşama çıktıları korunur, böylece iş ilk
+    tamamlanmamış aşamadan devam eder. Kaynakların iş kimliklerini döndürür.
+    """
+    options = json.dumps({
+        'language': language,
+        'subtitles': subtitles,
+        'renderer': renderer,
+        'workers': workers,
+        'subtitle_mode': subtitle_mode,
+    })
+    conn = open_job_store(db_path)
     try:
-        # Video bilgilerini al
-        video = VideoFileClip(video_path)
-        duration = video.duration
-        video.close()
-        
-        # Altyazı seçeneği zaten main fonksiyonunda sorulduğu için burada tekrar sormaya gerek yok.
-        # Eğer ana fonksiyondan buraya altyazı_seçimi ve dil_seçimi bilgisi geliyorsa kullanılabilir.
+        job_ids = []
+        now = time.time()
+        for source in sources:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (source, options, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (source, options, now, now)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', options = ?, updated_at = ? WHERE source = ? AND status = 'failed'",
+                (options, now, source)
+            )
+            job_ids.append(conn.execute("SELECT id FROM jobs WHERE source = ?", (source,)).fetchone()['id'])
+        return job_ids
+    finally:
+        conn.close()
+
+def is_worker_alive(worker):
+    """'pid@host/n' biçimindeki işçinin sürecinin hâlâ çalışıp çalışmadığını kontrol eder
+
+    Başka makinedeki işçiler kontrol edilemediği için canlı kabul edilir.
+    """
+    pid, _, host = (worker or '').split('/', 1)[0].partition('@')
+    if not pid.isdigit():
+        return False
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+def claim_job(conn, worker):
+    """Sıradaki bekleyen işi (veya ölmüş bir işçiden kalan işi) bu işçiye atar"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Süreci sonlanmış işçilerin yarım bıraktığı işleri kuyruğa geri al
+        for row in conn.execute("SELECT id, worker FROM jobs WHERE status = 'running'").fetchall():
+            if not is_worker_alive(row['worker']):
+                update_job(conn, row['id'], status='pending', worker=None)
+        row = conn.execute("SELECT id FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+        if row:
+            update_job(conn, row['id'], status='running', worker=worker, error=None, failed_stage=None)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return row['id'] if row else None
+
+def is_stage_complete(job, stage):
+    """Kaydedilmiş aşama çıktısının hâlâ kullanılabilir olup olmadığını kontrol eder"""
+    if stage == 'download':
+        return bool(job.get('video_path')) and os.path.exists(job['video_path'])
+    if stage == 'transcribe':
+        if not job['options'].get('subtitles', True):
+            return True
+        return bool(job.get('srt_path')) and os.path.exists(job['srt_path'])
+    if stage == 'analyze':
+        return job.get('viral_parts') is not None
+    return False
+
+def run_job(conn, job_id):
+    """İşi ilk tamamlanmamış aşamadan sürdürür, render'da sadece bitmemiş kısımları işler
+
+    Her aşamanın çıktısı biter bitmez veritabanına yazılır; süreç ölürse sonraki
+    çalıştırma kaydedilmiş indirme, SRT ve analiz çıktılarını yeniden kullanır.
+    """
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    job = {
+        'source': row['source'],
+        'options': json.loads(row['options']),
+        'video_path': row['video_path'],
+        'title': row['title'],
+        'duration': row['duration'],
+        'srt_path': row['srt_path'],
+        'viral_parts': json.loads(row['analysis']) if row['analysis'] else None,
+        'timings': json.loads(row['timings']),
+        'error': None,
+        'failed_stage': None,
+    }
+    options = dict(job['options'])
+
+    stage = None
+    try:
+        for k, stage in enumerate(PIPELINE_STAGES[:-1]):
+            if is_stage_complete(job, stage):
+                continue
+            # Önceki bir aşamanın çıktısı kaybolduysa sonraki aşamalar da yeniden çalışır
+            for later in PIPELINE_STAGES[k + 1:-1]:
+                if later == 'transcribe':
+                    job['srt_path'] = None
+                elif later == 'analyze':
+                    job['viral_parts'] = None
+            print(f"\n[{stage}] {job['source']}")
+            update_job(conn, job_id, stage=stage)
+            run_pipeline_stage(job, stage, **options)
+            if stage == 'download':
+                update_job(conn, job_id, video_path=job['video_path'], title=job['title'],
+                           duration=job['duration'], srt_path=None, analysis=None,
+                           timings=json.dumps(job['timings']))
+            elif stage == 'transcribe':
+                update_job(conn, job_id, srt_path=job['srt_path'], analysis=None,
+                           timings=json.dumps(job['timings']))
+            else:
+                conn.execute('BEGIN IMMEDIATE')
+                update_job(conn, job_id, analysis=json.dumps(job['viral_parts'], ensure_ascii=False),
+                           timings=json.dumps(job['timings']))
+                conn.execute("DELETE FROM parts WHERE job_id = ?", (job_id,))
+                conn.executemany(
+                    "INSERT INTO parts (job_id, part_index, start_time, end_time) VALUES (?, ?, ?, ?)",
+                    [(job_id, i, part['start_time'], part['end_time']) for i, part in enumerate(job['viral_parts'])]
+                )
+                conn.execute('COMMIT')
+
+        # Sadece henüz başarıyla render edilmemiş kısımları işle
+        stage = 'render'
+        pending = [
+            part_row['part_index'] for part_row in conn.execute(
+                "SELECT part_index, output_path FROM parts WHERE job_id = ? ORDER BY part_index", (job_id,)
+            ).fetchall()
+            if not (part_row['output_path'] and os.path.exists(part_row['output_path']))
+        ]
+        all_parts = job['viral_parts']
+        if pending:
+            print(f"\n[render] {job['source']} ({len(pending)}/{len(all_parts)} kısım)")
+            update_job(conn, job_id, stage=stage)
+            job['viral_parts'] = [all_parts[i] for i in pending]
+            previous = job['timings'].get('render', 0)
+            run_pipeline_stage(job, stage, **options)
+            job['timings']['render'] += previous
+            job['viral_parts'] = all_parts
+            # create_shorts kısımları zamana göre sıraladığından sonuçlar zaman aralığıyla eşleştirilir
+            pending_by_range = {}
+            for part_index in pending:
+                part = all_parts[part_index]
+                pending_by_range.setdefault((part['start_time'], part['end_time']), []).append(part_index)
+            for result in job['results']:
+                part_index = pending_by_range[(result['start_time'], result['end_time'])].pop(0)
+                conn.execute(
+                    "UPDATE parts SET status = ?, output_path = ?, error = ? WHERE job_id = ? AND part_index = ?",
+                    ('failed' if result.get('error') else 'done', result.get('output_path'),
+                     result.get('error'), job_id, part_index)
+                )
+        failed = conn.execute(
+            "SELECT COUNT(*) AS n FROM parts WHERE job_id = ? AND status != 'done'", (job_id,)
+        ).fetchone()['n']
+        if failed:
+            raise RuntimeError(f"{failed} kısım render edilemedi")
+        update_job(conn, job_id, status='done', stage=None, worker=None, timings=json.dumps(job['timings']))
+    except Exception as e:
+        print(f"\n❌ {job['source']} - {stage} aşamasında hata: {str(e)}")
+        job['error'] = str(e)
+        job['failed_stage'] = stage
+        update_job(conn, job_id, status='failed', worker=None, error=str(e), failed_stage=stage,
+                   timings=json.dumps(job['timings']))
+    return job
+
+def run_job_workers(db_path=None, workers=1):
+    """İş kuyruğundaki bekleyen işleri birden çok işçi iş parçacığıyla eşzamanlı olarak işler
+
+    Her işçi kendi veritabanı bağlantısıyla sıradaki işi alır ve kuyruk boşalana kadar
+    devam eder. Aynı veritabanına başka süreçlerden de işçi bağlanabilir.
+    """
+    started = time.perf_counter()
+
+    def worker_loop(worker_index):
+        conn = open_job_store(db_path)
+        worker = f"{os.getpid()}@{socket.gethostname()}/{worker_index}"
+        try:
+            while True:
+                job_id = claim_job(conn, worker)
+                if job_id is None:
+                    return
+                run_job(conn, job_id)
+        finally:
+            conn.close()
+
+    conn = open_job_store(db_path)
+    try:
+        waiting = conn.execute(
+            "SELECT options FROM jobs WHERE status != 'done' AND srt_path IS NULL"
+        ).fetchall()
+    finally:
+        conn.close()
+    needs_whisper = any(json.loads(row['options']).get('subtitles', True) for row in waiting)
+    warmup_thread = start_whisper_warmup() if needs_whisper else None
+    threads = [
+        threading.Thread(target=worker_loop, args=(k,), name=f"job-worker-{k}", daemon=True)
+        for k in range(max(1, workers))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if warmup_thread is not None:
+        warmup_thread.join()
+
+    summary = job_store_summary(db_path)
+    summary['whisper'] = whisper_pool_stats()
+    release_whisper_models()
+    summary['total_seconds'] = time.perf_counter() - started
+    print(f"\n✓ İş kuyruğu işlendi: {summary['completed']} başarılı, {summary['failed']} başarısız, "
+          f"{summary['pending']} bekliyor")
+    return summary
+
+def job_store_summary(db_path=None):
+    """İş kuyruğundaki tüm işlerin durumunu process_sources özetiyle aynı biçimde döndürür"""
+    conn = open_job_store(db_path)
+    try:
+        sources = []
+        for row in conn.execute("SELECT * FROM jobs ORDER BY id").fetchall():
+            parts = conn.execute(
+                "SELECT * FROM parts WHERE job_id = ? ORDER BY part_index", (row['id'],)
+            ).fetchall()
+            sources.append({
+                'source': row['source'],
+                'video_path': row['video_path'],
+                'title': row['title'],
+                'duration': row['duration'],
+                'srt_path': row['srt_path'],
+                'status': row['status'],
+                'failed_stage': row['failed_stage'],
+                'error': row['error'],
+                'parts': len(parts),
+                'outputs': [part['output_path'] for part in parts if part['status'] == 'done'],
+                'render_errors': [part['error'] for part in parts if part['error']],
+                'timings': json.loads(row['timings']),
+            })
+    finally:
+        conn.close()
+    return {
+        'sources': sources,
+        'completed': sum(1 for source in sources if source['status'] == 'done'),
+        'failed': sum(1 for source in sources if source['status'] == 'failed'),
+        'pending': sum(1 for source in sources if source['status'] in ('pending', 'running')),
+        'stage_seconds': {stage: sum(source['timings'].get(stage, 0) for source in sources)
+                          for stage in PIPELINE_STAGES},
+    }
+
+def ask_subtitle_options():
+    """Altyazı ve dil seçeneklerini kullanıcıya sorar, (altyazı seçimi, dil) döndürür"""
+    # Subtitle options
+    print("\nSubtitle options:")
+    print("1. Generate automatic subtitles with Whisper")
+    print("2. Continue without subtitles")
+    
+    subtitle_choice = input("\nYour subtitle choice (1/2): ").strip()
+    
+    # Language selection
+    selected_language = None
+    if subtitle_choice == "1":
+        print("\nLanguage options:")
+        print("1. Auto-detect")
+        print("2. Turkish")
+        print("3. English")
+        print("4. German")
+        print("5. French")
+        print("6. Spanish")
+        print("7. Italian")
+        print("8. Russian")
+        print("9. Arabic")
+        print("10. Japanese")
+        print("11. Korean")
+        print("12. Chinese")
         
-        srt_path = None
-        subtitles_text = ""
-
-        # Eğer daha önce altyazı oluşturma seçeneği seçildiyse
-        # Bu kısım main fonksiyonundan çağrıldığı için burada global bir değişkene veya fonksiyona parametreye ihtiyacımız var.
-        # Basitlik için, bu fonksiyonu ana fonksiyondan çağırırken altyazı ve dil seçeneklerini doğrudan alacağız.
-
-        # İçeriği analiz et
-        print("\nİçerik analiz ediliyor...")
-        print("OpenAI API'ye istek gönderiliyor...")
-
-        # process_local_video fonksiyonu main fonksiyonundaki logic'e göre revize edildi.
-        # Artık bu fonksiyon, altyazı oluşturma ve analiz etme adımlarını kendisi yapmayacak.
-        # Bunun yerine, main fonksiyonu tarafından çağrıldığında altyazı metni zaten belirlenmiş olacak.
-        # Bu nedenle, bu fonksiyonun parametrelerini ve çağrılma şeklini değiştirmemiz gerekecek.
-        # Şimdilik bu fonksiyonu altyazı logic'inden ayırıyorum.
-
-        # Sadece altyazısız veya var olan altyazıyla shorts oluşturma logic'i kalacak.
-        # Bu kısım ana fonksiyonda tekrar düzenlenecek.
-        print("\n3. İçerik analiz ediliyor...")
-        print("OpenAI API'ye istek gönderiliyor...")
-        viral_parts = analyze_content(subtitles_text, duration, srt_path) # subtitles_text parametre olarak gelmeli
-        print(f"✓ İçerik analiz edildi! {len(viral_parts)} viral kısım bulundu.")
+        lang_choice = input("\nYour language choice (1-12): ").strip()
         
-        # Shorts videoları oluştur
-        print("\n4. Shorts videoları oluşturuluyor...")
-        create_shorts(video_path, viral_parts, srt_path=srt_path) # srt_path de buraya parametre olarak gelmeli
-        print("✓ Shorts videoları oluşturuldu!")
+        language_map = {
+            "2": "tr",
+            "3": "en",
+            "4": "de",
+            "5": "fr",
+            "6": "es",
+            "7": "it",
+            "8": "ru",
+            "9": "ar",
+            "10": "ja",
+            "11": "ko",
+            "12": "zh"
+        }
         
-    except Exception as e:
-        print(f"Video işlenirken hata oluştu: {str(e)}")
-        raise
+        if lang_choice != "1":
+            selected_language = language_map.get(lang_choice)
+            if not selected_language:
+                print("Invalid language choice! Using auto-detection.")
+    return subtitle_choice, selected_language
 
-def main():
+def interactive_main():
+    """Kullanıcıya sorarak tek bir video işleyen etkileşimli menü"""
     print("\n=== Video Processing Program ===")
     print("YouTube'dan video indirme ve Shorts oluşturma programı")
     print("Not: Rate limiting sorunları için program otomatik olarak farklı stratejiler deneyecektir.")
     print("1. Download from YouTube")
-    print("2. Exit")
+    print("2. Process local video")
+    print("3. Exit")
     
-    choice = input("\nYour choice (1/2): ").strip()
+    choice = input("\nYour choice (1/2/3): ").strip()
     
     if choice == "1":
         # Get YouTube URL
@@ -1676,50 +4574,7 @@ def main():
         print("Video indirme başlatılıyor...")
         print("Not: Rate limiting durumunda program otomatik olarak farklı stratejiler deneyecektir.")
         
-        # Subtitle options
-        print("\nSubtitle options:")
-        print("1. Generate automatic subtitles with Whisper")
-        print("2. Continue without subtitles")
-        
-        subtitle_choice = input("\nYour subtitle choice (1/2): ").strip()
-        
-        # Language selection
-        selected_language = None
-        if subtitle_choice == "1":
-            print("\nLanguage options:")
-            print("1. Auto-detect")
-            print("2. Turkish")
-            print("3. English")
-            print("4. German")
-            print("5. French")
-            print("6. Spanish")
-            print("7. Italian")
-            print("8. Russian")
-            print("9. Arabic")
-            print("10. Japanese")
-            print("11. Korean")
-            print("12. Chinese")
-            
-            lang_choice = input("\nYour language choice (1-12): ").strip()
-            
-            language_map = {
-                "2": "tr",
-                "3": "en",
-                "4": "de",
-                "5": "fr",
-                "6": "es",
-                "7": "it",
-                "8": "ru",
-                "9": "ar",
-                "10": "ja",
-                "11": "ko",
-                "12": "zh"
-            }
-            
-            if lang_choice != "1":
-                selected_language = language_map.get(lang_choice)
-                if not selected_language:
-                    print("Invalid language choice! Using auto-detection.")
+        subtitle_choice, selected_language = ask_subtitle_options()
         
         try:
             # Download video
@@ -1731,6 +4586,16 @@ def main():
             srt_path = None
             subtitles_text = ""
 
+            if subtitle_choice == "1" and SHORTS_STREAMING:
+                # Transkript, analiz ve render aşamalarını üst üste bindir
+                print("\n2-4. Streaming transcript, analysis and rendering...")
+                run_streaming_pipeline(
+                    video_path, info.get('duration', 0), selected_language, renderer=SHORTS_RENDERER,
+                    workers=None if SHORTS_WORKERS == 'auto' else int(SHORTS_WORKERS)
+                )
+                print("\nProcess completed!")
+                return
+
             if subtitle_choice == "1":
                 # Generate transcript with Whisper
                 print("\n2. Generating transcript...")
@@ -1743,12 +4608,22 @@ def main():
             # Analyze content
             print("\n3. Analyzing content...")
             print("Sending request to OpenAI API...")
-            viral_parts = analyze_content(subtitles_text, info.get('duration', 0), srt_path)
+            viral_parts = analyze_content(subtitles_text, info.get('duration', 0), srt_path, video_path=video_path)
             print(f"✓ Content analyzed! Found {len(viral_parts)} viral segments.")
+            print(f"LLM cache: {llm_cache_stats['hits']} hit, {llm_cache_stats['misses']} miss")
+            
+            # Kısım sınırlarını sessizlik ve sahne kesmelerine oturt
+            try:
+                snap_part_boundaries(viral_parts, compute_signal_timeline(video_path))
+            except Exception as e:
+                print(f"Uyarı: Sinyal analizi başarısız, sınırlar olduğu gibi kullanılacak: {str(e)}")
             
             # Create short videos
             print("\n4. Creating short videos...")
-            create_shorts(video_path, viral_parts, srt_path=srt_path)
+            create_shorts(
+                video_path, viral_parts, srt_path=srt_path, renderer=SHORTS_RENDERER,
+                workers=None if SHORTS_WORKERS == 'auto' else int(SHORTS_WORKERS)
+            )
             print("✓ Short videos created!")
             
         except Exception as e:
@@ -1765,15 +4640,93 @@ def main():
             return
         
     elif choice == "2":
+        video_path = input("\nEnter local video path: ").strip().strip('"')
+        if not os.path.exists(video_path):
+            print("Video dosyası bulunamadı! Program sonlandırılıyor.")
+            return
+        subtitle_choice, selected_language = ask_subtitle_options()
+        result = process_local_video(video_path, subtitle_choice, selected_language)
+        if result['error']:
+            print(f"\n❌ Hata oluştu ({result['failed_stage']}): {result['error']}")
+            return
+    elif choice == "3":
         print("Exiting program...")
         return
     else:
-        print("Invalid choice! Please enter 1 or 2.")
+        print("Invalid choice! Please enter 1, 2 or 3.")
         return
     
     print("\nProcess completed!")
     print("Shorts videoları başarıyla oluşturuldu!")
 
+def build_arg_parser():
+    """Etkileşimsiz toplu işlem için komut satırı ayrıştırıcısını oluşturur"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Uzun videolardan (YouTube URL'leri veya yerel dosyalar) Shorts videoları oluşturur. "
+                    "Kaynak verilmezse etkileşimli menü açılır."
+    )
+    parser.add_argument('sources', nargs='*', help="YouTube URL'leri veya yerel video yolları")
+    parser.add_argument('-m', '--manifest', help="Kaynak listesi dosyası (JSON listesi veya satır başına bir kaynak)")
+    parser.add_argument('-l', '--language', help="Altyazı dili (ör. tr, en); verilmezse otomatik algılanır")
+    parser.add_argument('--no-subtitles', action='store_true', help="Whisper ile altyazı oluşturma")
+    parser.add_argument('--renderer', choices=('moviepy', 'ffmpeg', 'ffmpeg_batch'),
+                        help="Render yöntemi (varsayılan SHORTS_RENDERER)")
+    parser.add_argument('--workers', type=int, help="Paralel render işçi sayısı (0 = otomatik)")
+    parser.add_argument('--subtitle-mode', choices=('atlas', 'ass'), help="Altyazı gömme yöntemi")
+    parser.add_argument('--summary', help="Aşama sürelerini içeren JSON özetinin yazılacağı dosya")
+    parser.add_argument('--streaming', action='store_true', default=None,
+                        help="Analiz ve render'ı transkript sürerken başlat (varsayılan SHORTS_STREAMING, --resume ile kullanılmaz)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Kaynakları kalıcı iş kuyruğuna ekle ve kaldığı yerden devam ederek işle; "
+                             "kaynak verilmezse kuyrukta bekleyen işleri işler")
+    parser.add_argument('--job-db', help="İş kuyruğu veritabanı (varsayılan JOB_DB_PATH)")
+    parser.add_argument('--job-workers', type=int, default=1, help="Kuyruktan eşzamanlı iş alan işçi sayısı")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Aşama profilini (süre, CPU, bellek, IO) JSON ve Chrome trace olarak kaydet")
+    return parser
+
+def main(argv=None):
+    configure_environment()
+    args = build_arg_parser().parse_args(argv)
+    if args.profile:
+        enable_profiling()
+    try:
+        run_cli(args)
+    finally:
+        if _profile_enabled:
+            write_profile_report(args.profile)
+
+def run_cli(args):
+    """Ayrıştırılmış komut satırı argümanlarına göre kaynakları işler veya etkileşimli menüyü açar"""
+    sources = list(args.sources)
+    if args.manifest:
+        sources += load_manifest(args.manifest)
+    if not sources and not args.resume:
+        interactive_main()
+        return
+    
+    options = {
+        'language': args.language,
+        'subtitles': not args.no_subtitles,
+        'renderer': args.renderer,
+        'workers': args.workers,
+        'subtitle_mode': args.subtitle_mode,
+    }
+    if args.resume:
+        enqueue_jobs(sources, db_path=args.job_db, **options)
+        summary = run_job_workers(db_path=args.job_db, workers=args.job_workers)
+        if args.summary:
+            with open(args.summary, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+    else:
+        summary = process_sources(sources, summary_path=args.summary, streaming=args.streaming, **options)
+    if not args.summary:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if summary['failed']:
+        raise SystemExit(1)
+
 if __name__ == "__main__":
     print(os.path.exists('DynaPuff/static/DynaPuff-Regular.ttf'))
     main() 
\ No newline at end of file
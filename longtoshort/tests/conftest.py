@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Testler main.py'yi doğrudan içe aktarır (benchmark.py gibi)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,140 @@
+import datetime as dt
+import types
+
+import pytest
+import srt
+
+import main
+from main import (analyze_content, extract_json_array, normalize_analysis_part, parse_analysis_response,
+                  parse_time_value, uncovered_subs)
+
+
+def test_extract_json_array_complete_code_block():
+    content = '```json\n[{"start": 0, "end": 30, "title": "A"}]\n```'
+    items, complete = extract_json_array(content)
+    assert complete
+    assert items == [{"start": 0, "end": 30, "title": "A"}]
+
+
+def test_extract_json_array_single_object():
+    items, complete = extract_json_array('{"start": 0, "end": 30, "title": "A"}')
+    assert complete
+    assert items == [{"start": 0, "end": 30, "title": "A"}]
+
+
+def test_extract_json_array_salvages_truncated_response():
+    content = ('[{"start": 0, "end": 30, "title": "A"}, '
+               '{"start": 40, "end": 80, "title": "B"}, '
+               '{"start": 90, "end": 1')
+    items, complete = extract_json_array(content)
+    assert not complete
+    assert [item["title"] for item in items] == ["A", "B"]
+
+
+def test_extract_json_array_skips_broken_object():
+    content = '[{"start": 0, "end": 30, "title": "A"}, {"start": oops}, {"start": 40, "end": 80, "title": "B"}]'
+    items, complete = extract_json_array(content)
+    assert not complete
+    assert [item["title"] for item in items] == ["A", "B"]
+
+
+def test_extract_json_array_nothing_to_salvage():
+    assert extract_json_array("Üzgünüm, yardımcı olamam.") == ([], False)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (12, 12.0),
+    ("12.5", 12.5),
+    ("12.5s", 12.5),
+    ("01:02.5", 62.5),
+    (True, None),
+    ("abc", None),
+    (None, None),
+])
+def test_parse_time_value(value, expected):
+    assert parse_time_value(value) == expected
+
+
+def test_normalize_analysis_part_accepts_alternate_keys():
+    part = normalize_analysis_part({"start_time": "10", "end_time": "40s", "title": " Başlık ",
+                                    "reason": "neden"}, duration=100)
+    assert part["start_time"] == 10.0
+    assert part["end_time"] == 40.0
+    assert part["title"] == "Başlık"
+    assert part["reason"] == "neden"
+
+
+def test_normalize_analysis_part_extends_short_part_inside_video():
+    part = normalize_analysis_part({"start": 95, "end": 100, "title": "Son"}, duration=100)
+    assert (part["start_time"], part["end_time"]) == (85.0, 100.0)
+
+
+def test_normalize_analysis_part_trims_long_part_and_title():
+    part = normalize_analysis_part({"start": 0, "end": 300, "title": "x" * 60}, duration=None)
+    assert part["end_time"] == 120.0
+    assert len(part["title"]) == 50 and part["title"].endswith("...")
+
+
+@pytest.mark.parametrize("item", [
+    "metin",
+    {"start": 0, "end": 30},
+    {"start": 0, "end": 30, "title": "  "},
+    {"start": 50, "end": 40, "title": "A"},
+    {"start": 120, "end": 150, "title": "A"},
+])
+def test_normalize_analysis_part_rejects_invalid(item):
+    assert normalize_analysis_part(item, duration=100) is None
+
+
+def test_parse_analysis_response_drops_invalid_parts():
+    content = '[{"start": 0, "end": 30, "title": "A"}, {"start": 10, "title": "B"}]'
+    parts, complete = parse_analysis_response(content, duration=100)
+    assert complete
+    assert [part["title"] for part in parts] == ["A"]
+
+
+def test_parse_analysis_response_raises_without_valid_parts():
+    with pytest.raises(ValueError):
+        parse_analysis_response('[{"title": "A"}]', duration=100)
+
+
+def make_subs(count, length=10):
+    return [srt.Subtitle(index=k + 1, start=dt.timedelta(seconds=k * length),
+                         end=dt.timedelta(seconds=(k + 1) * length), content=f"segment {k} metni burada")
+            for k in range(count)]
+
+
+def test_uncovered_subs_keeps_gaps_before_later_parts():
+    subs = make_subs(10)
+    parts = [{'start_time': 60, 'end_time': 90}, {'start_time': 0, 'end_time': 20}]
+    assert [sub.index for sub in uncovered_subs(subs, parts)] == [3, 4, 5, 6, 10]
+
+
+class FakeCompletions:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def create(self, messages, **options):
+        self.prompts.append(messages[-1]['content'])
+        content, finish_reason = self.responses.pop(0)
+        choice = types.SimpleNamespace(message=types.SimpleNamespace(content=content), finish_reason=finish_reason)
+        return types.SimpleNamespace(choices=[choice])
+
+
+def test_truncated_response_requeries_gaps_before_the_last_pick(monkeypatch):
+    completions = FakeCompletions([
+        # Sırasız seçim, sonra kesilmiş yanıt: 0-60 ve 100-200 arası hiç kapsanmadı
+        ('[{"start": 60, "end": 100, "title": "Orta"}, {"start": 20', 'length'),
+        ('[{"start": 0, "end": 40, "title": "Baş"}]', 'stop'),
+    ])
+    monkeypatch.setattr(main, 'get_openai_client',
+                        lambda: types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(main, 'LLM_CACHE_MODE', 'off')
+    monkeypatch.setattr(main, 'ANALYSIS_PROMPT_ENCODING', 'timed')
+    subs = make_subs(20)
+    parts = analyze_content("x" * 100, 200, subs=subs)
+    assert [part['title'] for part in parts] == ['Baş', 'Orta']
+    second_prompt = completions.prompts[1]
+    assert "segment 0 metni" in second_prompt and "segment 10 metni" in second_prompt
+    assert "segment 7 metni" not in second_prompt
@@ -0,0 +1,52 @@
+import pytest
+
+from main import build_ass_filter, format_ass_time, layout_subtitle_lines, write_ass_subtitles
+
+LONG_TEXT = "çok uzun bir altyazı satırı ki kesinlikle iki satıra sarılacak ve şeride sığmayacak kadar uzun olsun"
+
+
+def dialogue_lines(tmp_path, subtitles):
+    ass_path = write_ass_subtitles(subtitles, str(tmp_path / "subtitles.ass"))
+    with open(ass_path, encoding='utf-8') as f:
+        content = f.read()
+    assert "WrapStyle: 2" in content
+    return [line for line in content.splitlines() if line.startswith("Dialogue: 1,")]
+
+
+@pytest.mark.parametrize("seconds, expected", [
+    (0, "0:00:00.00"),
+    (61.234, "0:01:01.23"),
+    (3723.5, "1:02:03.50"),
+    (-1, "0:00:00.00"),
+])
+def test_format_ass_time(seconds, expected):
+    assert format_ass_time(seconds) == expected
+
+
+def test_text_escapes_braces_and_backslashes(tmp_path):
+    text, = dialogue_lines(tmp_path, [{'start': 0.0, 'end': 1.0, 'text': r'a\Nb {x}'}])
+    body = text.split('}', 1)[1]
+    assert body == 'a\\\u200bNb (x)'
+
+
+def test_text_is_clipped_to_band(tmp_path):
+    text, = dialogue_lines(tmp_path, [{'start': 0.0, 'end': 1.0, 'text': 'Merhaba'}])
+    assert "\\clip(0,1500,1080,1570)" in text
+    assert text.startswith("Dialogue: 1,0:00:00.00,0:00:01.00,Text,")
+
+
+def test_long_text_is_wrapped_and_scaled_like_the_atlas(tmp_path):
+    text, = dialogue_lines(tmp_path, [{'start': 0.0, 'end': 2.0, 'text': LONG_TEXT}])
+    lines, _, _, scale = layout_subtitle_lines(LONG_TEXT)
+    assert len(lines) > 1 and scale < 1.0
+    assert text.split('}', 1)[1] == '\\N'.join(lines)
+    assert f"\\fscx{scale * 100:.1f}\\fscy{scale * 100:.1f}" in text
+
+
+def test_zero_length_subtitles_are_skipped(tmp_path):
+    assert dialogue_lines(tmp_path, [{'start': 1.0, 'end': 1.0, 'text': 'boş'}]) == []
+
+
+def test_build_ass_filter_escapes_path():
+    ass_filter = build_ass_filter("/tmp/part's.ass")
+    assert ass_filter.startswith("subtitles=filename='/tmp/part\\'s.ass':fontsdir='")
@@ -0,0 +1,84 @@
+import os
+import subprocess
+
+import pytest
+
+import main
+from main import background_offset, prepare_background
+
+
+@pytest.mark.parametrize("start_time, bg_info, expected", [
+    (5.0, {'duration': 20.0}, 5.0),
+    (45.0, {'duration': 20.0}, 5.0),
+    (45.0, {'duration': 0}, 0.0),
+    (45.0, None, 0.0),
+])
+def test_background_offset_wraps_around_loop(start_time, bg_info, expected):
+    assert background_offset(start_time, bg_info) == pytest.approx(expected)
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """FFmpeg yerine son argümandaki çıktı dosyasını yazan sahte çalıştırıcı"""
+    runs = []
+
+    def run(cmd, **kwargs):
+        runs.append(cmd)
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'hazir')
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(main.subprocess, 'run', run)
+    return runs
+
+
+@pytest.fixture
+def bg_video(tmp_path):
+    path = tmp_path / "bg.mp4"
+    path.write_bytes(b'arka plan')
+    return str(path)
+
+
+def test_prepare_background_renders_once_then_uses_cache(tmp_path, bg_video, fake_ffmpeg):
+    first = prepare_background(bg_video, cache_dir=str(tmp_path / "cache"))
+    second = prepare_background(bg_video, cache_dir=str(tmp_path / "cache"))
+    assert first == second
+    assert len(fake_ffmpeg) == 1
+    assert "scale=-2:1920,crop=w=min(iw\\,1080):h=1920" in fake_ffmpeg[0][fake_ffmpeg[0].index('-vf') + 1]
+    # Geçici dosya kalmaz
+    assert os.listdir(os.path.dirname(first)) == [os.path.basename(first)]
+
+
+def test_prepare_background_key_changes_with_content_and_size(tmp_path, bg_video, fake_ffmpeg):
+    cache_dir = str(tmp_path / "cache")
+    original = prepare_background(bg_video, cache_dir=cache_dir)
+    assert prepare_background(bg_video, target_w=720, target_h=1280, cache_dir=cache_dir) != original
+    with open(bg_video, 'wb') as f:
+        f.write(b'yeni arka plan')
+    os.utime(bg_video, ns=(1, 1))
+    assert prepare_background(bg_video, cache_dir=cache_dir) != original
+    assert len(fake_ffmpeg) == 3
+
+
+def test_prepare_background_failure_leaves_no_temp_file(tmp_path, bg_video, monkeypatch):
+    monkeypatch.setattr(main.subprocess, 'run',
+                        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 1, '', 'bozuk video'))
+    with pytest.raises(RuntimeError, match="bozuk video"):
+        prepare_background(bg_video, cache_dir=str(tmp_path / "cache"))
+    assert os.listdir(tmp_path / "cache" / "backgrounds") == []
+
+
+def test_prepare_background_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        prepare_background(str(tmp_path / "yok.mp4"), cache_dir=str(tmp_path))
+
+
+def test_file_hash_is_memoized_by_size_and_mtime(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, 'file_content_hash', lambda path: calls.append(path) or 'hash')
+    main.cached_file_hash.cache_clear()
+    main.cached_file_hash(str(tmp_path / "a"), 1, 1)
+    main.cached_file_hash(str(tmp_path / "a"), 1, 1)
+    main.cached_file_hash(str(tmp_path / "a"), 1, 2)
+    assert len(calls) == 2
+    main.cached_file_hash.cache_clear()
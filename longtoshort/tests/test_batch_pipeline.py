@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+import main
+from main import PIPELINE_STAGES, is_url, load_manifest, process_sources
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("https://youtu.be/abc", True),
+    ("http://example.com/video.mp4", True),
+    ("www.youtube.com/watch?v=abc", True),
+    ("videos/talk.mp4", False),
+    ("C:\\videolar\\konusma.mp4", False),
+])
+def test_is_url(source, expected):
+    assert is_url(source) is expected
+
+
+def test_load_manifest_text_skips_comments_and_blank_lines(tmp_path):
+    manifest = tmp_path / "sources.txt"
+    manifest.write_text("# liste\nhttps://youtu.be/a\n\n  videos/b.mp4  \n# son\n", encoding="utf-8")
+    assert load_manifest(str(manifest)) == ["https://youtu.be/a", "videos/b.mp4"]
+
+
+def test_load_manifest_json_accepts_strings_and_objects(tmp_path):
+    manifest = tmp_path / "sources.json"
+    manifest.write_text(json.dumps(["videos/a.mp4", {"source": "https://youtu.be/b"}]), encoding="utf-8")
+    assert load_manifest(str(manifest)) == ["videos/a.mp4", "https://youtu.be/b"]
+
+
+def test_process_sources_isolates_failures_and_writes_summary(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_stage(job, stage, **options):
+        calls.append((job['source'], stage))
+        if job['source'] == 'bozuk.mp4' and stage == 'transcribe':
+            raise RuntimeError("transkript başarısız")
+        if stage == 'render':
+            job['viral_parts'] = [{'start_time': 0, 'end_time': 30}]
+            job['results'] = [{'output_path': f"{job['source']}.short.mp4", 'error': None}]
+        job['timings'][stage] = 1.0
+
+    monkeypatch.setattr(main, 'run_pipeline_stage', fake_stage)
+    summary_path = tmp_path / "summary.json"
+    summary = process_sources(['a.mp4', 'bozuk.mp4', 'c.mp4'], subtitles=False, summary_path=str(summary_path))
+
+    assert (summary['completed'], summary['failed']) == (2, 1)
+    failed = summary['sources'][1]
+    assert failed['status'] == 'failed'
+    assert failed['failed_stage'] == 'transcribe'
+    assert failed['error'] == "transkript başarısız"
+    # Hata alan kaynak sonraki aşamalara girmez, diğerleri tüm aşamalardan geçer
+    assert [stage for source, stage in calls if source == 'bozuk.mp4'] == ['download', 'transcribe']
+    for source in ('a.mp4', 'c.mp4'):
+        assert [stage for s, stage in calls if s == source] == list(PIPELINE_STAGES)
+    assert summary['sources'][0]['outputs'] == ['a.mp4.short.mp4']
+    assert summary['stage_seconds']['render'] == 2.0
+    assert json.loads(summary_path.read_text(encoding="utf-8"))['failed'] == 1
+
+
+def test_process_sources_records_swallowed_transcription_failure(tmp_path, monkeypatch):
+    video = tmp_path / "video.mp4"
+    video.touch()
+    monkeypatch.setattr(main, 'start_whisper_warmup', lambda config=None: None)
+    monkeypatch.setattr(main, 'probe_video', lambda path: {'duration': 60})
+    # transcribe_audio hatayı yakalayıp None döndürür
+    monkeypatch.setattr(main, 'transcribe_audio', lambda video_path, language=None: None)
+    summary = process_sources([str(video)], subtitles=True)
+    source = summary['sources'][0]
+    assert summary['failed'] == 1
+    assert source['failed_stage'] == 'transcribe'
+    assert source['parts'] == 0
+
+
+@pytest.mark.parametrize("argv, env_workers, expected", [
+    (['--workers', '0'], '1', 0),
+    (['--workers', '3'], 'auto', 3),
+    ([], '2', 2),
+    ([], 'auto', 0),
+])
+def test_cli_workers_reach_create_shorts(tmp_path, monkeypatch, argv, env_workers, expected):
+    video = tmp_path / "video.mp4"
+    video.touch()
+    received = {}
+
+    def fake_create_shorts(video_path, viral_parts, **options):
+        received.update(options)
+        return []
+
+    monkeypatch.setattr(main, 'SHORTS_WORKERS', env_workers)
+    monkeypatch.setattr(main, 'probe_video', lambda path: {'duration': 60})
+    monkeypatch.setattr(main, 'analyze_content', lambda *args, **kwargs: [])
+    monkeypatch.setattr(main, 'compute_signal_timeline', lambda path: None)
+    monkeypatch.setattr(main, 'snap_part_boundaries', lambda parts, timeline: parts)
+    monkeypatch.setattr(main, 'create_shorts', fake_create_shorts)
+    main.main([str(video), '--no-subtitles', '--summary', str(tmp_path / "summary.json")] + argv)
+    # 0, create_shorts/resolve_render_workers için otomatik işçi sayısıdır
+    assert received['workers'] == expected
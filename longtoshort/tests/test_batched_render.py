@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from main import build_ffmpeg_short_command, close_title_input, feed_title_input, open_title_input, short_output_path
+
+
+def test_short_output_path_is_unique_per_part():
+    paths = {short_output_path('out', 'vid', 'Ayni_Baslik', '20260101_120000', index) for index in range(3)}
+    assert len(paths) == 3
+    assert os.path.join('out', 'vid_Ayni_Baslik_20260101_120000_part1.mp4') in paths
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Ek boru tanıtıcıları sadece POSIX'te")
+def test_title_input_streams_raw_rgba_through_pipe(tmp_path):
+    image = np.arange(4 * 3 * 4, dtype=np.uint8).reshape(3, 4, 4)
+    title_input = open_title_input(image, str(tmp_path))
+    assert title_input['size'] == (4, 3)
+    assert title_input['path'] == f"pipe:{title_input['read_fd']}"
+    # Başlık diske yazılmaz
+    assert os.listdir(tmp_path) == []
+
+    reader = f"import os, sys; sys.stdout.write(os.fdopen({title_input['read_fd']}, 'rb').read().hex())"
+    process = subprocess.Popen([sys.executable, '-c', reader], stdout=subprocess.PIPE,
+                               pass_fds=(title_input['read_fd'],))
+    feed_title_input(title_input)
+    output, _ = process.communicate(timeout=10)
+    assert bytes.fromhex(output.decode()) == image.tobytes()
+    assert title_input['read_fd'] is None
+
+
+def test_close_title_input_closes_both_ends(tmp_path):
+    title_input = open_title_input(np.zeros((2, 2, 4), dtype=np.uint8), str(tmp_path))
+    fds = [title_input['read_fd'], title_input['write_fd']]
+    close_title_input(title_input)
+    close_title_input(None)
+    for fd in fds:
+        if fd is not None:
+            with pytest.raises(OSError):
+                os.fstat(fd)
+
+
+def test_batched_command_reads_title_as_premultiplied_raw_frame():
+    cmd = build_ffmpeg_short_command(
+        ['-f', 'rawvideo', '-pix_fmt', 'rgb24', '-video_size', '1664x1248', '-framerate', '30.000', '-i', 'pipe:0'],
+        30.0, 'video.mp4', title_image_path='pipe:7', title_image_size=(1000, 240), title_premultiplied=True,
+        include_audio=False
+    )
+    title_at = cmd.index('pipe:7')
+    assert cmd[title_at - 9:title_at + 1] == ['-f', 'rawvideo', '-pix_fmt', 'rgba', '-video_size', '1000x240',
+                                              '-framerate', '30.000', '-i', 'pipe:7']
+    graph = cmd[cmd.index('-filter_complex') + 1]
+    assert "overlay=x=(W-w)/2:y=50:alpha=premultiplied" in graph
@@ -0,0 +1,53 @@
+import numpy as np
+
+from main import find_boundary_candidate, snap_part_boundaries
+
+
+def make_timeline(duration=120, silences=(), cuts=(), audio_rate=10, video_fps=5):
+    rms_db = np.full(duration * audio_rate, -20.0)
+    for start, end in silences:
+        rms_db[int(start * audio_rate):int(end * audio_rate)] = -60.0
+    scene = np.full(duration * video_fps, 0.01)
+    for cut in cuts:
+        scene[int(cut * video_fps)] = 0.5
+    return {'rms_db': rms_db, 'audio_rate': audio_rate, 'scene': scene, 'video_fps': video_fps}
+
+
+def test_find_boundary_candidate_prefers_scene_cut():
+    timeline = make_timeline(silences=[(30.0, 30.4)], cuts=[31.0])
+    assert find_boundary_candidate(timeline, 30.5, 1.5, -40.0, 0.2) == (31.0, 'kesme')
+
+
+def test_find_boundary_candidate_falls_back_to_silence():
+    timeline = make_timeline(silences=[(29.6, 29.7)])
+    candidate, kind = find_boundary_candidate(timeline, 30.5, 1.5, -40.0, 0.2)
+    assert kind == 'sessizlik'
+    assert abs(candidate - 29.65) < 1e-9
+
+
+def test_find_boundary_candidate_none_outside_tolerance():
+    timeline = make_timeline(silences=[(40.0, 41.0)], cuts=[45.0])
+    assert find_boundary_candidate(timeline, 30.0, 1.5, -40.0, 0.2) == (None, None)
+
+
+def test_snap_part_boundaries_moves_both_edges():
+    timeline = make_timeline(silences=[(59.0, 59.2)], cuts=[20.6])
+    parts = [{'title': 'A', 'start_time': 20.0, 'end_time': 60.0, 'sentence_start': 20.0}]
+    snap_part_boundaries(parts, timeline, tolerance=1.5)
+    assert parts[0]['start_time'] == 20.6
+    assert 59.0 <= parts[0]['end_time'] <= 59.2
+    assert parts[0]['sentence_start'] == parts[0]['start_time']
+
+
+def test_snap_part_boundaries_keeps_length_limits():
+    timeline = make_timeline(cuts=[14.2])
+    parts = [{'title': 'A', 'start_time': 0.0, 'end_time': 15.0, 'sentence_start': 0.0}]
+    # Bitişi 14.2'ye çekmek kısmı 15 saniyenin altına düşürür
+    snap_part_boundaries(parts, timeline, tolerance=1.5)
+    assert parts[0]['end_time'] == 15.0
+
+
+def test_snap_part_boundaries_disabled():
+    parts = [{'title': 'A', 'start_time': 20.0, 'end_time': 60.0}]
+    assert snap_part_boundaries(parts, make_timeline(cuts=[20.5]), tolerance=0) == parts
+    assert parts[0]['start_time'] == 20.0
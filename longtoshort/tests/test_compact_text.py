@@ -0,0 +1,52 @@
+import datetime as dt
+
+import srt
+
+from main import build_compact_text, build_timed_text, strip_filler_words
+
+
+def make_subs(*entries):
+    return [srt.Subtitle(index=k + 1, start=dt.timedelta(seconds=start), end=dt.timedelta(seconds=end), content=text)
+            for k, (start, end, text) in enumerate(entries)]
+
+
+def test_build_compact_text_merges_until_sentence_end():
+    subs = make_subs((0, 4, "Bugün size"), (4, 8, "bir hikaye"), (8, 11, "anlatacağım."), (11, 14, "Başlıyoruz"))
+    assert build_compact_text(subs, strip_filler=False) == (
+        "@0.0 Bugün size bir hikaye anlatacağım.\n"
+        "@11.0 Başlıyoruz\n"
+        "@14.0\n"
+    )
+
+
+def test_build_compact_text_short_sentence_does_not_close_block():
+    subs = make_subs((0, 3, "Merhaba."), (3, 6, "Nasılsınız?"))
+    assert build_compact_text(subs, strip_filler=False) == "@0.0 Merhaba. Nasılsınız?\n@6.0\n"
+
+
+def test_build_compact_text_splits_on_pause_and_max_length():
+    subs = make_subs((0, 2, "bir"), (5, 7, "iki"), *[(7 + 2 * k, 9 + 2 * k, "üç") for k in range(16)])
+    lines = build_compact_text(subs, strip_filler=False).splitlines()
+    assert lines[0] == "@0.0 bir"
+    # 5 saniyede başlayan blok 30 saniye dolunca kapanır
+    assert lines[1].startswith("@5.0 iki üç")
+    assert lines[2].startswith("@35.0 ")
+    assert lines[-1] == "@39.0"
+
+
+def test_build_compact_text_strips_fillers_and_skips_empty_lines():
+    subs = make_subs((0, 2, "ee"), (2, 4, "hmm, yani ıı bu"))
+    assert build_compact_text(subs, strip_filler=True) == "@2.0 yani bu\n@4.0\n"
+
+
+def test_build_compact_text_empty():
+    assert build_compact_text([], strip_filler=False) == ""
+
+
+def test_compact_text_is_shorter_than_timed_text():
+    subs = make_subs(*[(2 * k, 2 * k + 2, f"kelime {k}") for k in range(60)])
+    assert len(build_compact_text(subs, strip_filler=False)) < len(build_timed_text(subs)) / 2
+
+
+def test_strip_filler_words_keeps_real_words():
+    assert strip_filler_words("Eee, evet hmm ama ahh") == "evet ama"
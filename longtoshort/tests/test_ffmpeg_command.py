@@ -0,0 +1,77 @@
+import pytest
+
+from main import FFMPEG_BINARY, build_encoder_args, build_ffmpeg_short_command
+
+MAIN_INPUT = ['-ss', '10.000', '-t', '30.000', '-i', 'source.mp4']
+
+
+def filter_graph(cmd):
+    return cmd[cmd.index('-filter_complex') + 1].split(';')
+
+
+def test_layout_matches_moviepy_positions():
+    cmd = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4', bg_path='bg.mp4', bg_size=(1920, 1080))
+    assert cmd[0] == FFMPEG_BINARY
+    assert cmd[5:11] == MAIN_INPUT
+    graph = filter_graph(cmd)
+    # Arka plan: 1920 yüksekliğe ölçekle, ortadan 1080 genişlikte kırp, gerekirse siyahla doldur
+    assert graph[0] == ("[1:v]scale=-2:1920,crop=w=min(iw\\,1080):h=1920,pad=1080:1920:0:0:black,"
+                        "setsar=1,trim=duration=30.000,setpts=PTS-STARTPTS[bg]")
+    # Ana video: yüksekliğin %65'i (1248), alttan 300 piksel yukarıda
+    assert graph[1] == "[0:v]scale=-2:1248,setsar=1,setpts=PTS-STARTPTS[main]"
+    assert graph[2] == "[bg][main]overlay=x=(W-w)/2:y=372:eof_action=endall[v0]"
+    assert graph[-2] == "[v0]fps=30.000,format=yuv420p[vout]"
+    assert cmd[-3:] == ['-t', '30.000', 'out.mp4']
+
+
+def test_prepared_background_is_only_trimmed():
+    cmd = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4', bg_size=(1080, 1920))
+    assert filter_graph(cmd)[0] == "[1:v]setsar=1,trim=duration=30.000,setpts=PTS-STARTPTS[bg]"
+    assert cmd[cmd.index('bg.mp4') - 3:cmd.index('bg.mp4') + 1] == ['-stream_loop', '-1', '-i', 'bg.mp4']
+
+
+def test_audio_mapping_with_and_without_audio_stream():
+    with_audio = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4')
+    assert "[0:a]volume=1.75[aout]" in filter_graph(with_audio)
+    assert with_audio[with_audio.index('[aout]') - 1] == '-map'
+    assert ['-c:a', 'aac', '-b:a', '192k'] == with_audio[with_audio.index('-c:a'):with_audio.index('-c:a') + 4]
+    assert '-an' not in with_audio
+
+    without_audio = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4', include_audio=False)
+    assert not any('[0:a]' in part for part in filter_graph(without_audio))
+    assert '[aout]' not in without_audio
+    assert '-an' in without_audio
+
+
+def test_logo_is_scaled_and_centered_on_the_left():
+    cmd = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4', logo_path='logo.png')
+    assert cmd[cmd.index('logo.png') - 5:cmd.index('logo.png') + 1] == ['-loop', '1', '-t', '30.000', '-i', 'logo.png']
+    graph = filter_graph(cmd)
+    assert "[2:v]scale=-2:288[logo]" in graph
+    assert "[v0][logo]overlay=x=0:y=(H-h)/2[v1]" in graph
+
+
+def test_title_band_and_title_at_top():
+    cmd = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4', title_image_path='title.png')
+    graph = filter_graph(cmd)
+    assert ("color=c=black@0.5:s=1080x240:d=30.000,format=rgba,"
+            "fade=t=in:st=0:d=0.5:alpha=1,fade=t=out:st=29.500:d=0.5:alpha=1[tbg]") in graph
+    assert "[v0][tbg]overlay=x=0:y=50[v1]" in graph
+    assert "[v1][title]overlay=x=(W-w)/2:y=50[v2]" in graph
+
+
+def test_subtitles_overlay_at_band_position(tmp_path):
+    subtitles = [{'start': 0.0, 'end': 2.0, 'text': 'Merhaba'}]
+    cmd = build_ffmpeg_short_command(MAIN_INPUT, 30.0, 'out.mp4', subtitles=subtitles, work_dir=str(tmp_path))
+    overlays = [part for part in filter_graph(cmd) if '[subs]overlay' in part]
+    assert overlays == ["[v0][subs]overlay=x=0:y=1500[v1]"]
+
+
+@pytest.mark.parametrize("encoder, expected", [
+    ('libx264', ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-b:v', '4000k', '-threads', '2']),
+    ('h264_nvenc', ['-c:v', 'h264_nvenc', '-preset', 'p7', '-rc:v', 'vbr_hq', '-cq:v', '23', '-b:v', '4000k']),
+])
+def test_encoder_args(encoder, expected):
+    args = build_encoder_args(encoder, threads=2)
+    assert args[:len(expected)] == expected
+    assert args[args.index('-pix_fmt') + 1] == 'yuv420p'
@@ -0,0 +1,148 @@
+import os
+import threading
+
+import pytest
+
+import main
+from main import claim_job, enqueue_jobs, job_store_summary, open_job_store, run_job_workers
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'start_whisper_warmup', start_noop_thread)
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def start_noop_thread(config=None):
+    thread = threading.Thread(target=lambda: None)
+    thread.start()
+    return thread
+
+
+class FakePipeline:
+    """Aşamaları dosya yazarak taklit eder; render'da istenen kısımları bir kez başarısız yapar"""
+
+    def __init__(self, fail_starts=()):
+        self.calls = []
+        self.fail_starts = set(fail_starts)
+
+    def __call__(self, job, stage, **options):
+        self.calls.append((stage, [part['start_time'] for part in job.get('viral_parts') or []]))
+        if stage == 'download':
+            job['video_path'] = 'video.mp4'
+            open(job['video_path'], 'w').close()
+            job['duration'] = 100
+        elif stage == 'transcribe':
+            job['srt_path'] = 'video.srt'
+            open(job['srt_path'], 'w').close()
+        elif stage == 'analyze':
+            # create_shorts gibi render sırası zamana göre olsun diye ters sırada döndür
+            job['viral_parts'] = [{'start_time': 50, 'end_time': 70}, {'start_time': 0, 'end_time': 20}]
+        elif stage == 'render':
+            results = []
+            for i, part in enumerate(sorted(job['viral_parts'], key=lambda p: p['start_time'])):
+                result = {'index': i, 'start_time': part['start_time'], 'end_time': part['end_time'],
+                          'output_path': None, 'error': None}
+                if part['start_time'] in self.fail_starts:
+                    self.fail_starts.discard(part['start_time'])
+                    result['error'] = 'render hatası'
+                else:
+                    result['output_path'] = f"short_{part['start_time']}.mp4"
+                    open(result['output_path'], 'w').close()
+                results.append(result)
+            job['results'] = results
+        job['timings'][stage] = 0.1
+
+
+def part_rows(db_path):
+    conn = open_job_store(db_path)
+    try:
+        return [tuple(row) for row in conn.execute(
+            "SELECT part_index, start_time, status, output_path FROM parts ORDER BY part_index")]
+    finally:
+        conn.close()
+
+
+def test_enqueue_jobs_is_idempotent(db_path):
+    first = enqueue_jobs(['a.mp4', 'b.mp4'], db_path=db_path)
+    assert enqueue_jobs(['b.mp4', 'a.mp4'], db_path=db_path) == first[::-1]
+    assert len(job_store_summary(db_path)['sources']) == 2
+
+
+def test_claim_job_hands_out_each_job_once(db_path):
+    job_ids = enqueue_jobs(['a.mp4', 'b.mp4'], db_path=db_path)
+    conn = open_job_store(db_path)
+    try:
+        worker = f"{os.getpid()}@{main.socket.gethostname()}/0"
+        assert claim_job(conn, worker) == job_ids[0]
+        assert claim_job(conn, worker) == job_ids[1]
+        assert claim_job(conn, worker) is None
+    finally:
+        conn.close()
+
+
+def test_claim_job_reclaims_job_of_dead_worker(db_path):
+    job_id, = enqueue_jobs(['a.mp4'], db_path=db_path)
+    conn = open_job_store(db_path)
+    try:
+        main.update_job(conn, job_id, status='running', worker='not-a-pid@host/0')
+        assert claim_job(conn, f"{os.getpid()}@{main.socket.gethostname()}/0") == job_id
+    finally:
+        conn.close()
+
+
+def test_resume_rerenders_only_failed_part(db_path, monkeypatch):
+    pipeline = FakePipeline(fail_starts=[50])
+    monkeypatch.setattr(main, 'run_pipeline_stage', pipeline)
+    enqueue_jobs(['video-url'], db_path=db_path)
+    summary = run_job_workers(db_path)
+    assert summary['sources'][0]['status'] == 'failed'
+    assert summary['sources'][0]['failed_stage'] == 'render'
+    assert part_rows(db_path) == [(0, 50.0, 'failed', None), (1, 0.0, 'done', 'short_0.mp4')]
+
+    # Yeniden sıraya alınan iş kaydedilmiş indirme, SRT ve analizi kullanır
+    pipeline.calls.clear()
+    enqueue_jobs(['video-url'], db_path=db_path)
+    summary = run_job_workers(db_path)
+    assert pipeline.calls == [('render', [50])]
+    assert summary['sources'][0]['status'] == 'done'
+    assert part_rows(db_path) == [(0, 50.0, 'done', 'short_50.mp4'), (1, 0.0, 'done', 'short_0.mp4')]
+
+
+def test_resume_restarts_from_lost_stage_output(db_path, monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(main, 'run_pipeline_stage', pipeline)
+    enqueue_jobs(['video-url'], db_path=db_path)
+    run_job_workers(db_path)
+
+    # SRT silinirse transkript, analiz ve (kısımlar yenilendiği için) render yeniden çalışır;
+    # indirme tekrar edilmez
+    os.remove('video.srt')
+    conn = open_job_store(db_path)
+    try:
+        conn.execute("UPDATE jobs SET status = 'failed'")
+    finally:
+        conn.close()
+    pipeline.calls.clear()
+    enqueue_jobs(['video-url'], db_path=db_path)
+    run_job_workers(db_path)
+    assert [stage for stage, _ in pipeline.calls] == ['transcribe', 'analyze', 'render']
+
+
+def test_swallowed_transcription_failure_is_resumable(db_path, monkeypatch):
+    open('video.mp4', 'w').close()
+    monkeypatch.setattr(main, 'probe_video', lambda path: {'duration': 100})
+    # transcribe_audio hatayı yakalayıp None döndürür
+    monkeypatch.setattr(main, 'transcribe_audio', lambda video_path, language=None: None)
+    enqueue_jobs(['video.mp4'], db_path=db_path)
+    source, = run_job_workers(db_path)['sources']
+    assert (source['status'], source['failed_stage']) == ('failed', 'transcribe')
+
+    # Yeniden sıraya alınınca transkriptten devam eder
+    pipeline = FakePipeline()
+    monkeypatch.setattr(main, 'run_pipeline_stage', pipeline)
+    enqueue_jobs(['video.mp4'], db_path=db_path)
+    source, = run_job_workers(db_path)['sources']
+    assert [stage for stage, _ in pipeline.calls] == ['transcribe', 'analyze', 'render']
+    assert source['status'] == 'done'
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from benchmark import HEAVY_MODULES, IMPORT_PROBE, benchmark_import_time
+
+MODULE_DIR = os.path.dirname(os.path.abspath(main.__file__))
+
+# Ağır modüllerin içe aktarılma girişimlerini (kurulu olmasalar bile) ve alt süreç çağrılarını kaydeder
+GUARDED_IMPORT = """
+import json, subprocess, sys
+attempts = []
+class Guard:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] in {heavy!r}:
+            attempts.append(name)
+        return None
+sys.meta_path.insert(0, Guard())
+def forbidden(*args, **kwargs):
+    attempts.append('subprocess')
+    raise RuntimeError('import sırasında alt süreç çalıştırıldı')
+subprocess.run = subprocess.Popen = forbidden
+import main
+print(json.dumps({{'attempts': attempts, 'configured': main._environment_configured}}))
+"""
+
+
+def run_probe(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=MODULE_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_touch_heavy_modules_or_subprocesses():
+    report = run_probe(GUARDED_IMPORT.format(heavy=HEAVY_MODULES))
+
+    assert report['attempts'] == []
+    assert report['configured'] is False
+
+
+def test_import_probe_reports_no_heavy_modules():
+    report = run_probe(IMPORT_PROBE.format(heavy=HEAVY_MODULES))
+
+    assert report['heavy_modules'] == []
+    assert report['seconds'] > 0
+
+
+def test_benchmark_import_time_writes_report(tmp_path, capsys):
+    json_path = tmp_path / 'import.json'
+    benchmark_import_time(SimpleNamespace(repeat=2, importtime=0, json=str(json_path)))
+
+    with open(json_path, encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['runs'] == 2
+    assert report['min_ms'] <= report['p50_ms'] <= report['max_ms']
+    assert report['heavy_modules'] == []
+    assert "Ağır bağımlılıkların hiçbiri yüklenmedi" in capsys.readouterr().out
+
+
+@pytest.fixture
+def fresh_environment(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, '_environment_configured', False)
+    monkeypatch.setattr(main, 'FFMPEG_DIR', str(tmp_path / 'ffmpeg'))
+    monkeypatch.setenv('PATH', os.environ.get('PATH', ''))
+    monkeypatch.delenv('IMAGEMAGICK_FONT', raising=False)
+    monkeypatch.delenv('IMAGEMAGICK_FONT_PATH', raising=False)
+
+
+def test_configure_environment_runs_once(fresh_environment):
+    main.configure_environment()
+    main.configure_environment()
+
+    assert os.environ['PATH'].split(os.pathsep).count(main.FFMPEG_DIR) == 1
+    assert os.environ['IMAGEMAGICK_FONT'] == 'Arial'
+    assert os.environ['IMAGEMAGICK_FONT_PATH'] == main.IMAGEMAGICK_FONT_DIR
+    assert main._environment_configured is True
+
@@ -0,0 +1,54 @@
+import json
+import os
+import time
+
+import pytest
+
+import main
+from main import cache_file_path, llm_cache_key, llm_cache_lookup, llm_cache_store
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(main, 'LLM_CACHE_MODE', 'readwrite')
+    monkeypatch.setattr(main, 'LLM_CACHE_TTL_SECONDS', 3600)
+    monkeypatch.setattr(main, 'llm_cache_stats', {'hits': 0, 'misses': 0, 'stores': 0, 'expired': 0})
+    return tmp_path
+
+
+def test_llm_cache_key_depends_on_every_input():
+    base = llm_cache_key("model", "system", "user", 0.7)
+    assert base == llm_cache_key("model", "system", "user", 0.7)
+    assert len({base,
+                llm_cache_key("other", "system", "user", 0.7),
+                llm_cache_key("model", "other", "user", 0.7),
+                llm_cache_key("model", "system", "other", 0.7),
+                llm_cache_key("model", "system", "user", 0.0)}) == 5
+
+
+def test_llm_cache_store_then_lookup():
+    key = llm_cache_key("model", "system", "user", 0.7)
+    assert llm_cache_lookup(key) is None
+    llm_cache_store(key, '[{"start": 0}]')
+    assert llm_cache_lookup(key) == '[{"start": 0}]'
+    assert main.llm_cache_stats == {'hits': 1, 'misses': 1, 'stores': 1, 'expired': 0}
+
+
+def test_llm_cache_expired_entry_is_a_miss():
+    key = llm_cache_key("model", "system", "user", 0.7)
+    path = cache_file_path('llm', key)
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'content': 'eski', 'created': time.time() - 7200}, f)
+    assert llm_cache_lookup(key) is None
+    assert main.llm_cache_stats['expired'] == 1
+
+
+@pytest.mark.parametrize("mode", ["replay", "off"])
+def test_llm_cache_store_is_read_only_outside_readwrite(monkeypatch, mode):
+    monkeypatch.setattr(main, 'LLM_CACHE_MODE', mode)
+    key = llm_cache_key("model", "system", "user", 0.7)
+    llm_cache_store(key, 'yanıt')
+    assert not os.path.exists(cache_file_path('llm', key))
+    assert llm_cache_lookup(key) is None
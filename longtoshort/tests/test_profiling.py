@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+
+import pytest
+
+import main
+from main import (
+    build_chrome_trace,
+    build_profile_report,
+    enable_profiling,
+    merge_profile_spans,
+    span,
+    take_profile_spans,
+    traced,
+    write_profile_report,
+)
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    """Profili açar; testten sonra kapatır ve kayıtları temizler"""
+    monkeypatch.delenv('SHORTS_PROFILE', raising=False)
+    take_profile_spans()
+    enable_profiling()
+    yield
+    enable_profiling(False)
+    take_profile_spans()
+
+
+@traced()
+def double(x):
+    return x * 2
+
+
+def test_disabled_profiling_records_nothing(monkeypatch):
+    monkeypatch.setattr(main, '_profile_enabled', False)
+    take_profile_spans()
+
+    with span('kapali') as record:
+        assert record is None
+    assert double(3) == 6
+    assert take_profile_spans() == []
+
+
+def test_enable_profiling_sets_env_for_child_processes(profiling):
+    assert os.environ['SHORTS_PROFILE'] == '1'
+    enable_profiling(False)
+    assert 'SHORTS_PROFILE' not in os.environ
+
+
+def test_spans_nest_and_record_metrics(profiling):
+    with span('dis', video='abc') as outer:
+        with span('ic', index=1) as inner:
+            assert double(2) == 4
+
+    spans = {record['name']: record for record in take_profile_spans()}
+    assert set(spans) == {'dis', 'ic', 'double'}
+    assert spans['dis']['parent'] is None and spans['dis']['depth'] == 0
+    assert spans['ic']['parent'] == outer['id'] and spans['ic']['depth'] == 1
+    assert spans['double']['parent'] == inner['id'] and spans['double']['depth'] == 2
+    assert spans['dis']['attrs'] == {'video': 'abc'}
+    for record in spans.values():
+        assert record['wall_seconds'] >= 0
+        assert record['cpu_seconds'] >= 0
+        assert record['error'] is None
+        assert isinstance(record['io'], dict)
+    assert spans['dis']['wall_seconds'] >= spans['ic']['wall_seconds']
+
+
+def test_span_records_error_and_reraises(profiling):
+    with pytest.raises(ValueError):
+        with span('hatali'):
+            raise ValueError("bozuk")
+
+    record, = take_profile_spans()
+    assert record['error'] == "ValueError: bozuk"
+
+
+def test_threads_have_separate_stacks(profiling):
+    def worker():
+        with span('isci'):
+            pass
+
+    with span('ana'):
+        thread = threading.Thread(target=worker, name='isci-thread')
+        thread.start()
+        thread.join()
+
+    spans = {record['name']: record for record in take_profile_spans()}
+    assert spans['isci']['parent'] is None
+    assert spans['isci']['thread'] == 'isci-thread'
+
+
+def test_take_skips_records_from_other_processes(profiling):
+    merge_profile_spans([{'pid': os.getpid() + 1, 'name': 'baska'}])
+    with span('bu'):
+        pass
+
+    assert [record['name'] for record in take_profile_spans()] == ['bu']
+
+
+def fake_span(name, start, wall, pid=1, error=None, read_bytes=0):
+    return {
+        'id': start, 'parent': None, 'depth': 0, 'name': name, 'attrs': {'index': 0}, 'pid': pid, 'tid': 7,
+        'thread': 'MainThread', 'error': error, 'start': start, 'wall_seconds': wall,
+        'thread_cpu_seconds': wall / 2, 'cpu_seconds': wall / 2, 'children_cpu_seconds': 0.1,
+        'peak_rss_bytes': 1000 + start, 'io': {'read_bytes': read_bytes, 'write_bytes': 5},
+    }
+
+
+def test_profile_report_aggregates_stages():
+    spans = [
+        fake_span('render_part', 12.0, 2.0, read_bytes=100),
+        fake_span('render_part', 10.0, 3.0, pid=2, error="RuntimeError: x", read_bytes=50),
+        fake_span('analyze_content', 11.0, 1.0),
+    ]
+    report = build_profile_report(spans)
+
+    render = report['stages']['render_part']
+    assert render['count'] == 2 and render['errors'] == 1
+    assert render['wall_seconds'] == pytest.approx(5.0)
+    assert render['max_wall_seconds'] == pytest.approx(3.0)
+    assert render['read_bytes'] == 150 and render['write_bytes'] == 10
+    assert render['peak_rss_bytes'] == 1012
+    assert [record['start'] for record in report['spans']] == [0.0, 1.0, 2.0]
+
+
+def test_chrome_trace_events():
+    trace = build_chrome_trace([fake_span('render_part', 10.0, 2.0), fake_span('analyze_content', 10.5, 0.25)])
+
+    complete = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    assert [event['ts'] for event in complete] == [0.0, 500000.0]
+    assert complete[0]['dur'] == 2e6
+    assert complete[0]['args']['index'] == 0
+    assert {event['name'] for event in trace['traceEvents'] if event['ph'] == 'M'} == {'thread_name'}
+
+
+def test_write_profile_report(profiling, tmp_path):
+    with span('indirme'):
+        pass
+
+    path, trace_path = write_profile_report(str(tmp_path / 'profil' / 'rapor.json'))
+
+    assert trace_path == str(tmp_path / 'profil' / 'rapor.trace.json')
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['stages']['indirme']['count'] == 1
+    with open(trace_path, encoding='utf-8') as f:
+        assert json.load(f)['traceEvents'][0]['name'] == 'indirme'
+
+
+def test_render_worker_returns_its_spans(profiling, monkeypatch):
+    monkeypatch.setattr(main, 'render_short_ffmpeg', lambda *args, **kwargs: "short_0.mp4")
+    state = main.get_render_worker_state()
+    state.update({'renderer': 'ffmpeg', 'video_path': 'kaynak.mp4', 'source_info': {}, 'logo_path': None,
+                  'bg_path': 'bg.mp4', 'bg_info': {}, 'threads': 1, 'subtitle_mode': None})
+    try:
+        result = main.render_part_in_worker(0, {'start_time': 1.0, 'end_time': 31.0}, 1, [], "vid",
+                                            collect_spans=True)
+    finally:
+        state.clear()
+
+    record, = result['spans']
+    assert record['name'] == 'render_part'
+    assert record['attrs'] == {'index': 0, 'start_time': 1.0, 'end_time': 31.0, 'renderer': 'ffmpeg'}
+    assert take_profile_spans() == []
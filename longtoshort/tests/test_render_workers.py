@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+import main
+from main import (
+    close_render_worker,
+    get_render_worker_state,
+    init_render_worker,
+    render_part_in_worker,
+    render_pool_context,
+    resolve_render_workers,
+)
+
+
+@pytest.mark.parametrize("workers, part_count, cpu_count, expected", [
+    (None, 10, 16, 4),
+    (0, 10, 16, 4),
+    (-1, 10, 16, 4),
+    (None, 10, 2, 1),
+    (None, 2, 16, 2),
+    (3, 10, 16, 3),
+    (8, 3, 16, 3),
+    (4, 0, 16, 1),
+])
+def test_resolve_render_workers(monkeypatch, workers, part_count, cpu_count, expected):
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: cpu_count)
+    assert resolve_render_workers(workers, part_count) == expected
+
+
+def test_render_pool_uses_spawn_context():
+    assert render_pool_context().get_start_method() == 'spawn'
+
+
+@pytest.fixture
+def fake_probe(monkeypatch):
+    """probe_video ve load_font yerine çağrıları sayan sahte fonksiyonlar"""
+    probes = []
+
+    def probe_video(path):
+        probes.append(path)
+        return {'path': path, 'width': 1920, 'height': 1080, 'fps': 30.0, 'duration': 120.0}
+
+    monkeypatch.setattr(main, 'probe_video', probe_video)
+    monkeypatch.setattr(main, 'load_font', lambda path, size: None)
+    yield probes
+    close_render_worker()
+
+
+def test_init_render_worker_probes_once_and_close_clears(fake_probe):
+    init_render_worker("kaynak.mp4", "ffmpeg", "logo.png", 4, bg_path="bg_dikey.mp4", subtitle_mode="ass")
+
+    state = get_render_worker_state()
+    assert fake_probe == ["kaynak.mp4", "bg_dikey.mp4"]
+    assert state['source_info']['path'] == "kaynak.mp4"
+    assert state['bg_info']['path'] == "bg_dikey.mp4"
+    assert state['threads'] == 4
+    assert state['subtitle_mode'] == "ass"
+
+    close_render_worker()
+    assert get_render_worker_state() == {}
+
+
+def test_render_worker_state_is_per_thread(fake_probe):
+    init_render_worker("kaynak.mp4", "ffmpeg", None, 2)
+    seen = {}
+
+    def other_thread():
+        seen['state'] = dict(get_render_worker_state())
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+
+    assert seen['state'] == {}
+    assert get_render_worker_state()['video_path'] == "kaynak.mp4"
+
+
+def test_render_part_in_worker_reuses_state(fake_probe, monkeypatch):
+    calls = []
+
+    def render_short_ffmpeg(video_path, part, index, total, source_info, **kwargs):
+        calls.append((video_path, index, source_info, kwargs['bg_info'], kwargs['threads']))
+        return f"short_{index}.mp4"
+
+    monkeypatch.setattr(main, 'render_short_ffmpeg', render_short_ffmpeg)
+    init_render_worker("kaynak.mp4", "ffmpeg", None, 3, bg_path="bg_dikey.mp4")
+
+    parts = [{'start_time': 10.0, 'end_time': 40.0}, {'start_time': 60.0, 'end_time': 90.0}]
+    results = [render_part_in_worker(i, part, len(parts), [], "vid") for i, part in enumerate(parts)]
+
+    assert [r['output_path'] for r in results] == ["short_0.mp4", "short_1.mp4"]
+    assert all(r['error'] is None for r in results)
+    # Kaynak ve arka plan kısım başına değil, işçi başına bir kez incelenir
+    assert fake_probe == ["kaynak.mp4", "bg_dikey.mp4"]
+    assert all(c[2]['path'] == "kaynak.mp4" and c[3]['path'] == "bg_dikey.mp4" and c[4] == 3 for c in calls)
+
+
+def test_render_part_in_worker_records_error(fake_probe, monkeypatch):
+    def render_short_ffmpeg(*args, **kwargs):
+        raise RuntimeError("ffmpeg çöktü")
+
+    monkeypatch.setattr(main, 'render_short_ffmpeg', render_short_ffmpeg)
+    init_render_worker("kaynak.mp4", "ffmpeg", None, 1)
+
+    result = render_part_in_worker(2, {'start_time': 5.0, 'end_time': 35.0}, 3, [], "vid")
+
+    assert result['index'] == 2
+    assert result['output_path'] is None
+    assert result['error'] == "ffmpeg çöktü"
+    assert 'spans' not in result
+
+
+def test_create_shorts_serial_path_probes_once(fake_probe, monkeypatch):
+    rendered = []
+
+    def render_short_ffmpeg(video_path, part, index, total, source_info, **kwargs):
+        rendered.append(part['start_time'])
+        return f"short_{index}.mp4"
+
+    monkeypatch.setattr(main, 'render_short_ffmpeg', render_short_ffmpeg)
+    monkeypatch.setattr(main, 'prepare_render_inputs',
+                        lambda video_path: (video_path, "vid", None, "bg_dikey.mp4"))
+
+    parts = [{'start_time': 70.0, 'end_time': 100.0}, {'start_time': 10.0, 'end_time': 40.0}]
+    results = main.create_shorts("kaynak.mp4", parts, subs=[], renderer="ffmpeg", workers=1)
+
+    assert rendered == [10.0, 70.0]
+    assert [r['output_path'] for r in results] == ["short_0.mp4", "short_1.mp4"]
+    assert fake_probe == ["kaynak.mp4", "bg_dikey.mp4"]
+    assert get_render_worker_state() == {}
@@ -0,0 +1,71 @@
+import datetime as dt
+
+import numpy as np
+import srt
+
+from main import analyze_content_simple, compute_segment_features, select_scored_windows
+
+
+def uniform_segments(count, length=5.0):
+    starts = np.arange(count, dtype=np.float64) * length
+    return starts, starts + length
+
+
+def test_select_scored_windows_respects_length_limits_and_no_overlap():
+    starts, ends = uniform_segments(100)
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=100)
+    selected = select_scored_windows(starts, ends, scores, np.zeros(100), max_parts=10)
+    assert 0 < len(selected) <= 10
+    covered = set()
+    for first, last, _ in selected:
+        assert 15 <= ends[last] - starts[first] <= 120
+        segment_range = set(range(first, last + 1))
+        assert not covered & segment_range
+        covered |= segment_range
+    assert [first for first, _, _ in selected] == sorted(first for first, _, _ in selected)
+
+
+def test_select_scored_windows_finds_high_scoring_region():
+    starts, ends = uniform_segments(60)
+    scores = np.zeros(60)
+    scores[30:36] = 5.0
+    (first, last, score), = select_scored_windows(starts, ends, scores, np.zeros(60), max_parts=1)
+    assert first <= 30 and last >= 35
+    assert score >= 30.0
+
+
+def test_select_scored_windows_prefers_sentence_boundaries():
+    starts, ends = uniform_segments(20)
+    complete = np.zeros(20)
+    complete[[4, 9]] = 1.0  # 5. ve 10. segment cümle sonu
+    (first, last, _), = select_scored_windows(starts, ends, np.zeros(20), complete, max_parts=1)
+    assert (first, last) in ((5, 9), (0, 4))
+
+
+def test_select_scored_windows_too_short_input():
+    starts, ends = uniform_segments(2)
+    assert select_scored_windows(starts, ends, np.ones(2), np.zeros(2), max_parts=3) == []
+
+
+def test_compute_segment_features_energy_follows_audio():
+    starts, ends = uniform_segments(3, length=1.0)
+    audio = np.concatenate([np.full(100, 0.1), np.full(100, 0.8), np.full(100, 0.1)]).astype(np.float32)
+    features = compute_segment_features(starts, ends, ["ama neden", "bir şey.", "x" * 40],
+                                        audio=audio, sample_rate=100)
+    assert features['keywords'].tolist() == [1.0, 0.0, 0.0]
+    assert features['complete'].tolist() == [0.0, 1.0, 0.0]
+    assert features['length'].tolist() == [0.0, 0.0, 1.0]
+    assert features['energy'].argmax() == 1
+
+
+def test_analyze_content_simple_from_subs():
+    subs = [srt.Subtitle(index=k + 1, start=dt.timedelta(seconds=4 * k), end=dt.timedelta(seconds=4 * k + 4),
+                         content=f"Bu önemli bir cümle {k}." if 20 <= k < 28 else f"sıradan konuşma {k}")
+            for k in range(60)]
+    parts = analyze_content_simple("", 240, subs=subs, max_parts=1)
+    assert len(parts) == 1
+    part = parts[0]
+    assert 15 <= part['end_time'] - part['start_time'] <= 120
+    assert part['start_time'] <= 80 and part['end_time'] >= 112
+    assert "önemli" in part['title']
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def render_session(monkeypatch):
+    """Render oturumunu kaydeden sahte oturum; gerçek FFmpeg/MoviePy çalıştırılmaz"""
+    session = {'submitted': [], 'closed': False}
+    monkeypatch.setattr(main, 'open_render_session', lambda *args, **kwargs: session)
+    monkeypatch.setattr(main, 'submit_render',
+                        lambda session, part, subtitles: session['submitted'].append(part))
+
+    def close(session):
+        session['closed'] = True
+        return [{'output_path': 'short.mp4', 'error': None} for _ in session['submitted']]
+
+    monkeypatch.setattr(main, 'close_render_session', close)
+    monkeypatch.setattr(main, 'compute_signal_timeline', lambda path: None)
+    monkeypatch.setattr(main, 'snap_part_boundaries', lambda parts, timeline: parts)
+    return session
+
+
+def segments(count, fail=False):
+    for k in range(count):
+        yield {'start': 2.0 * k, 'end': 2.0 * k + 2, 'text': f"cümle {k}."}
+    if fail:
+        raise RuntimeError("transkript koptu")
+
+
+def test_streaming_pipeline_submits_parts_and_returns_results(render_session, monkeypatch):
+    monkeypatch.setattr(main, 'iter_transcription_segments', lambda path, language=None: segments(40))
+    monkeypatch.setattr(main, 'analyze_content', lambda text, duration, subs=None: [
+        {'start_time': 0.0, 'end_time': 30.0, 'title': 'A'}])
+    parts, results = main.run_streaming_pipeline('video.mp4', 80)
+    assert [part['title'] for part in parts] == ['A']
+    assert results == [{'output_path': 'short.mp4', 'error': None}]
+    assert render_session['closed']
+
+
+def test_streaming_pipeline_reraises_transcription_error_after_rendering(render_session, monkeypatch):
+    monkeypatch.setattr(main, 'iter_transcription_segments', lambda path, language=None: segments(40, fail=True))
+    monkeypatch.setattr(main, 'analyze_content', lambda text, duration, subs=None: [
+        {'start_time': 0.0, 'end_time': 30.0, 'title': 'A'}])
+    with pytest.raises(RuntimeError, match="transkript koptu"):
+        main.run_streaming_pipeline('video.mp4', 80)
+    # Hata öncesi bulunan kısım yine de render edilip oturum kapatılır
+    assert len(render_session['submitted']) == 1
+    assert render_session['closed']
+
+
+def test_streaming_pipeline_stops_transcriber_when_analysis_fails(render_session, monkeypatch):
+    produced = []
+
+    def many_segments(path, language=None):
+        for segment in segments(5000):
+            produced.append(segment)
+            yield segment
+
+    def failing_analysis(text, duration, subs=None):
+        raise ValueError("analiz hatası")
+
+    monkeypatch.setattr(main, 'iter_transcription_segments', many_segments)
+    monkeypatch.setattr(main, 'analyze_content', failing_analysis)
+    with pytest.raises(ValueError):
+        main.run_streaming_pipeline('video.mp4', 10000, window_seconds=60)
+    assert not any(thread.name == 'transcription' for thread in threading.enumerate())
+    assert len(produced) < 5000
+    assert render_session['closed']
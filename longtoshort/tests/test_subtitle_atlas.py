@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from main import build_atlas_crop_expr, build_subtitle_atlas, render_subtitle_sprite
+
+LONG_TEXT = "çok uzun bir altyazı satırı ki kesinlikle iki satıra sarılacak ve şeride sığmayacak kadar uzun olsun"
+
+
+def crop_y(expr, t):
+    """FFmpeg crop y ifadesini verilen t için Python'da değerlendirir"""
+    return eval(expr, {'gte': lambda a, b: float(a >= b), 'lt': lambda a, b: float(a < b), 't': t})
+
+
+@pytest.mark.parametrize("text", ["kısa", LONG_TEXT])
+def test_sprite_always_fills_band(text):
+    sprite = render_subtitle_sprite(text)
+
+    assert sprite.shape == (70, 1080, 4)
+    assert not sprite.flags.writeable
+    # Şerit yarı saydam siyah, metin beyaz
+    assert sprite[0, 0].tolist() == [0, 0, 0, 150]
+    assert (sprite[:, :, :3] == 255).any()
+
+
+def test_sprite_is_cached_per_text():
+    assert render_subtitle_sprite("merhaba") is render_subtitle_sprite("merhaba")
+
+
+def test_atlas_deduplicates_repeated_text():
+    subtitles = [
+        {'start': 0.0, 'end': 1.0, 'text': 'merhaba'},
+        {'start': 1.0, 'end': 2.0, 'text': 'dünya'},
+        {'start': 2.0, 'end': 3.0, 'text': '  merhaba '},
+        {'start': 3.0, 'end': 3.0, 'text': 'sıfır süre'},
+        {'start': 4.0, 'end': 5.0, 'text': '   '},
+    ]
+    atlas = build_subtitle_atlas(subtitles)
+
+    assert atlas['image'].shape == (140, 1080, 4)
+    assert atlas['sprites'] == [(0, 70), (70, 70)]
+    assert atlas['timeline'] == [(0.0, 1.0, 0), (1.0, 2.0, 1), (2.0, 3.0, 0)]
+    np.testing.assert_array_equal(atlas['image'][70:], render_subtitle_sprite('dünya'))
+
+
+def test_empty_atlas():
+    atlas = build_subtitle_atlas([])
+    assert atlas['image'].shape == (0, 1080, 4)
+    assert atlas['sprites'] == [] and atlas['timeline'] == []
+
+
+def test_crop_expr_selects_sprite_over_time():
+    atlas = build_subtitle_atlas([
+        {'start': 0.5, 'end': 1.5, 'text': 'bir'},
+        {'start': 2.0, 'end': 3.0, 'text': 'iki'},
+        {'start': 3.0, 'end': 4.0, 'text': 'bir'},
+    ])
+    blank_y = atlas['image'].shape[0]
+    expr = build_atlas_crop_expr(atlas, blank_y)
+
+    assert crop_y(expr, 0.0) == blank_y
+    assert crop_y(expr, 1.0) == 0
+    assert crop_y(expr, 1.5) == blank_y
+    assert crop_y(expr, 2.5) == 70
+    # Yarı açık aralık: bitişik altyazılar arasında boş kare yok
+    assert crop_y(expr, 3.0) == 0
+    assert crop_y(expr, 4.0) == blank_y
+
+
+def test_crop_expr_cuts_overlaps_at_next_start():
+    atlas = build_subtitle_atlas([
+        {'start': 0.0, 'end': 2.0, 'text': 'bir'},
+        {'start': 1.0, 'end': 3.0, 'text': 'iki'},
+    ])
+    blank_y = atlas['image'].shape[0]
+    expr = build_atlas_crop_expr(atlas, blank_y)
+
+    assert crop_y(expr, 0.5) == 0
+    assert crop_y(expr, 1.5) == 70
+    assert crop_y(expr, 3.0) == blank_y
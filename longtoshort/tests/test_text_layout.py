@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+import main
+from main import (
+    fit_text_block,
+    load_font,
+    measure_text_block,
+    measure_text_width,
+    smart_wrap_text,
+)
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(main.__file__)), 'DynaPuff/static/DynaPuff-Regular.ttf')
+TITLE = "Bu videoda herkesin konuştuğu o inanılmaz anı sonunda açıklıyoruz"
+
+
+def test_smart_wrap_keeps_words_and_width():
+    font = load_font(FONT_PATH, 90)
+    lines = smart_wrap_text(TITLE, font, 1000).split('\n')
+
+    assert " ".join(lines).split() == TITLE.split()
+    assert len(lines) > 1
+    for line in lines:
+        # Önbellekten toplanan genişlik, satırın doğrudan ölçümüyle (kerning payıyla) uyuşmalı
+        assert font.getlength(line) <= 1000 + 2
+
+
+def test_smart_wrap_splits_overlong_word():
+    font = load_font(FONT_PATH, 90)
+    word = "muvaffakiyetsizleştiricileştiriveremeyebileceklerimizdenmişsinizcesine"
+    lines = smart_wrap_text(word, font, 400).split('\n')
+
+    assert "".join(lines) == word
+    assert len(lines) > 1
+
+
+def test_measure_text_width_is_cached():
+    measure_text_width.cache_clear()
+    measure_text_width(FONT_PATH, 90, "merhaba")
+    measure_text_width(FONT_PATH, 90, "merhaba")
+    info = measure_text_width.cache_info()
+    assert info.hits == 1 and info.misses == 1
+
+
+def linear_fit(text, width, available_height, max_font_size, min_font_size=10):
+    """Eski davranış: en büyük boyuttan birer birer küçülterek ilk sığan boyutu bulur"""
+    for size in range(max_font_size, min_font_size - 1, -1):
+        block = measure_text_block(text, FONT_PATH, size, width)
+        if block[1] <= width and block[2] <= available_height:
+            return (size,) + block
+    return (min_font_size,) + measure_text_block(text, FONT_PATH, min_font_size, width)
+
+
+@pytest.mark.parametrize("text, width, available_height", [
+    (TITLE, 1000, 300),
+    (TITLE, 1000, 600),
+    ("Kısa başlık", 1000, 400),
+    ("Tek", 1000, 1000),
+])
+def test_fit_text_block_matches_linear_search(text, width, available_height):
+    result = fit_text_block(text, FONT_PATH, width, available_height, 90)
+
+    assert result == linear_fit(text, width, available_height, 90)
+    size, lines, max_line_width, total_height, _ = result
+    assert max_line_width <= width
+    assert total_height <= available_height
+
+
+def test_fit_text_block_falls_back_to_min_size(capsys):
+    size, lines, _, total_height, _ = fit_text_block(TITLE * 4, FONT_PATH, 300, 20, 90, min_font_size=10)
+
+    assert size == 10
+    assert total_height > 20
+    assert "Minimum font boyutuna ulaşıldı" in capsys.readouterr().out
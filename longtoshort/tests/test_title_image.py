@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+import main
+from main import create_text_image, premultiply_alpha, render_text_image
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(main.__file__)), 'DynaPuff/static/DynaPuff-Regular.ttf')
+TITLE = "Herkesin konuştuğu o an"
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'TITLE_DEBUG_DUMP', False)
+    return tmp_path
+
+
+def test_title_is_rendered_in_memory(work_dir):
+    image_np = create_text_image(TITLE, 1080, 400, main_font_path=FONT_PATH, output_folder=str(work_dir))
+
+    assert image_np.shape == (400, 1080, 4)
+    assert image_np.dtype == np.uint8
+    assert image_np[:, :, 3].any()
+    assert not image_np.flags.writeable
+    assert os.listdir(work_dir) == []
+
+
+def test_title_is_cached_per_text_and_box():
+    first = create_text_image(TITLE, 1080, 400, main_font_path=FONT_PATH)
+    assert create_text_image(TITLE, 1080, 400, main_font_path=FONT_PATH) is first
+    assert create_text_image(TITLE, 1080, 500, main_font_path=FONT_PATH) is not first
+
+
+def test_debug_dump_writes_png(work_dir):
+    create_text_image(TITLE, 1080, 400, main_font_path=FONT_PATH, output_folder=str(work_dir), debug_dump=True)
+    assert os.path.exists(work_dir / 'test_text.png')
+
+
+def test_env_flag_enables_debug_dump(work_dir, monkeypatch):
+    monkeypatch.setattr(main, 'TITLE_DEBUG_DUMP', True)
+    create_text_image(TITLE, 1080, 400, main_font_path=FONT_PATH)
+    assert os.path.exists(work_dir / 'test_text.png')
+
+
+def test_premultiplied_title_matches_straight_alpha():
+    straight = render_text_image(TITLE, 1080, 400, 90, FONT_PATH)
+    premultiplied = create_text_image(TITLE, 1080, 400, main_font_path=FONT_PATH, premultiplied=True)
+
+    np.testing.assert_array_equal(premultiplied, premultiply_alpha(straight))
+    np.testing.assert_array_equal(premultiplied[:, :, 3], straight[:, :, 3])
+    assert (premultiplied[:, :, :3] <= premultiplied[:, :, 3:4]).all()
+    assert not premultiplied.flags.writeable
+
+
+def test_premultiply_alpha_rounds_channels():
+    image_np = np.array([[[255, 128, 0, 128], [200, 100, 50, 0], [10, 20, 30, 255]]], dtype=np.uint8)
+    result = premultiply_alpha(image_np)
+
+    np.testing.assert_array_equal(result, [[[128, 64, 0, 128], [0, 0, 0, 0], [10, 20, 30, 255]]])
+    # Giriş dizisi değiştirilmez
+    assert image_np[0, 0, 0] == 255
+
+
+def test_missing_font_raises():
+    with pytest.raises(FileNotFoundError):
+        create_text_image(TITLE, 1080, 400, main_font_path='yok/font.ttf')
@@ -0,0 +1,51 @@
+import datetime as dt
+
+import pytest
+import srt
+
+import main
+from main import estimate_tokens, merge_window_parts, split_transcript_windows
+
+
+@pytest.fixture(autouse=True)
+def timed_encoding(monkeypatch):
+    monkeypatch.setattr(main, 'ANALYSIS_PROMPT_ENCODING', 'timed')
+
+
+def make_subs(count, length=5):
+    return [srt.Subtitle(index=k + 1, start=dt.timedelta(seconds=k * length),
+                         end=dt.timedelta(seconds=(k + 1) * length), content=f"cümle numarası {k} burada")
+            for k in range(count)]
+
+
+def test_split_transcript_windows_single_window_when_budget_allows():
+    subs = make_subs(10)
+    assert split_transcript_windows(subs, max_window_tokens=10000) == [subs]
+
+
+def test_split_transcript_windows_budget_overlap_and_coverage():
+    subs = make_subs(200)
+    windows = split_transcript_windows(subs, max_window_tokens=300, overlap_seconds=30)
+    assert len(windows) > 1
+    for window in windows:
+        assert sum(estimate_tokens(main.build_transcript_text([sub])) for sub in window) <= 300
+    for previous, current in zip(windows, windows[1:]):
+        # Sonraki pencere öncekinin son ~30 saniyesini tekrar içerir ve ilerler
+        overlap = previous[-1].end.total_seconds() - current[0].start.total_seconds()
+        assert 0 < overlap <= 30
+        assert current[0].index > previous[0].index
+    assert windows[0][0] is subs[0] and windows[-1][-1] is subs[-1]
+
+
+def test_split_transcript_windows_oversized_line_still_progresses():
+    subs = make_subs(3)
+    windows = split_transcript_windows(subs, max_window_tokens=1, overlap_seconds=30)
+    assert [len(window) for window in windows] == [1, 1, 1]
+
+
+def test_merge_window_parts_keeps_longer_of_overlapping_parts():
+    parts = merge_window_parts([
+        [{'start_time': 0, 'end_time': 30}, {'start_time': 100, 'end_time': 130}],
+        [{'start_time': 5, 'end_time': 60}, {'start_time': 200, 'end_time': 220}],
+    ])
+    assert [(part['start_time'], part['end_time']) for part in parts] == [(5, 60), (100, 130), (200, 220)]
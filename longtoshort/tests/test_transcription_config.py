@@ -0,0 +1,36 @@
+import pytest
+
+import main
+from main import resolve_transcription_config
+
+DEFAULTS = {'model_size': 'small', 'device': 'auto', 'compute_type': 'auto', 'beam_size': 5,
+            'cpu_threads': 0, 'num_workers': 1}
+
+
+@pytest.fixture(autouse=True)
+def defaults(monkeypatch):
+    monkeypatch.setattr(main, 'TRANSCRIPTION_DEFAULTS', dict(DEFAULTS))
+
+
+@pytest.mark.parametrize("cuda, device, compute_type", [
+    (False, 'cpu', 'int8'),
+    (True, 'cuda', 'float16'),
+])
+def test_auto_selects_device_and_compute_type(monkeypatch, cuda, device, compute_type):
+    monkeypatch.setattr(main, 'cuda_available', lambda: cuda)
+    config = resolve_transcription_config()
+    assert (config['device'], config['compute_type']) == (device, compute_type)
+
+
+def test_explicit_values_override_defaults_and_none_is_ignored(monkeypatch):
+    monkeypatch.setattr(main, 'cuda_available', lambda: True)
+    config = resolve_transcription_config({'device': 'cpu', 'compute_type': 'float32', 'beam_size': None,
+                                           'cpu_threads': 'auto', 'model_size': 'medium'})
+    assert config == {'model_size': 'medium', 'device': 'cpu', 'compute_type': 'float32', 'beam_size': 5,
+                      'cpu_threads': 0, 'num_workers': 1}
+
+
+def test_defaults_are_not_mutated(monkeypatch):
+    monkeypatch.setattr(main, 'cuda_available', lambda: False)
+    resolve_transcription_config({'model_size': 'tiny'})
+    assert main.TRANSCRIPTION_DEFAULTS == DEFAULTS
@@ -0,0 +1,74 @@
+import sys
+import threading
+import types
+
+import pytest
+
+import main
+
+
+class FakeWhisperModel:
+    """Yüklemesi bir olay gelene kadar bekleyen sahte faster-whisper modeli"""
+
+    release = {}
+    transcribed = []
+
+    def __init__(self, model_size, **options):
+        self.model_size = model_size
+        event = self.release.get(model_size)
+        if event is not None:
+            assert event.wait(5)
+
+    def transcribe(self, audio, beam_size=1):
+        self.transcribed.append(self.model_size)
+        return iter([]), None
+
+
+@pytest.fixture(autouse=True)
+def fake_faster_whisper(monkeypatch):
+    module = types.ModuleType('faster_whisper')
+    module.WhisperModel = FakeWhisperModel
+    monkeypatch.setitem(sys.modules, 'faster_whisper', module)
+    monkeypatch.setattr(main, 'cuda_available', lambda: False)
+    FakeWhisperModel.release = {}
+    FakeWhisperModel.transcribed = []
+    main.release_whisper_models()
+    yield
+    main.release_whisper_models()
+
+
+def test_get_whisper_model_reuses_pooled_model():
+    model, stats = main.get_whisper_model('tiny', 'cpu', 'int8')
+    again, _ = main.get_whisper_model('tiny', 'cpu', 'int8')
+    assert again is model
+    assert stats['uses'] == 2
+    assert stats['compute_type'] == 'int8'
+
+
+def test_loading_one_model_does_not_block_other_models_or_stats():
+    FakeWhisperModel.release['medium'] = threading.Event()
+    loader = threading.Thread(target=main.get_whisper_model, args=('medium', 'cpu', 'int8'))
+    loader.start()
+    try:
+        # Yavaş yükleme sürerken başka bir model ve istatistikler beklemeden alınır
+        model, _ = main.get_whisper_model('tiny', 'cpu', 'int8')
+        assert model.model_size == 'tiny'
+        assert [stats['model_size'] for stats in main.whisper_pool_stats()['models']] == ['tiny']
+    finally:
+        FakeWhisperModel.release['medium'].set()
+        loader.join()
+    assert len(main.whisper_pool_stats()['models']) == 2
+
+
+def test_warmup_runs_once_per_model():
+    main.warmup_whisper_model('tiny', 'cpu', 'int8')
+    main.warmup_whisper_model('tiny', 'cpu', 'int8')
+    stats, = main.whisper_pool_stats()['models']
+    assert FakeWhisperModel.transcribed == ['tiny']
+    assert stats['warmed_up'] and stats['warmup_seconds'] is not None
+
+
+def test_release_whisper_models_empties_pool():
+    main.get_whisper_model('tiny', 'cpu', 'int8')
+    main.release_whisper_models()
+    assert main.whisper_pool_stats()['models'] == []